@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks of Renku commands on synthetic projects.
+
+Generate a project with chains and fan-outs of ``renku run`` steps,
+directory outputs and datasets with regular and LFS-tracked files:
+
+.. code-block:: console
+
+    $ python -m benchmarks generate /tmp/project --chains 4 --chain-length 20
+
+Time commands on the project and store the results as JSON:
+
+.. code-block:: console
+
+    $ python -m benchmarks run /tmp/project --repeat 5 --output results.json
+
+Commands that modify the project are timed on a fresh copy in every
+repetition. Use ``--renku`` to time another installation of Renku, e.g.
+``--renku "/path/to/venv/bin/renku"``, and compare the results:
+
+.. code-block:: console
+
+    $ python -m benchmarks compare before.json after.json
+
+Operations on dataset models are timed in-process, e.g. adding, renaming
+and unlinking 100k files of a dataset:
+
+.. code-block:: console
+
+    $ python -m benchmarks dataset-files --count 100000
+
+Loading workflow files of a project with compiled plans is compared with
+loading them through calamus:
+
+.. code-block:: console
+
+    $ python -m benchmarks loader /tmp/project
+"""
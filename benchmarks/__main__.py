@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Support for ``python -m benchmarks``."""
+
+import json
+
+import click
+
+from . import datasets, generator, loader, scenarios
+
+
+@click.group()
+def cli():
+    """Benchmark Renku commands."""
+
+
+@cli.command()
+@click.argument("path", type=click.Path(file_okay=False))
+@click.option("--chains", default=2, help="Number of chains of steps.")
+@click.option("--chain-length", default=5, help="Number of steps in a chain.")
+@click.option("--fan-out", default=5, help="Number of steps using the same input.")
+@click.option("--directories", default=1, help="Number of steps with a directory output.")
+@click.option("--datasets", default=2, help="Number of datasets.")
+@click.option("--files", default=10, help="Number of files in each dataset.")
+@click.option("--file-size", default=1024, help="Size of dataset files in bytes.")
+@click.option("--lfs-files", default=2, help="Number of files tracked in Git LFS.")
+@click.option("--lfs-file-size", default=200 * 1024, help="Size of files tracked in Git LFS in bytes.")
+@click.option("--seed", default=0, help="Seed of the generated file content.")
+@click.option("--renku", default="renku", help="Command to run Renku.")
+def generate(path, renku, **kwargs):
+    """Generate a synthetic project."""
+    generator.generate(path, generator.ProjectSpec(**kwargs), renku=renku, echo=click.echo)
+
+
+@cli.command()
+@click.argument("path", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "-s",
+    "--scenario",
+    "names",
+    multiple=True,
+    type=click.Choice([scenario.name for scenario in scenarios.SCENARIOS]),
+    help="Scenarios to run, all by default.",
+)
+@click.option("--repeat", default=3, type=click.IntRange(min=1), help="Number of repetitions of each scenario.")
+@click.option("--cold", is_flag=True, help="Remove cached data before every repetition.")
+@click.option("--renku", default="renku", help="Command to run Renku.")
+@click.option("-o", "--output", type=click.File("w"), default="-", help="File to write the JSON results to.")
+def run(path, names, repeat, cold, renku, output):
+    """Time scenarios on a project."""
+    selected = [scenario for scenario in scenarios.SCENARIOS if not names or scenario.name in names]
+    results = scenarios.run(
+        path, scenarios=selected, renku=renku, repeat=repeat, cold=cold, echo=lambda m: click.echo(m, err=True)
+    )
+    json.dump(results, output, indent=2)
+    output.write("\n")
+
+
+@cli.command()
+@click.argument("before", type=click.File("r"))
+@click.argument("after", type=click.File("r"))
+def compare(before, after):
+    """Compare median times of two results."""
+    rows, failures = scenarios.compare(json.load(before), json.load(after))
+    for name, old, new, ratio in rows:
+        ratio = "{0:.2f}x".format(ratio) if ratio is not None else "-"
+        click.echo("{0:<20} {1:>10.3f}s {2:>10.3f}s {3:>8}".format(name, old, new, ratio))
+    for name in failures:
+        click.echo("{0:<20} {1:>10} {2:>10} {3:>8}".format(name, "failed", "", ""))
+
+
+@cli.command("dataset-files")
+@click.option("--count", default=100000, type=click.IntRange(min=1), help="Number of dataset files.")
+def dataset_files(count):
+    """Time bulk operations on files of a dataset."""
+    result = datasets.time_dataset_files(count)
+    for name, seconds in result["times"].items():
+        click.echo("{0:<24} {1:>10.3f}s".format(name, seconds))
+
+
+@cli.command("loader")
+@click.argument("path", type=click.Path(exists=True, file_okay=False))
+@click.option("--repeat", default=3, type=click.IntRange(min=1), help="Number of repetitions.")
+def load_workflows(path, repeat):
+    """Time loading workflow files of a project with and without compiled plans."""
+    result = loader.time_loader(path, repeat=repeat)
+    click.echo("{0} documents, {1} loaded with calamus".format(result["documents"], result["fallbacks"]))
+    for name, seconds in result["times"].items():
+        click.echo("{0:<24} {1:>10.3f}s".format(name, seconds))
+    if result["speedup"]:
+        click.echo("{0:<24} {1:>10.2f}x".format("speedup", result["speedup"]))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    cli()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""In-process benchmarks of dataset models."""
+
+import time
+
+
+def dataset_files(count, prefix="data/dataset"):
+    """Return synthetic dataset files."""
+    from renku.core.models.datasets import DatasetFile
+
+    return [DatasetFile(path="{0}/file_{1}".format(prefix, index)) for index in range(count)]
+
+
+def time_dataset_files(count):
+    """Time adding, renaming and unlinking files of a dataset."""
+    from renku.core.models.datasets import Dataset
+
+    files = dataset_files(count)
+    dataset = Dataset(name="benchmark")
+    times = {}
+
+    start = time.perf_counter()
+    dataset.update_files(files)
+    times["update_files"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dataset.update_files(files)
+    times["update_existing_files"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dataset = dataset.rename_files(lambda path: path.replace("data/dataset", "data/renamed", 1))
+    times["rename_files"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dataset.unlink_files(file_.path for file_ in dataset.files[::2])
+    times["unlink_files"] = time.perf_counter() - start
+
+    return {"files": count, "times": times}
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Generate synthetic Renku projects."""
+
+import os
+import shlex
+import subprocess
+import tempfile
+from pathlib import Path
+
+import attr
+
+
+@attr.s
+class ProjectSpec:
+    """Size of a synthetic project."""
+
+    chains = attr.ib(default=2)
+    """Number of chains of steps, each step uses the output of the previous one."""
+
+    chain_length = attr.ib(default=5)
+    """Number of steps in a chain."""
+
+    fan_out = attr.ib(default=5)
+    """Number of steps using the same input."""
+
+    directories = attr.ib(default=1)
+    """Number of steps with a directory output."""
+
+    datasets = attr.ib(default=2)
+    """Number of datasets."""
+
+    files = attr.ib(default=10)
+    """Number of files in each dataset."""
+
+    file_size = attr.ib(default=1024)
+    """Size of dataset files in bytes."""
+
+    lfs_files = attr.ib(default=2)
+    """Number of files in a dataset with files tracked in Git LFS."""
+
+    lfs_file_size = attr.ib(default=200 * 1024)
+    """Size of files tracked in Git LFS, larger than the default LFS threshold."""
+
+    seed = attr.ib(default=0)
+    """Seed of the generated file content."""
+
+
+def renku_command(renku):
+    """Return the command to run Renku as a list."""
+    return shlex.split(renku) if isinstance(renku, str) else list(renku)
+
+
+def call(args, cwd, renku="renku"):
+    """Run a Renku command and raise an error if it fails."""
+    command = renku_command(renku) + list(args)
+    result = subprocess.run(command, cwd=str(cwd), stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    if result.returncode != 0:
+        raise RuntimeError(
+            "Command '{0}' failed:\n{1}".format(" ".join(command), result.stdout.decode("utf-8", "replace"))
+        )
+    return result
+
+
+def git(args, cwd):
+    """Run a Git command."""
+    subprocess.run(["git"] + list(args), cwd=str(cwd), check=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+
+def write_files(directory, count, size, prefix="file", seed=0):
+    """Write files with deterministic content and return their paths."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    paths = []
+    for index in range(count):
+        path = directory / "{0}_{1}.txt".format(prefix, index)
+        line = "{0} {1} {2}\n".format(prefix, index, seed).encode("utf-8")
+        path.write_bytes((line * (size // len(line) + 1))[:size])
+        paths.append(path)
+    return paths
+
+
+def generate(path, spec=None, renku="renku", echo=None):
+    """Create a synthetic project at the given path.
+
+    The project contains chains of steps, steps sharing the same input, steps
+    with directory outputs and datasets. Inputs of the first step of every
+    chain are modified at the end so that the project has outdated outputs.
+    """
+    spec = spec or ProjectSpec()
+    path = Path(path)
+    echo = echo or (lambda message: None)
+
+    path.mkdir(parents=True, exist_ok=True)
+    echo("Creating project in {0}".format(path))
+    call(["init", ".", "--template-id", "python-minimal"], cwd=path, renku=renku)
+
+    inputs = write_files(path / "data" / "inputs", spec.chains + 1, 128, prefix="input", seed=spec.seed)
+    git(["add", "data/inputs"], cwd=path)
+    git(["commit", "-m", "Add inputs"], cwd=path)
+
+    for chain in range(spec.chains):
+        echo("Creating chain {0}".format(chain))
+        previous = os.path.relpath(str(inputs[chain]), str(path))
+        for step in range(spec.chain_length):
+            output = "data/chain_{0}/step_{1}.txt".format(chain, step)
+            (path / output).parent.mkdir(parents=True, exist_ok=True)
+            call(["run", "cp", previous, output], cwd=path, renku=renku)
+            previous = output
+
+    shared = os.path.relpath(str(inputs[-1]), str(path))
+    echo("Creating {0} steps using {1}".format(spec.fan_out, shared))
+    for step in range(spec.fan_out):
+        output = "data/fan_out/output_{0}.txt".format(step)
+        (path / output).parent.mkdir(parents=True, exist_ok=True)
+        call(["run", "cp", shared, output], cwd=path, renku=renku)
+
+    echo("Creating {0} steps with directory outputs".format(spec.directories))
+    for step in range(spec.directories):
+        call(["run", "cp", "-r", "data/inputs", "data/directory_{0}".format(step)], cwd=path, renku=renku)
+
+    with tempfile.TemporaryDirectory() as source:
+        for index in range(spec.datasets):
+            name = "dataset-{0}".format(index)
+            echo("Creating dataset {0} with {1} files".format(name, spec.files))
+            files = write_files(Path(source) / name, spec.files, spec.file_size, seed=spec.seed)
+            call(["dataset", "add", "--create", name] + [str(f) for f in files], cwd=path, renku=renku)
+
+        if spec.lfs_files:
+            echo("Creating dataset large with {0} files".format(spec.lfs_files))
+            files = write_files(Path(source) / "large", spec.lfs_files, spec.lfs_file_size, seed=spec.seed)
+            call(["dataset", "add", "--create", "large"] + [str(f) for f in files], cwd=path, renku=renku)
+
+    write_files(path / "data" / "inputs", spec.chains, 128, prefix="input", seed=spec.seed + 1)
+    git(["add", "data/inputs"], cwd=path)
+    git(["commit", "-m", "Modify inputs"], cwd=path)
+
+    return path
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""In-process benchmark of loading workflow files."""
+
+import time
+from pathlib import Path
+
+
+def workflow_documents(project):
+    """Return parsed workflow files of a project and their schema classes."""
+    from renku.core.models import jsonld
+    from renku.core.models.provenance.activities import ActivitySchema, ProcessRunSchema, WorkflowRunSchema
+
+    documents = []
+    for path in sorted((Path(project) / ".renku" / "workflow").glob("*.yaml")):
+        data = jsonld.read_yaml(path)
+        types = [str(t) for node in data for t in node.get("@type", [])]
+        if any(t.endswith("WorkflowRun") for t in types):
+            schema_class = WorkflowRunSchema
+        elif any(t.endswith("ProcessRun") for t in types):
+            schema_class = ProcessRunSchema
+        else:
+            schema_class = ActivitySchema
+        documents.append((schema_class, data))
+    return documents
+
+
+def time_loader(project, repeat=3):
+    """Time loading workflow files of a project with compiled plans and with calamus.
+
+    Models are created without a client so that times do not include Git
+    calls of their post-initialization.
+    """
+    from renku.core.models import loader
+
+    documents = workflow_documents(project)
+
+    def best(function):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for schema_class, data in documents:
+                function(schema_class, data)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    def plan(schema_class, data):
+        compiled = loader._compile(schema_class)
+        if compiled is not None:
+            try:
+                return loader._Document(data).load(compiled, client=None, commit=None)
+            except loader._Unsupported:
+                pass
+        fallbacks.add(id(data))
+        return schema_class(flattened=True).load(data)
+
+    fallbacks = set()
+    plan_time = best(plan)
+    calamus_time = best(lambda schema_class, data: schema_class(flattened=True).load(data))
+
+    return {
+        "documents": len(documents),
+        "fallbacks": len(fallbacks),
+        "times": {"plan": plan_time, "calamus": calamus_time},
+        "speedup": calamus_time / plan_time if plan_time else None,
+    }
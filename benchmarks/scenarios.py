@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Timed scenarios of Renku commands."""
+
+import datetime
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import attr
+
+from .generator import renku_command, write_files
+
+
+@attr.s
+class Scenario:
+    """A timed Renku command."""
+
+    name = attr.ib()
+    args = attr.ib()
+    """Arguments of the command or a function returning them for a project path and a directory."""
+
+    modifies = attr.ib(default=False)
+    """Whether the command is timed on a fresh copy of the project."""
+
+    def arguments(self, project, tmp):
+        """Return arguments of the command."""
+        return self.args(project, tmp) if callable(self.args) else list(self.args)
+
+
+def _dataset_add(project, tmp):
+    """Return arguments to add new files to a dataset."""
+    files = write_files(Path(tmp) / "new", 10, 1024, prefix="new")
+    return ["dataset", "add", "dataset-0"] + [str(f) for f in files]
+
+
+SCENARIOS = [
+    Scenario("status", ["status"]),
+    Scenario("log", ["log"]),
+    Scenario("update-dry-run", ["update", "--dry-run"]),
+    Scenario("dataset-ls", ["dataset"]),
+    Scenario("dataset-ls-files", ["dataset", "ls-files"]),
+    Scenario("dataset-add", _dataset_add, modifies=True),
+    Scenario("mv", ["mv", "data/chain_0", "data/moved"], modifies=True),
+]
+"""Available scenarios."""
+
+
+def project_info(project):
+    """Return the size of a project."""
+
+    def count(*args):
+        output = subprocess.run(["git"] + list(args), cwd=str(project), stdout=subprocess.PIPE).stdout
+        return len(output.splitlines())
+
+    return {
+        "commits": count("rev-list", "HEAD"),
+        "files": count("ls-files"),
+        "workflows": len(list((Path(project) / ".renku" / "workflow").glob("*.yaml"))),
+        "datasets": len(list((Path(project) / ".renku" / "datasets").glob("*/metadata.yml"))),
+    }
+
+
+def renku_version(renku):
+    """Return the version reported by Renku."""
+    result = subprocess.run(renku_command(renku) + ["--version"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    return result.stdout.decode("utf-8", "replace").strip()
+
+
+def measure(scenario, project, renku="renku", repeat=3, cold=False):
+    """Time a scenario and return its result.
+
+    Times of runs that exit with an error are not included in the statistics;
+    the error output of the last failed run is kept instead.
+    """
+    times, exit_codes = [], []
+    command = error = None
+
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(project)
+            if scenario.modifies:
+                path = Path(tmp) / "project"
+                shutil.copytree(str(project), str(path), symlinks=True)
+            if cold:
+                shutil.rmtree(str(path / ".renku" / "cache"), ignore_errors=True)
+
+            command = scenario.arguments(path, tmp)
+            start = time.perf_counter()
+            result = subprocess.run(
+                renku_command(renku) + command, cwd=str(path), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+            )
+            elapsed = time.perf_counter() - start
+            exit_codes.append(result.returncode)
+            if result.returncode == 0:
+                times.append(elapsed)
+            else:
+                error = result.stderr.decode("utf-8", "replace").strip()
+
+    return {
+        "scenario": scenario.name,
+        "command": command,
+        "exit_codes": exit_codes,
+        "failures": sum(1 for code in exit_codes if code != 0),
+        "error": error,
+        "times": times,
+        "min": min(times) if times else None,
+        "median": statistics.median(times) if times else None,
+        "mean": statistics.mean(times) if times else None,
+    }
+
+
+def failed(result):
+    """Check if any run of a scenario result failed."""
+    return any(code != 0 for code in result.get("exit_codes", [])) or result.get("median") is None
+
+
+def run(project, scenarios=None, renku="renku", repeat=3, cold=False, echo=None):
+    """Time scenarios on a project and return the results."""
+    echo = echo or (lambda message: None)
+    scenarios = scenarios or SCENARIOS
+
+    results = []
+    for scenario in scenarios:
+        echo("Running {0}".format(scenario.name))
+        result = measure(scenario, project, renku=renku, repeat=repeat, cold=cold)
+        if result["failures"]:
+            echo("{0} of {1} runs failed: {2}".format(result["failures"], repeat, result["error"]))
+        results.append(result)
+
+    return {
+        "created": datetime.datetime.utcnow().isoformat(),
+        "renku": renku_version(renku),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "cold": cold,
+        "project": project_info(project),
+        "results": results,
+    }
+
+
+def compare(before, after):
+    """Return median times of scenarios in both results and their ratio.
+
+    Scenarios with failed runs in either result are not compared; their
+    names are returned separately.
+    """
+    previous = {result["scenario"]: result for result in before["results"]}
+
+    rows, failures = [], []
+    for result in after["results"]:
+        if result["scenario"] not in previous:
+            continue
+        old = previous[result["scenario"]]
+        if failed(old) or failed(result):
+            failures.append(result["scenario"])
+            continue
+        ratio = result["median"] / old["median"] if old["median"] else None
+        rows.append((result["scenario"], old["median"], result["median"], ratio))
+    return rows, failures
@@ -190,6 +190,17 @@ symbolic link in renku commands as a normal file. To add an external file pass
 
     $ renku dataset add my-dataset -e /path/to/external/file
 
+Local files are copied in parallel. By default, Renku clones files on file
+systems that support reflinks (e.g. Btrfs or XFS), which takes no extra space,
+and otherwise copies them inside the kernel. Use ``--copy-mode copy`` to always
+make plain copies, ``--copy-mode reflink`` to fail when files cannot be cloned,
+or ``--copy-mode hardlink`` to create hardlinks. Hardlinked files share their
+content with the source, so changing one changes the other:
+
+.. code-block:: console
+
+    $ renku dataset add my-dataset --copy-mode hardlink /scratch/data
+
 Updating a dataset:
 
 After adding files from a remote Git repository, you can check for updates in
@@ -366,7 +377,6 @@ from functools import partial
 
 import click
 import requests
-from tqdm import tqdm
 
 from renku.core.commands.dataset import (
     add_file,
@@ -383,12 +393,12 @@ from renku.core.commands.dataset import (
     tag_dataset_with_client,
     update_datasets,
 )
-from renku.core.commands.echo import WARNING, progressbar
+from renku.core.commands.echo import WARNING, DownloadProgressbar, progressbar
 from renku.core.commands.format.dataset_files import DATASET_FILES_COLUMNS, DATASET_FILES_FORMATS
 from renku.core.commands.format.dataset_tags import DATASET_TAGS_FORMATS
 from renku.core.commands.format.datasets import DATASETS_COLUMNS, DATASETS_FORMATS
 from renku.core.errors import DatasetNotFound, InvalidAccessToken
-from renku.core.management.datasets import DownloadProgressCallback
+from renku.core.utils.file_copy import COPY_MODES
 
 
 def prompt_access_token(exporter):
@@ -519,7 +529,14 @@ def edit(name, title, description, creators, keyword):
     help="Destination file or directory within the dataset path",
 )
 @click.option("--ref", default=None, help="Add files from a specific commit/tag/branch.")
-def add(name, urls, external, force, overwrite, create, sources, destination, ref):
+@click.option(
+    "--copy-mode",
+    type=click.Choice(COPY_MODES),
+    default="auto",
+    show_default=True,
+    help="How to copy local files: auto, copy, reflink or hardlink.",
+)
+def add(name, urls, external, force, overwrite, create, sources, destination, ref, copy_mode):
     """Add data to a dataset."""
     progress = partial(progressbar, label="Adding data to dataset")
     add_file(
@@ -533,8 +550,9 @@ def add(name, urls, external, force, overwrite, create, sources, destination, re
         destination=destination,
         ref=ref,
         urlscontext=progress,
-        progress=_DownloadProgressbar,
+        progress=DownloadProgressbar,
         interactive=True,
+        copy_mode=copy_mode,
     )
     click.secho("OK", fg="green")
 
@@ -654,34 +672,11 @@ def import_(uri, name, extract, yes):
 
     Supported providers: [Dataverse, Renku, Zenodo]
     """
-    import_dataset(uri=uri, name=name, extract=extract, with_prompt=True, yes=yes, progress=_DownloadProgressbar)
+    import_dataset(uri=uri, name=name, extract=extract, with_prompt=True, yes=yes, progress=DownloadProgressbar)
     click.secho(" " * 79 + "\r", nl=False)
     click.secho("OK", fg="green")
 
 
-class _DownloadProgressbar(DownloadProgressCallback):
-    def __init__(self, description, total_size):
-        """Default initializer."""
-        self._progressbar = tqdm(
-            total=total_size,
-            unit="iB",
-            unit_scale=True,
-            desc=description,
-            leave=False,
-            bar_format="{desc:.32}: {percentage:3.0f}%|{bar}{r_bar}",
-        )
-
-    def update(self, size):
-        """Update the status."""
-        if self._progressbar:
-            self._progressbar.update(size)
-
-    def finalize(self):
-        """Called once when the download is finished."""
-        if self._progressbar:
-            self._progressbar.close()
-
-
 @dataset.command("update")
 @click.argument("names", nargs=-1)
 @click.option(
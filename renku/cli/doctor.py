@@ -20,14 +20,19 @@ import textwrap
 
 import click
 
-from renku.core.commands.doctor import DOCTOR_INFO, doctor_check
+from renku.core.commands.doctor import DOCTOR_INFO, doctor_check, rebuild_activity_index
 
 
 @click.command()
+@click.option("--fix", is_flag=True, help="Rebuild the activity index from the project history.")
 @click.pass_context
-def doctor(ctx):
+def doctor(ctx, fix):
     """Check your system and repository for potential problems."""
     click.secho("\n".join(textwrap.wrap(DOCTOR_INFO)) + "\n", bold=True)
+    if fix:
+        rebuild_activity_index()
+        click.secho("Activity index was rebuilt.\n", fg="green")
+
     is_ok, problems = doctor_check()
 
     if is_ok:
@@ -80,6 +80,15 @@ valid, as well as printing detailed information on all the issues found.
 The ``--strict`` option is only supported for the ``jsonld``, ``rdf`` and
 ``nt`` output formats.
 
+Parallel processing
+~~~~~~~~~~~~~~~~~~~
+
+Reading the history of large projects can be sped up by building activities
+of independent commits in several processes using the ``--jobs <number>``
+option. The number of processes for all commands that read the history can
+be set with the ``RENKU_GRAPH_WORKERS`` environment variable. The output does
+not depend on the number of processes.
+
 """
 
 import click
@@ -93,8 +102,11 @@ from renku.core.commands.graph import build_graph
 @click.option("--format", type=click.Choice(FORMATS), default="ascii", help="Choose an output format.")
 @click.option("--no-output", is_flag=True, default=False, help="Display commands without output files.")
 @click.option("--strict", is_flag=True, default=False, help="Validate triples before output.")
+@click.option(
+    "-j", "--jobs", type=click.IntRange(min=1), default=None, help="Number of processes used to read the history."
+)
 @click.argument("paths", type=click.Path(exists=False), nargs=-1)
-def log(revision, format, no_output, strict, paths):
+def log(revision, format, no_output, strict, jobs, paths):
     """Show logs for a file."""
-    graph = build_graph(revision, no_output, paths)
+    graph = build_graph(revision, no_output, paths, jobs=jobs)
     FORMATS[format](graph, strict=strict)
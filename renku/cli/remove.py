@@ -72,8 +72,8 @@ def remove(ctx, client, sources):
                     remove.append(key)
 
             if remove:
+                dataset.unlink_files(remove)
                 for key in remove:
-                    dataset.unlink_file(key)
                     client.remove_file(client.path / key)
 
                 dataset.to_yaml()
@@ -39,6 +39,12 @@ Recreate a specific output file by running:
 If you would like to recreate a file which was one of several produced by
 a tool, then these files must be recreated as well. See the explanation in
 :ref:`updating siblings <cli-update-with-siblings>`.
+
+Independent steps can be run at the same time using the ``--jobs <number>``
+option in the same way as for :ref:`cli-update`. The ``--cwl`` option runs
+the workflow with ``cwltool`` instead of directly in the working directory.
+A failed execution can be continued with ``--resume`` which skips steps that
+already finished.
 """
 
 import os
@@ -49,13 +55,15 @@ from pathlib import Path
 import click
 from git import Actor
 
+from renku.core import errors
+from renku.core.commands import cwl_runner
 from renku.core.commands.client import pass_local_client
-from renku.core.commands.cwl_runner import execute
+from renku.core.commands.echo import DownloadProgressbar
 from renku.core.commands.graph import Graph
-from renku.core.commands.options import option_siblings
+from renku.core.commands.native_runner import record_execution
+from renku.core.commands.options import option_runner, option_siblings
 from renku.core.models.locals import with_reference
 from renku.core.models.provenance.activities import ProcessRun, WorkflowRun
-from renku.core.models.workflow.converters.cwl import CWLConverter
 from renku.version import __version__, version_url
 
 
@@ -98,14 +106,22 @@ def edit_inputs(client, workflow):
 @click.option(
     "--edit-inputs", "inputs", flag_value=edit_inputs, help=edit_inputs.__doc__,
 )
+@option_runner
+@click.option(
+    "-j", "--jobs", type=click.IntRange(min=1), default=None, help="Number of workflow steps run at the same time."
+)
+@click.option("--resume", is_flag=True, default=False, help="Skip steps that finished in a failed rerun.")
 @click.argument(
     "paths", type=click.Path(exists=True, dir_okay=True), nargs=-1, required=True,
 )
 @pass_local_client(
     clean=True, requires_migration=True, commit=True,
 )
-def rerun(client, revision, roots, siblings, inputs, paths):
+def rerun(client, revision, roots, siblings, inputs, runner, jobs, resume, paths):
     """Recreate files generated by a sequence of ``run`` commands."""
+    if resume and runner is cwl_runner.execute_workflow:
+        raise errors.UsageError("Cannot use --resume with --cwl.")
+
     graph = Graph(client)
     outputs = graph.build(paths=paths, revision=revision)
 
@@ -122,20 +138,16 @@ def rerun(client, revision, roots, siblings, inputs, paths):
     # NOTE The workflow creation is done before opening a new file.
     workflow = inputs(client, graph.as_workflow(input_paths=roots, output_paths=output_paths, outputs=outputs,))
 
-    wf, path = CWLConverter.convert(workflow, client)
-
     # Don't compute paths if storage is disabled.
     if client.check_external_storage():
         # Make sure all inputs are pulled from a storage.
         paths_ = (i.consumes.path for i in workflow.inputs)
-        client.pull_paths_from_storage(*paths_)
+        client.pull_paths_from_storage(*paths_, progress=DownloadProgressbar)
 
     # Execute the workflow and relocate all output files.
     # FIXME get new output paths for edited tools
     # output_paths = {path for _, path in workflow.iter_output_files()}
-    execute(
-        client, path, output_paths=output_paths,
-    )
+    execution = runner(client, workflow, output_paths=output_paths, jobs=jobs, resume=resume)
 
     paths = [o.produces.path for o in workflow.outputs]
 
@@ -159,5 +171,7 @@ def rerun(client, revision, roots, siblings, inputs, paths):
     with with_reference(path):
         cls = WorkflowRun if workflow.subprocesses else ProcessRun
         run = cls.from_run(workflow, client, path)
+        if execution:
+            record_execution(run, execution)
         run.to_yaml()
         client.add_to_activity_index(run)
@@ -127,6 +127,30 @@ those paths. Therefore:
     passed as explicit output are considered to be outputs and those passed via
     command arguments are ignored.
 
+.. topic:: Faster output detection (``--output-detection``)
+
+    By default, outputs are found by comparing the status of the Git
+    repository before and after the command, which is slow in repositories
+    with many files. ``--output-detection snapshot`` compares the size and
+    modification time of files in the working directory, in directories
+    passed as arguments and in directories of explicit outputs and
+    redirected streams instead. ``--output-detection inotify`` watches all
+    directories of the repository for written files on Linux. Only the files
+    found this way are checked with Git. If no changed file is found, the
+    whole repository is checked as before. Set a default mode with
+    ``renku config output_detection snapshot``.
+
+    With ``snapshot``, files written to other directories are not detected
+    as long as some other output is found.
+
+.. topic:: Large input directories (``--lazy-directories``)
+
+    A directory passed as an input is recorded together with all files it
+    contains. For directories with many files, ``--lazy-directories`` records
+    only the hash of the Git tree of the directory. Its files are read from
+    the tree when they are needed, e.g. by ``renku update`` or ``renku log``.
+    Set it as default with ``renku config lazy_directories True``.
+
 .. cli-run-std
 
 Detecting standard streams
@@ -179,6 +203,23 @@ with ``--success-code=<INT>`` parameter.
 
    $ renku run --success-code=1 --no-output fail
 
+Resource usage
+~~~~~~~~~~~~~~
+
+Renku measures the resources used by the command: wall time, user and system
+CPU time, peak memory and the number of bytes read and written. They are
+stored as an annotation of the activity so that expensive steps of a workflow
+can be found later. The same measurements are recorded for every step that
+``renku update`` and ``renku rerun`` execute without ``--cwl``.
+
+The number of CPUs that the command uses can be recorded with ``--cpus``.
+``renku workflow execute`` uses it to decide how many steps run at the same
+time.
+
+.. code-block:: console
+
+   $ renku run --cpus 4 python train.py data.csv model.pkl
+
 .. _circular-dependencies:
 
 Circular Dependencies
@@ -201,15 +242,16 @@ directories, respectively.
 
 import os
 import sys
-from subprocess import call
 
 import click
 
 from renku.core import errors
 from renku.core.commands.client import pass_local_client
+from renku.core.commands.echo import DownloadProgressbar
 from renku.core.commands.options import option_isolation
 from renku.core.management.git import get_mapped_std_streams
-from renku.core.models.cwl.command_line_tool import CommandLineToolFactory
+from renku.core.models.cwl.command_line_tool import OUTPUT_DETECTION_MODES, CommandLineToolFactory
+from renku.core.utils import resource_usage
 
 
 @click.command(context_settings=dict(ignore_unknown_options=True,))
@@ -228,6 +270,21 @@ from renku.core.models.cwl.command_line_tool import CommandLineToolFactory
 @click.option(
     "--no-output-detection", is_flag=True, default=False, help="Disable auto-detection of outputs.",
 )
+@click.option(
+    "--output-detection",
+    type=click.Choice(OUTPUT_DETECTION_MODES),
+    default=None,
+    help="How to find outputs: git (default), snapshot or inotify.",
+)
+@click.option(
+    "--lazy-directories",
+    is_flag=True,
+    default=None,
+    help="Record input directories by their Git tree instead of their files.",
+)
+@click.option(
+    "--cpus", type=click.IntRange(min=1), default=None, help="Number of CPUs used by the command.",
+)
 @click.option(
     "--success-code",
     "success_codes",
@@ -248,6 +305,9 @@ def run(
     no_output,
     no_input_detection,
     no_output_detection,
+    output_detection,
+    lazy_directories,
+    cpus,
     success_codes,
     isolation,
     command_line,
@@ -311,6 +371,9 @@ def run(
             working_dir=working_dir,
             no_input_detection=no_input_detection,
             no_output_detection=no_output_detection,
+            output_detection=output_detection,
+            lazy_directories=lazy_directories or None,
+            cpus=cpus,
             successCodes=success_codes,
             **{name: os.path.relpath(path, working_dir) for name, path in mapped_std.items()},
         )
@@ -320,7 +383,9 @@ def run(
                 if client.check_external_storage():
                     # Make sure all inputs are pulled from a storage.
                     paths_ = (path for _, path in tool.iter_input_files(client.workflow_path))
-                    client.pull_paths_from_storage(*paths_)
+                    # NOTE: Show progress only on a terminal that is not a mapped stream of the command.
+                    show_progress = not stderr_redirected and sys.stderr.isatty()
+                    client.pull_paths_from_storage(*paths_, progress=DownloadProgressbar if show_progress else None)
 
                 if tty_exists:
                     # apply original output redirection
@@ -329,9 +394,10 @@ def run(
                     if stderr_redirected:
                         sys.stderr = old_stderr
 
-                return_code = call(
-                    factory.command_line, cwd=os.getcwd(), **{key: getattr(sys, key) for key in mapped_std.keys()},
-                )
+                with tool.timed():
+                    return_code, tool.resource_usage = resource_usage.call(
+                        factory.command_line, cwd=os.getcwd(), **{key: getattr(sys, key) for key in mapped_std.keys()},
+                    )
 
                 sys.stdout.flush()
                 sys.stderr.flush()
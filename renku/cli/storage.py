@@ -54,7 +54,7 @@ import os
 import click
 
 from renku.core.commands.client import pass_local_client
-from renku.core.commands.echo import WARNING
+from renku.core.commands.echo import WARNING, DownloadProgressbar
 
 
 @click.group()
@@ -69,7 +69,7 @@ def storage():
 @pass_local_client
 def pull(client, paths):
     """Pull the specified paths from external storage."""
-    client.pull_paths_from_storage(*paths)
+    client.pull_paths_from_storage(*paths, progress=DownloadProgressbar)
 
 
 @storage.command()
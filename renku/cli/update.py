@@ -115,34 +115,154 @@ The following commands will produce the same result.
    $ renku update --with-siblings C
    $ renku update B C D
 
+Parallel execution
+~~~~~~~~~~~~~~~~~~
+
+Steps of the update workflow that do not depend on each other can be run at
+the same time using the ``--jobs <number>`` option. A step is started only
+after all steps generating its inputs are finished. The updated files, the
+commit and the recorded workflow are the same as in a serial update.
+
+.. code-block:: console
+
+   $ renku update --jobs 4
+
+Execution engine
+~~~~~~~~~~~~~~~~
+
+By default the steps are run directly in the working directory with the same
+command lines that were recorded by ``renku run``. Outputs are written in
+place, and if a step fails all outputs are restored to their previous
+versions. Use the ``--cwl`` option to convert the workflow to CWL and run it
+with ``cwltool`` in a temporary directory instead.
+
+.. code-block:: console
+
+   $ renku update --cwl
+
+Reusing results
+~~~~~~~~~~~~~~~
+
+A step is not run again if the project history already contains an execution
+of the same command with the same input files and the same environment files
+(``Dockerfile``, ``requirements.txt``, ``environment.yml`` or ``install.R``).
+Its outputs are restored from Git or from the Git LFS cache and the reused
+execution is recorded as an annotation of the step. For example, reverting an
+input file to an earlier version and running ``renku update`` restores the
+outputs that were generated from that version. Use ``--no-reuse`` to run all
+steps. Results are only reused by the default runner.
+
+Resuming an update
+~~~~~~~~~~~~~~~~~~
+
+The outputs of every step are saved in the Git object database as soon as the
+step finishes. If a step fails, the working directory is restored and the
+number of saved steps is shown. Fix the problem and run the update again with
+``--resume`` to restore outputs of the finished steps instead of running them.
+Their start and end times and resource usage are recorded as if they were run
+by the resumed update. A step is only skipped if its command line and inputs
+are unchanged.
+
+.. code-block:: console
+
+   $ renku update
+   ...
+   Outputs of 36 finished steps were saved, use --resume to continue.
+   $ renku update --resume
+
+Planning an update
+~~~~~~~~~~~~~~~~~~
+
+Use ``--dry-run`` to see which steps would be run without changing anything.
+The steps are listed in execution order with their inputs and outputs. The
+runtime of each step is estimated from the start and end times of earlier
+executions of the same command. The total size of inputs that are not yet
+pulled from Git LFS is shown as well.
+
+.. code-block:: console
+
+   $ renku update --dry-run
+   Steps to run:
+
+   1. wc -c < source.txt > result.txt
+      Inputs:  source.txt
+      Outputs: result.txt
+      Estimated time: 2.1s (from 3 earlier runs)
+
+   Estimated time: 2.1s
+   Git LFS data to pull: 0 B in 0 files
+
 """
 
+import datetime
 import sys
 import uuid
 
 import click
 from git import Actor
 
+from renku.core import errors
+from renku.core.commands import cwl_runner
 from renku.core.commands.client import pass_local_client
-from renku.core.commands.cwl_runner import execute
+from renku.core.commands.dry_run import plan_workflow
+from renku.core.commands.echo import DownloadProgressbar
 from renku.core.commands.graph import Graph, _safe_path
-from renku.core.commands.options import option_siblings
+from renku.core.commands.native_runner import record_execution
+from renku.core.commands.options import option_runner, option_siblings
 from renku.core.models.locals import with_reference
 from renku.core.models.provenance.activities import ProcessRun, WorkflowRun
-from renku.core.models.workflow.converters.cwl import CWLConverter
+from renku.core.utils.file_size import format_file_size
 from renku.version import __version__, version_url
 
 
+def _format_duration(seconds):
+    """Format a duration in seconds."""
+    if seconds < 60:
+        return "{0:.1f}s".format(seconds)
+    return str(datetime.timedelta(seconds=int(round(seconds))))
+
+
+def _print_plan(plan):
+    """Print steps of a workflow and their estimated cost."""
+    click.echo("Steps to run:\n")
+    for index, step in enumerate(plan.steps, start=1):
+        click.echo("{0}. {1}".format(index, click.style(step.command, bold=True)))
+        click.echo("   Inputs:  {0}".format(", ".join(step.inputs) or "-"))
+        click.echo("   Outputs: {0}".format(", ".join(step.outputs) or "-"))
+        if step.estimate is None:
+            click.echo("   Estimated time: unknown")
+        else:
+            click.echo(
+                "   Estimated time: {0} (from {1} earlier runs)".format(
+                    _format_duration(step.estimate), len(step.durations)
+                )
+            )
+
+    unknown = " ({0} of {1} steps without earlier runs)".format(len(plan.unknown), len(plan.steps))
+    click.echo("\nEstimated time: {0}{1}".format(_format_duration(plan.estimate), unknown if plan.unknown else ""))
+    click.echo("Git LFS data to pull: {0} in {1} files".format(format_file_size(plan.lfs_size), len(plan.lfs_sizes)))
+
+
 @click.command()
 @click.option("--revision", default="HEAD")
 @click.option("--no-output", is_flag=True, default=False, help="Display commands without output files.")
 @option_siblings
+@option_runner
+@click.option(
+    "-j", "--jobs", type=click.IntRange(min=1), default=None, help="Number of workflow steps run at the same time."
+)
+@click.option("--no-reuse", is_flag=True, default=False, help="Run steps even if their results are already known.")
+@click.option("--dry-run", is_flag=True, default=False, help="Show steps to run and their estimated cost and exit.")
+@click.option("--resume", is_flag=True, default=False, help="Skip steps that finished in a failed update.")
 @click.argument("paths", type=click.Path(exists=True, dir_okay=True), nargs=-1)
 @pass_local_client(
     clean=True, requires_migration=True, commit=True,
 )
-def update(client, revision, no_output, siblings, paths):
+def update(client, revision, no_output, siblings, runner, jobs, no_reuse, dry_run, resume, paths):
     """Update existing files by rerunning their outdated workflow."""
+    if resume and runner is cwl_runner.execute_workflow:
+        raise errors.UsageError("Cannot use --resume with --cwl.")
+
     graph = Graph(client)
     outputs = graph.build(revision=revision, can_be_cwl=no_output, paths=paths)
     outputs = {node for node in outputs if graph.need_update(node)}
@@ -160,14 +280,17 @@ def update(client, revision, no_output, siblings, paths):
     # Store the generated workflow used for updating paths.
     workflow = graph.as_workflow(input_paths=input_paths, output_paths=output_paths, outputs=outputs,)
 
-    wf, path = CWLConverter.convert(workflow, client)
+    if dry_run:
+        _print_plan(plan_workflow(client, workflow))
+        sys.exit(0)
+
     # Don't compute paths if storage is disabled.
     if client.check_external_storage():
         # Make sure all inputs are pulled from a storage.
         paths_ = (i.consumes.path for i in workflow.inputs)
-        client.pull_paths_from_storage(*paths_)
+        client.pull_paths_from_storage(*paths_, progress=DownloadProgressbar)
 
-    execute(client, path, output_paths=output_paths)
+    execution = runner(client, workflow, output_paths=output_paths, jobs=jobs, reuse=not no_reuse, resume=resume)
 
     paths = [o.produces.path for o in workflow.outputs]
 
@@ -191,5 +314,7 @@ def update(client, revision, no_output, siblings, paths):
     with with_reference(path):
         cls = WorkflowRun if workflow.subprocesses else ProcessRun
         run = cls.from_run(run=workflow, client=client, path=path, update_commits=True)
+        if execution:
+            record_execution(run, execution)
         run.to_yaml()
         client.add_to_activity_index(run)
@@ -28,16 +28,49 @@ names may be cumbersome. The names can be added to the last executed
 ``run``, ``rerun`` or ``update`` command by running
 ``renku workflow set-name <name>``. The name can be added to an arbitrary
 file in ``.renku/workflow/*.cwl`` anytime later.
+
+Executing workflows
+~~~~~~~~~~~~~~~~~~~
+
+A workflow recorded by ``run``, ``rerun`` or ``update`` can be executed
+again with ``renku workflow execute <name>`` where ``<name>`` is a name set
+with ``set-name`` or a path to a file in ``.renku/workflow``. The steps of
+the workflow are run again on the current versions of its inputs and a
+single workflow run is recorded.
+
+Steps are started as soon as their inputs are generated, up to ``--jobs``
+steps at the same time. A step recorded with ``renku run --cpus <number>``
+only starts when that many CPUs are free out of the ``--cpus`` budget of the
+execution; smaller ready steps are started in the meantime. Both default to
+the number of CPUs of the machine.
+
+.. code-block:: console
+
+   $ renku workflow set-name training
+   $ renku workflow execute --cpus 8 training
+
+Standard output and error of steps that are not redirected to files are
+written to ``.renku/logs/<execution>/<step>.log``. The logs are not committed.
 """
 
+import datetime
+import os
+import uuid
 from collections import defaultdict
 from pathlib import Path
 
 import click
+from git import Actor
 
 from renku.core.commands.client import pass_local_client
+from renku.core.commands.echo import DownloadProgressbar
 from renku.core.commands.graph import Graph
+from renku.core.commands.native_runner import execute as execute_workflow
+from renku.core.commands.native_runner import record_execution
+from renku.core.models.locals import with_reference
+from renku.core.models.provenance.activities import Activity, ProcessRun, WorkflowRun
 from renku.core.models.workflow.converters.cwl import CWLConverter
+from renku.version import __version__, version_url
 
 # TODO: Finish refactoring (ticket #703)
 
@@ -157,3 +190,106 @@ def create(client, output_file, revision, paths):
 
     if not output_file:
         click.echo(wf.export_string())
+
+
+def _workflow_path(client, value):
+    """Return path of a workflow given by its name or path."""
+    from renku.core.models.refs import LinkReference
+
+    if os.path.isfile(value):
+        return Path(value)
+
+    try:
+        path = LinkReference(client=client, name=_ref(value)).reference
+    except ValueError:
+        path = None
+    if not path or not path.is_file():
+        raise click.BadParameter('No workflow named "{0}" was found.'.format(value))
+    return path
+
+
+def _log_dir(client):
+    """Create a directory for logs of an execution."""
+    logs = client.renku_path / "logs"
+    logs.mkdir(parents=True, exist_ok=True)
+    ignore = logs / ".gitignore"
+    if not ignore.exists():
+        ignore.write_text("*\n")
+
+    name = "{0}-{1}".format(datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%S"), uuid.uuid4().hex[:8])
+    path = logs / name
+    path.mkdir()
+    return path
+
+
+@workflow.command()
+@click.argument("name", metavar="<name|path>")
+@click.option(
+    "-j", "--jobs", type=click.IntRange(min=1), default=None, help="Number of workflow steps run at the same time."
+)
+@click.option("--cpus", type=click.IntRange(min=1), default=None, help="Number of CPUs used by all running steps.")
+@click.option("--no-reuse", is_flag=True, default=False, help="Run steps even if their results are already known.")
+@click.option("--resume", is_flag=True, default=False, help="Skip steps that finished in a failed execution.")
+@pass_local_client(
+    clean=True, requires_migration=True, commit=True,
+)
+def execute(client, name, jobs, cpus, no_reuse, resume):
+    """Execute steps of the workflow <name> again."""
+    path = _workflow_path(client, name)
+    activity = Activity.from_yaml(path, client=client)
+    if not isinstance(activity, ProcessRun) or not activity.association:
+        raise click.BadParameter('"{0}" is not a workflow.'.format(name))
+
+    plan = activity.association.plan
+    input_paths = {i.consumes.path for i in plan.inputs}
+    output_paths = {o.produces.path for o in plan.outputs}
+
+    # NOTE Build a new workflow from the current history so that the steps
+    # use current versions of their inputs.
+    graph = Graph(client)
+    outputs = graph.build(paths=output_paths, revision="HEAD")
+    workflow = graph.as_workflow(input_paths=input_paths, output_paths=output_paths, outputs=outputs)
+
+    if client.check_external_storage():
+        client.pull_paths_from_storage(*(i.consumes.path for i in workflow.inputs), progress=DownloadProgressbar)
+
+    cpu_count = os.cpu_count() or 1
+    log_dir = _log_dir(client)
+    click.echo("Writing logs to {0}".format(log_dir.relative_to(client.path)))
+
+    execution = execute_workflow(
+        client,
+        workflow,
+        output_paths=output_paths,
+        jobs=jobs or cpu_count,
+        reuse=not no_reuse,
+        resume=resume,
+        cpus=cpus or cpu_count,
+        log_dir=str(log_dir),
+    )
+
+    paths = [o.produces.path for o in workflow.outputs]
+
+    client.repo.git.add(*paths)
+
+    if client.repo.is_dirty():
+        commit_msg = "renku workflow execute: committing {} newly added files".format(len(paths))
+
+        committer = Actor("renku {0}".format(__version__), version_url)
+
+        client.repo.index.commit(
+            commit_msg, committer=committer, skip_hooks=True,
+        )
+
+    workflow_name = "{0}_execute.yaml".format(uuid.uuid4().hex)
+
+    path = client.workflow_path / workflow_name
+
+    workflow.update_id_and_label_from_commit_path(client, client.repo.head.commit, path)
+
+    with with_reference(path):
+        cls = WorkflowRun if workflow.subprocesses else ProcessRun
+        run = cls.from_run(run=workflow, client=client, path=path, update_commits=True)
+        record_execution(run, execution)
+        run.to_yaml()
+        client.add_to_activity_index(run)
@@ -17,6 +17,7 @@
 # limitations under the License.
 """Define repository checks for :program:`renku doctor`."""
 
+from .activity_index import check_activity_index
 from .datasets import check_dataset_metadata, check_missing_files
 from .external import check_missing_external_files
 from .githooks import check_git_hooks_installed
@@ -37,4 +38,5 @@ __all__ = (
     "check_datasets_structure",
     "check_missing_external_files",
     "check_lfs_info",
+    "check_activity_index",
 )
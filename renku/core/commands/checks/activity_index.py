@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Check consistency of the activity index."""
+import click
+
+from ..echo import WARNING
+
+
+def check_activity_index(client):
+    """Find missing or stale entries of the activity index."""
+    if not client.workflow_path.exists() or not any(client.workflow_path.glob("*.yaml")):
+        return True, None
+
+    if not client.activity_index.exists():
+        problems = WARNING + "The activity index is missing." '\n  (use "renku doctor --fix" to rebuild it)\n'
+        return False, problems
+
+    missing = sorted(path for path in client.activity_index.activities if not (client.path / path).exists())
+
+    if not missing:
+        return True, None
+
+    problems = (
+        WARNING + "The activity index refers to missing workflow files."
+        '\n  (use "renku doctor --fix" to rebuild it)\n\n\t'
+        + "\n\t".join(click.style(path, fg="yellow") for path in missing)
+        + "\n"
+    )
+    return False, problems
@@ -23,18 +23,37 @@ import sys
 
 import click
 
-from renku.core.errors import WorkflowRerunError
+from renku.core.errors import UsageError, WorkflowRerunError
 
 from .echo import progressbar
 
 
-def execute(client, output_file, output_paths=None):
-    """Run the generated workflow using cwltool library."""
+def execute_workflow(client, workflow, output_paths=None, jobs=None, reuse=False, resume=False):
+    """Convert the workflow to CWL and run it using cwltool library.
+
+    Results of earlier executions are never reused and executions cannot be
+    resumed; all steps are run.
+    """
+    if resume:
+        raise UsageError("Cannot resume a workflow executed with cwltool.")
+
+    from renku.core.models.workflow.converters.cwl import CWLConverter
+
+    _, path = CWLConverter.convert(workflow, client)
+    execute(client, path, output_paths=output_paths, jobs=jobs)
+
+
+def execute(client, output_file, output_paths=None, jobs=None):
+    """Run the generated workflow using cwltool library.
+
+    :param jobs: number of workflow steps executed at the same time
+    """
     output_paths = output_paths or set()
 
     import cwltool.factory
     from cwltool import workflow
     from cwltool.context import LoadingContext, RuntimeContext
+    from cwltool.executors import MultithreadedJobExecutor
     from cwltool.utils import visit_class
 
     def construct_tool_object(toolpath_object, *args, **kwargs):
@@ -57,7 +76,15 @@ def execute(client, output_file, output_paths=None):
     )
     loading_context = LoadingContext(kwargs={"construct_tool_object": construct_tool_object,})
 
-    factory = cwltool.factory.Factory(loading_context=loading_context, runtime_context=runtime_context,)
+    executor = None
+    if jobs and jobs > 1:
+        executor = MultithreadedJobExecutor()
+        # NOTE: Steps without resource requirements are scheduled with one core each.
+        executor.max_cores = float(jobs)
+
+    factory = cwltool.factory.Factory(
+        executor=executor, loading_context=loading_context, runtime_context=runtime_context,
+    )
     process = factory.make(os.path.relpath(str(output_file)))
     try:
         outputs = process()
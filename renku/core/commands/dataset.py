@@ -48,7 +48,10 @@ from .format.datasets import DATASETS_FORMATS
 @pass_local_client(clean=False, commit=False)
 def list_datasets(client, revision=None, format=None, columns=None):
     """Handle datasets sub commands."""
-    if revision is None:
+    if revision is None and format == "tabular":
+        # NOTE: Summaries have all attributes shown in tables.
+        datasets = client.datasets.summaries()
+    elif revision is None:
         datasets = client.datasets.values()
     else:
         datasets = client.datasets_from_commit(client.repo.commit(revision))
@@ -165,6 +168,7 @@ def add_file(
     commit_message=None,
     progress=None,
     interactive=False,
+    copy_mode="auto",
 ):
     """Add data file to a dataset."""
     _add_to_dataset(
@@ -182,6 +186,7 @@ def add_file(
         urlscontext=urlscontext,
         progress=progress,
         interactive=interactive,
+        copy_mode=copy_mode,
     )
 
 
@@ -205,6 +210,8 @@ def _add_to_dataset(
     progress=None,
     interactive=False,
     total_size=None,
+    copy_mode="auto",
+    checksums=None,
 ):
     """Add data to a dataset."""
     if len(urls) == 0:
@@ -246,6 +253,8 @@ def _add_to_dataset(
                     all_at_once=all_at_once,
                     destination_names=destination_names,
                     progress=progress,
+                    copy_mode=copy_mode,
+                    checksums=checksums,
                 )
 
             if messages:
@@ -326,8 +335,7 @@ def file_unlink(client, name, include, exclude, interactive=False, yes=False, co
         )
         click.confirm(WARNING + prompt_text, abort=True)
 
-    for item in records:
-        dataset.unlink_file(item.path)
+    dataset.unlink_files(item.path for item in records)
 
     dataset.to_yaml()
 
@@ -538,7 +546,7 @@ def import_dataset(
         if is_doi(dataset.identifier):
             dataset.same_as = Url(url_str=urllib.parse.urljoin("https://doi.org", dataset.identifier))
 
-        urls, names = zip(*[(f.source, f.filename) for f in files])
+        urls, names, checksums = zip(*[(f.source, f.filename, f.checksum) for f in files])
 
         _add_to_dataset(
             client,
@@ -550,6 +558,7 @@ def import_dataset(
             extract=extract,
             all_at_once=True,
             destination_names=names,
+            checksums=checksums,
             progress=progress,
             interactive=with_prompt,
             total_size=total_size,
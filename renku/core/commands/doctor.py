@@ -20,6 +20,7 @@ import traceback
 
 from renku.core.commands.client import pass_local_client
 from renku.core.commands.echo import ERROR
+from renku.core.management.repository import ACTIVITY_INDEX_PATHS
 
 DOCTOR_INFO = """\
 Please note that the diagnosis report is used to help Renku maintainers with
@@ -50,3 +51,14 @@ def doctor_check(client):
             problems.append(problems_)
 
     return is_ok, "\n".join(problems)
+
+
+@pass_local_client(clean=False, commit=True, commit_only=ACTIVITY_INDEX_PATHS, commit_empty=False)
+def rebuild_activity_index(client):
+    """Recreate the activity index from the project history."""
+    client.rebuild_activity_index()
+
+    # NOTE: Stage removal of the legacy index since commit only adds existing paths.
+    for path in ACTIVITY_INDEX_PATHS:
+        if not (client.path / path).exists():
+            client.repo.git.rm("--cached", "--ignore-unmatch", "--quiet", str(path))
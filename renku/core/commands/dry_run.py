@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Plan the execution of a workflow without running it."""
+
+import statistics
+
+import attr
+
+from renku.core.commands.native_runner import workflow_steps
+from renku.core.management.step_cache import run_command_line
+from renku.core.models.provenance.activities import WorkflowRun
+from renku.core.utils.datetime8601 import parse_date
+
+
+@attr.s
+class PlannedStep:
+    """A step of a workflow with runtimes of its earlier executions."""
+
+    run = attr.ib()
+
+    durations = attr.ib(factory=list)
+    """Runtimes of earlier executions in seconds."""
+
+    @property
+    def command(self):
+        """Return command line of the step."""
+        return " ".join(self.run.to_argv()) + "".join(self.run.to_stream_repr())
+
+    @property
+    def inputs(self):
+        """Return input paths."""
+        return [i.consumes.path for i in self.run.inputs]
+
+    @property
+    def outputs(self):
+        """Return output paths."""
+        return [o.produces.path for o in self.run.outputs]
+
+    @property
+    def estimate(self):
+        """Return the estimated runtime in seconds or ``None``."""
+        return statistics.median(self.durations) if self.durations else None
+
+
+@attr.s
+class WorkflowPlan:
+    """Steps of a workflow in execution order and data to pull from Git LFS."""
+
+    steps = attr.ib()
+
+    lfs_sizes = attr.ib(factory=dict)
+    """Sizes of inputs that have to be pulled from Git LFS."""
+
+    @property
+    def estimate(self):
+        """Return the sum of estimated runtimes of steps with known runtime."""
+        return sum(step.estimate for step in self.steps if step.estimate is not None)
+
+    @property
+    def unknown(self):
+        """Return steps without a runtime estimate."""
+        return [step for step in self.steps if step.estimate is None]
+
+    @property
+    def lfs_size(self):
+        """Return the number of bytes to pull from Git LFS."""
+        return sum(self.lfs_sizes.values())
+
+
+def _duration(process_run):
+    """Return runtime of an execution in seconds or ``None`` if unknown."""
+    if any(a._id.endswith("/annotations/reused") for a in process_run.annotations or []):
+        return None
+
+    started = parse_date(process_run.started_at_time)
+    ended = parse_date(process_run.ended_at_time)
+    if started and ended and ended > started:
+        return (ended - started).total_seconds()
+
+
+def previous_durations(client, run):
+    """Return runtimes of earlier executions of the same command."""
+    command = run_command_line(run)
+    durations = []
+
+    for activity in client.activities_for_paths([o.produces.path for o in run.outputs]):
+        process_runs = activity.subprocesses.values() if isinstance(activity, WorkflowRun) else [activity]
+        for process_run in process_runs:
+            if not process_run.association or run_command_line(process_run.association.plan) != command:
+                continue
+            duration = _duration(process_run)
+            if duration is not None:
+                durations.append(duration)
+
+    return durations
+
+
+def plan_workflow(client, workflow):
+    """Return steps of a workflow with their estimated runtime."""
+    steps = [PlannedStep(run=step, durations=previous_durations(client, step)) for step in workflow_steps(workflow)]
+    lfs_sizes = client.get_lfs_pointer_sizes(*(i.consumes.path for i in workflow.inputs))
+
+    return WorkflowPlan(steps=steps, lfs_sizes=lfs_sizes)
@@ -22,6 +22,7 @@ import os
 
 import click
 from git.remote import RemoteProgress
+from tqdm import tqdm
 
 INFO = click.style("Info: ", bold=True, fg="blue")
 WARNING = click.style("Warning: ", bold=True, fg="yellow")
@@ -65,3 +66,28 @@ class GitProgress(RemoteProgress):
 
     def _clear_line(self):
         print(self._previous_line_length * " ", end="\r")
+
+
+class DownloadProgressbar:
+    """Progress bar of transferred bytes."""
+
+    def __init__(self, description, total_size):
+        """Default initializer."""
+        self._progressbar = tqdm(
+            total=total_size,
+            unit="iB",
+            unit_scale=True,
+            desc=description,
+            leave=False,
+            bar_format="{desc:.32}: {percentage:3.0f}%|{bar}{r_bar}",
+        )
+
+    def update(self, size):
+        """Update the status."""
+        if self._progressbar:
+            self._progressbar.update(size)
+
+    def finalize(self):
+        """Called once when the download is finished."""
+        if self._progressbar:
+            self._progressbar.close()
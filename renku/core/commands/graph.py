@@ -17,6 +17,7 @@
 # limitations under the License.
 """Graph builder."""
 
+import multiprocessing
 import os
 from collections import OrderedDict, defaultdict, deque
 from pathlib import Path
@@ -26,10 +27,13 @@ from git import NULL_TREE
 
 from renku.core import errors
 from renku.core.commands.client import pass_local_client
+from renku.core.management.graph_cache import GraphCache, dumps, loads
+from renku.core.models.datastructures import PathTrie
 from renku.core.models.entities import Collection, Entity
 from renku.core.models.git import Range
 from renku.core.models.provenance.activities import Activity, ProcessRun, Usage, WorkflowRun
 from renku.core.models.provenance.qualified import Generation
+from renku.core.models.sort import IndexedGraph
 from renku.core.models.workflow.run import Run
 
 
@@ -52,6 +56,46 @@ def _safe_path(filepath, can_be_cwl=False):
     return True
 
 
+def _hexsha(entity):
+    """Return commit SHA of an entity."""
+    return entity.commit.hexsha if entity.commit else None
+
+
+def _entity_key(entity):
+    """Return a hashable key for an entity at a commit."""
+    return entity.path, _hexsha(entity)
+
+
+def _default_workers():
+    """Return number of processes from ``RENKU_GRAPH_WORKERS``."""
+    try:
+        return int(os.environ.get("RENKU_GRAPH_WORKERS") or 0)
+    except ValueError:
+        return 0
+
+
+_worker_client = None
+"""Client of a process building activities."""
+
+
+def _init_worker(path):
+    """Create a client in a worker process."""
+    from renku.core.management import LocalClient
+
+    global _worker_client
+    _worker_client = LocalClient(path)
+
+
+def _process_commit(hexsha):
+    """Build an activity for a commit in a worker process."""
+    try:
+        activity = _worker_client.process_commit(_worker_client.repo.commit(hexsha))
+        return hexsha, dumps(activity, _worker_client)
+    except Exception:
+        # NOTE: The commit is processed again serially to report the error.
+        return hexsha, None
+
+
 @attr.s(cmp=False)
 class Graph(object):
     """Represent the provenance graph."""
@@ -62,9 +106,19 @@ class Graph(object):
 
     _sorted_commits = attr.ib(default=attr.Factory(list))
     _latest_commits = attr.ib(default=attr.Factory(dict))
+    _generated_paths = attr.ib(default=attr.Factory(PathTrie), init=False)
+    _latest_prefetched = attr.ib(default=False, init=False)
     _nodes = attr.ib()
-    _need_update = attr.ib(default=attr.Factory(dict))
+    _need_update = attr.ib(default=None, init=False)
     _workflows = attr.ib(default=attr.Factory(dict))
+    _processed = attr.ib(default=attr.Factory(dict), init=False)
+    _pool = attr.ib(default=None, init=False)
+    _prefetched = attr.ib(default=attr.Factory(set), init=False)
+
+    workers = attr.ib(default=attr.Factory(_default_workers))
+    """Number of processes building activities, disabled if less than 2."""
+    _snapshot = attr.ib(default=None, init=False)
+    _snapshot_state = attr.ib(default=None, init=False)
 
     cwl_prefix = attr.ib(init=False)
 
@@ -76,6 +130,7 @@ class Graph(object):
     def default_nodes(self):
         """Build node index."""
         self.generated = {}
+        self._generated_paths = PathTrie()
         nodes = OrderedDict()
 
         for commit in reversed(self._sorted_commits):
@@ -84,42 +139,53 @@ class Graph(object):
                 nodes.update(((node.commit, node.path), node) for node in reversed(list(activity.nodes)))
 
                 if isinstance(activity, ProcessRun):
-                    self.generated.update({generation.entity._id: generation for generation in activity.generated})
+                    for generation in activity.generated:
+                        self.generated[_entity_key(generation.entity)] = generation
+                        self._add_generated_path(generation)
 
             except KeyError:
                 pass
 
         return nodes
 
+    def _add_generated_path(self, generation):
+        """Index a generation by its path and commit."""
+        path = generation.entity.path
+        if not path:
+            return
+
+        generations = self._generated_paths.get(path)
+        if generations is None:
+            generations = {}
+            self._generated_paths.add(path, generations)
+
+        generations[_hexsha(generation.entity)] = generation
+
     def need_update(self, node):
         """Return out-dated nodes."""
         if node is None:
             return
 
-        skip = True
         if isinstance(node, ProcessRun):
             node = node.association.plan
-            skip = False
-
-        if node._id in self._need_update:
-            return self._need_update[node._id]
 
-        latest = self.latest(node)
-        if latest:
-            return self._need_update.setdefault(node._id, [node])
+        if self._need_update is None:
+            self._need_update = IndexedGraph(
+                parents=self._update_parents, is_stale=lambda n: bool(self.latest(n)), key=lambda n: n._id
+            )
 
-        need_update_ = []
+        return self._need_update.stale_ancestors(node)
 
+    def _update_parents(self, node):
+        """Return parents of a node that are checked for updates."""
         for parent in self.parents(node):
             # Skip Collections if it is not an input
-            if skip and isinstance(parent, Collection):
+            if parent is None or isinstance(parent, Collection):
                 continue
 
-            parent_updates = self.need_update(parent)
-            if parent_updates:
-                need_update_.extend(parent_updates)
-
-        return self._need_update.setdefault(node._id, need_update_)
+            if isinstance(parent, ProcessRun):
+                parent = parent.association.plan
+            yield parent
 
     def parents(self, node):
         """Return parents for a given node."""
@@ -128,15 +194,16 @@ class Graph(object):
         def _from_entity(entity, check_parents=True):
             """Find parent from entity."""
             try:
-                return [self.generated[entity._id].activity]
+                return [self.generated[_entity_key(entity)].activity]
             except KeyError:
-                id_ = Path(entity._id)
-                while check_parents and id_ != id_.parent:
-                    try:
+                if not check_parents or not entity.path:
+                    return []
+
+                hexsha = _hexsha(entity)
+                for _, generations in reversed(list(self._generated_paths.ancestors(entity.path))):
+                    if hexsha in generations:
                         # TODO include selection step here
-                        return [self.generated[str(id_)]]
-                    except KeyError:
-                        id_ = id_.parent
+                        return [generations[hexsha]]
                 return []
 
         if isinstance(node, Generation):
@@ -161,9 +228,23 @@ class Graph(object):
 
         raise NotImplementedError(node)
 
+    def _prefetch_latest_commits(self):
+        """Resolve latest commits of all node paths with a single history walk."""
+        paths = {
+            node.path
+            for node in self._nodes.values()
+            if node.path
+            and (node.client is None or node.client is self.client)
+            and node.path not in self._latest_commits
+        }
+        self.client.find_previous_commits(paths)
+
     def latest(self, node):
         """Return a latest commit where the node was modified."""
         if node.path and node.path not in self._latest_commits:
+            if not self._latest_prefetched:
+                self._latest_prefetched = True
+                self._prefetch_latest_commits()
             try:
                 latest = Usage.from_revision(
                     node.client,
@@ -202,10 +283,37 @@ class Graph(object):
         """Return a relative path based on the client configuration."""
         return os.path.relpath(str(self.client.path / path))
 
+    def _load_snapshot(self):
+        """Reuse processed commits and latest commits of a previous command."""
+        if self._snapshot is not None:
+            return
+
+        self._snapshot = GraphCache(self.client)
+        self._processed, latest_commits = self._snapshot.load()
+        for path, commit in latest_commits.items():
+            self._latest_commits.setdefault(path, commit)
+
+    def _save_snapshot(self):
+        """Store processed commits and latest commits unless they did not change since the last save."""
+        if self._snapshot is None:
+            return
+
+        state = (
+            self.client.repo.head.commit.hexsha,
+            set(self._processed),
+            {path: getattr(commit, "hexsha", commit) for path, commit in self._latest_commits.items()},
+        )
+        if state != self._snapshot_state:
+            self._snapshot.save(self._processed, self._latest_commits)
+            self._snapshot_state = state
+
     def dependencies(self, revision="HEAD", paths=None):
         """Return dependencies from a revision or paths."""
         result = []
 
+        if revision == "HEAD":
+            self._load_snapshot()
+
         if paths:
             paths = (self.normalize_path(path) for path in paths)
         else:
@@ -238,68 +346,111 @@ class Graph(object):
         queue = deque(dependencies)
         usage_paths = []
 
-        while queue:
-            processing = queue.popleft()
+        try:
+            while queue:
+                processing = queue.popleft()
 
-            if processing.commit in visited:
-                continue
+                if processing.commit in visited:
+                    continue
 
-            # Mark as visited:
-            visited.add(processing.commit)
+                hexsha = _hexsha(processing) if processing.client is self.client else None
+                if self.workers > 1 and hexsha and hexsha not in self._prefetched and hexsha not in self._processed:
+                    self._prefetch_activities([processing] + list(queue), visited)
 
-            activity = processing.client.process_commit(processing.commit)
-            if activity is None:
-                continue
+                # Mark as visited:
+                visited.add(processing.commit)
+
+                if hexsha in self._processed:
+                    activity = self._processed[hexsha]
+                else:
+                    activity = processing.client.process_commit(processing.commit)
+                    if hexsha:
+                        self._processed[hexsha] = activity
 
-            self.activities[activity.commit] = activity
+                if activity is None:
+                    continue
 
-            # Iterate over parents.
-            if isinstance(activity, ProcessRun):
-                if isinstance(activity, WorkflowRun):
-                    self._workflows[activity.path] = activity
-                for entity in activity.qualified_usage:
-                    for member in entity.entities:
-                        parent_activities = self.client.activities_for_paths(paths=[member.path], revision="HEAD")
-                        for a in parent_activities:
-                            if a.commit and a.commit not in visited:
-                                self.activities[a.commit] = a
-                        if member.commit not in visited:
-                            queue.append(member)
-                        usage_paths.append(member.path)
-                for entity in activity.generated:
-                    for member in entity.entities:
-                        if all(member.path != d.path for d in dependencies) and any(
-                            u.startswith(member.path) for u in usage_paths
-                        ):
-                            dependencies = [d for d in dependencies if not d.path.startswith(member.path)]
-                            dependencies.append(member)
+                self.activities[activity.commit] = activity
+
+                # Iterate over parents.
+                if isinstance(activity, ProcessRun):
+                    if isinstance(activity, WorkflowRun):
+                        self._workflows[activity.path] = activity
+                    for entity in activity.qualified_usage:
+                        for member in entity.entities:
+                            parent_activities = self.client.activities_for_paths(paths=[member.path], revision="HEAD")
+                            for a in parent_activities:
+                                if a.commit and a.commit not in visited:
+                                    self.activities[a.commit] = a
+                            if member.commit not in visited:
+                                queue.append(member)
+                            usage_paths.append(member.path)
+                    for entity in activity.generated:
+                        for member in entity.entities:
+                            if all(member.path != d.path for d in dependencies) and any(
+                                u.startswith(member.path) for u in usage_paths
+                            ):
+                                dependencies = [d for d in dependencies if not d.path.startswith(member.path)]
+                                dependencies.append(member)
+        finally:
+            self._close_pool()
 
         from renku.core.models.sort import topological
 
         commit_nodes = {commit: activity.parents for commit, activity in self.activities.items()}
 
+        # index activities by the (path, commit) of entities they generated
+        generating = defaultdict(list)
+        for activity in self.activities.values():
+            for generation in activity.generated or ():
+                activities = generating[_entity_key(generation.entity)]
+                if activity not in activities:
+                    activities.append(activity)
+
         # add dependencies between processes
         for activity in self.activities.values():
             if not isinstance(activity, ProcessRun):
                 continue
+            parents = commit_nodes[activity.commit]
             for usage in activity.qualified_usage:
-                for other_activity in self.activities.values():
-                    if other_activity == activity:
+                for other_activity in generating.get(_entity_key(usage.entity), ()):
+                    if other_activity is activity or other_activity.commit in parents:
                         continue
-                    if any(
-                        g.path == usage.path and g.commit.hexsha == usage.commit.hexsha
-                        for g in other_activity.generated
-                    ):
-                        parents = commit_nodes[activity.commit]
-                        if other_activity.commit in parents:
-                            continue
-                        parents.append(other_activity.commit)
+                    parents.append(other_activity.commit)
 
         self._sorted_commits = topological(commit_nodes)
         self._nodes = self.default_nodes()
 
         return dependencies
 
+    def _prefetch_activities(self, entities, visited):
+        """Build activities for commits of the given entities in parallel."""
+        hexshas = []
+        for entity in entities:
+            hexsha = _hexsha(entity) if entity.client is self.client else None
+            if hexsha and entity.commit not in visited and hexsha not in self._prefetched:
+                self._prefetched.add(hexsha)
+                if hexsha not in self._processed:
+                    hexshas.append(hexsha)
+
+        if len(hexshas) < 2:
+            return
+
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=(str(self.client.path),))
+
+        chunksize = max(1, len(hexshas) // (4 * self.workers))
+        for hexsha, content in self._pool.imap(_process_commit, hexshas, chunksize):
+            if content is not None:
+                self._processed[hexsha] = loads(content, self.client)
+
+    def _close_pool(self):
+        """Stop worker processes."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
     def build(self, revision="HEAD", paths=None, dependencies=None, can_be_cwl=False):
         """Build graph from paths and/or revision."""
         interval = Range.rev_parse(self.client.repo, revision)
@@ -309,6 +460,7 @@ class Graph(object):
 
         ignore = {commit for commit in self.client.repo.iter_commits(interval.start)} if interval.start else set()
         dependencies = self.process_dependencies(dependencies, visited=ignore)
+        self._save_snapshot()
 
         return {
             self._nodes.get((dependency.commit, dependency.path), dependency)
@@ -380,6 +532,7 @@ class Graph(object):
             and node.path not in current_paths
             and not ((self.client.path / node.path).exists() or (self.client.path / node.path).is_dir())
         }
+        self._save_snapshot()
         return status
 
     def siblings(self, node):
@@ -515,9 +668,11 @@ class Graph(object):
 
 
 @pass_local_client(requires_migration=True)
-def build_graph(client, revision, no_output, paths):
+def build_graph(client, revision, no_output, paths, jobs=None):
     """Build graph structure."""
     graph = Graph(client)
+    if jobs is not None:
+        graph.workers = jobs
     if not paths:
         start, is_range, stop = revision.partition("..")
         if not is_range:
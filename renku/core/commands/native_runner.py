@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Run workflows directly in the working directory.
+
+Steps are executed in the repository with the same command lines as the
+original ``renku run`` commands and write their outputs in place. Existing
+outputs are moved aside before a step is started and are restored if any
+step of the workflow fails, so the working directory is left unchanged.
+
+When results are reused, a step whose command line, inputs and environment
+files match an earlier execution is not run. Its outputs are restored from Git
+objects or from the Git LFS cache instead.
+
+Outputs of every finished step are written to the Git object database and
+recorded as a checkpoint together with the times and resource usage of the
+step. If the workflow fails, a resumed execution restores the outputs of
+steps with the same command line and inputs instead of running them again.
+
+Steps are started as soon as the steps they depend on have finished. With a
+CPU budget, a ready step is only started if the CPUs recorded for it with
+``renku run --cpus`` are free; otherwise a later ready step that fits is
+started first. Standard streams that are not mapped to files can be written
+to a log file per step.
+"""
+
+import datetime
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+
+import click
+from git.exc import BadObject, GitCommandError
+from git.objects import Blob, Tree
+
+from renku.core import errors
+from renku.core.management.step_cache import environment_fingerprint, object_sha, run_command_line, step_key
+from renku.core.models.cwl.annotation import Annotation
+from renku.core.models.entities import Collection
+from renku.core.models.provenance.activities import WorkflowRun
+from renku.core.models.sort import topological
+from renku.core.plugins.implementations.resource_usage import resource_usage_annotation
+from renku.core.utils import resource_usage
+from renku.core.utils.datetime8601 import parse_date
+
+
+def _steps(run):
+    """Return steps of a workflow."""
+    if not run.subprocesses:
+        return [run]
+
+    return [step for s in sorted(run.subprocesses, key=lambda s: s.index) for step in _steps(s.process)]
+
+
+def _overlap(first, second):
+    """Check if two paths are the same or one contains the other."""
+    return first == second or first.startswith(second.rstrip("/") + "/") or second.startswith(first.rstrip("/") + "/")
+
+
+def _paths(steps):
+    """Return input and output paths of each step."""
+    inputs = [[i.consumes.path for i in step.inputs] for step in steps]
+    outputs = [[o.produces.path for o in step.outputs] for step in steps]
+    return inputs, outputs
+
+
+def _ordered(steps):
+    """Return steps sorted so that each step comes after steps generating its inputs."""
+    inputs, outputs = _paths(steps)
+    consumers = {
+        index: [
+            other
+            for other in range(len(steps))
+            if other != index and any(_overlap(output, path) for output in outputs[index] for path in inputs[other])
+        ]
+        for index in range(len(steps))
+    }
+    return [steps[index] for index in topological(consumers)]
+
+
+def _dependencies(steps):
+    """Return indices of earlier steps that each step has to wait for."""
+    inputs, outputs = _paths(steps)
+
+    def conflict(first, second):
+        """Check if a step writes a path that another step reads or writes."""
+        return any(
+            _overlap(output, path) for output in outputs[first] for path in inputs[second] + outputs[second]
+        ) or any(_overlap(output, path) for output in outputs[second] for path in inputs[first])
+
+    return [{previous for previous in range(index) if conflict(previous, index)} for index in range(len(steps))]
+
+
+class Execution(object):
+    """State of a running workflow."""
+
+    def __init__(self, client, reuse=False, resume=False, log_dir=None):
+        self.client = client
+        self.reuse = reuse
+        self.resume = resume
+        self.log_dir = log_dir
+        self.log_names = {}
+        self.backup_dir = None
+        self.moved = []
+        self.written = set()
+        self.reused = {}
+        self.resumed = set()
+        self.saved = 0
+        self.times = {}
+        self.usage = {}
+        self._lock = threading.RLock()
+
+    def move_aside(self, path):
+        """Move an existing output out of the way of a step."""
+        source = self.client.path / path
+        with self._lock:
+            backup = None
+            if os.path.lexists(str(source)):
+                if self.backup_dir is None:
+                    tmp = self.client.renku_path / "tmp"
+                    tmp.mkdir(parents=True, exist_ok=True)
+                    self.backup_dir = tempfile.mkdtemp(dir=str(tmp))
+                backup = os.path.join(self.backup_dir, str(len(self.moved)))
+                shutil.move(str(source), backup)
+            self.moved.append((source, backup))
+            self.written.add(path)
+
+    def step_key(self, step):
+        """Return the cache key of a step or ``None`` if an input is unknown."""
+        tree = self.client.repo.head.commit.tree
+
+        inputs = {}
+        for input_ in step.inputs:
+            path = input_.consumes.path
+            if not any(_overlap(path, written) for written in self.written):
+                inputs[path] = object_sha(tree, path)
+            elif (self.client.path / path).is_file():
+                inputs[path] = self.client.repo.git.hash_object(path)
+            else:
+                return None
+
+            if inputs[path] is None:
+                return None
+
+        return step_key(run_command_line(step), inputs, environment_fingerprint(tree))
+
+    def _blobs(self, path, sha):
+        """Return path, mode and content or LFS object of blobs of an output."""
+        repo = self.client.repo
+        binsha = bytes.fromhex(sha)
+        try:
+            if repo.odb.info(binsha).type == b"tree":
+                tree = Tree(repo, binsha, mode=Tree.tree_id << 12, path=path)
+                blobs = [item for item in tree.traverse() if item.type == "blob"]
+            else:
+                blobs = [Blob(repo, binsha, mode=Blob.file_mode, path=path)]
+
+            result = []
+            for blob in blobs:
+                content = blob.data_stream.read()
+                lfs_object = None
+                if content.startswith(self.client._LFS_HEADER.encode("utf-8")):
+                    oid = content.split(b"oid sha256:", 1)[1].split(b"\n", 1)[0].decode("utf-8").strip()
+                    lfs_object = self.client.path / ".git" / "lfs" / "objects" / oid[:2] / oid[2:4] / oid
+                    if not lfs_object.exists():
+                        return None
+                result.append((blob.path, blob.mode, content, lfs_object))
+            return result
+        except (BadObject, IndexError, ValueError):
+            return None
+
+    def _restore_outputs(self, outputs):
+        """Write outputs from Git objects and return whether all exist."""
+        blobs = []
+        for path, sha in outputs.items():
+            output_blobs = self._blobs(path, sha)
+            if output_blobs is None:
+                return False
+            blobs.extend(output_blobs)
+
+        for path in outputs:
+            self.move_aside(path)
+
+        for path, mode, content, lfs_object in blobs:
+            destination = self.client.path / path
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            if lfs_object:
+                shutil.copyfile(str(lfs_object), str(destination))
+            else:
+                destination.write_bytes(content)
+            if mode & 0o111:
+                destination.chmod(0o755)
+        return True
+
+    def restore_from_cache(self, step):
+        """Restore outputs of a step from an earlier execution with the same inputs."""
+        cache = self.client.step_cache
+        with self._lock:
+            key = self.step_key(step)
+            if key is None:
+                return None
+
+            entry = cache.get(key)
+            if entry is None:
+                for activity in self.client.activities_for_paths([o.produces.path for o in step.outputs]):
+                    cache.index(activity)
+                entry = cache.get(key)
+            if entry is None or not self._restore_outputs(entry["outputs"]):
+                return None
+
+            self.reused[step] = entry["activity"]
+
+        click.echo("Reusing: {0}{1}".format(" ".join(step.to_argv()), "".join(step.to_stream_repr())), err=True)
+        return entry["activity"]
+
+    def restore_checkpoint(self, step):
+        """Restore outputs of a step saved by an execution that did not finish."""
+        with self._lock:
+            key = self.step_key(step)
+            entry = self.client.checkpoints.get(key) if key else None
+            if entry is None or not self._restore_outputs(entry["outputs"]):
+                return False
+
+            self.times[step] = (parse_date(entry["started"]), parse_date(entry["ended"]))
+            if entry.get("usage"):
+                self.usage[step] = entry["usage"]
+            self.resumed.add(step)
+
+        click.echo("Resuming: {0}{1}".format(" ".join(step.to_argv()), "".join(step.to_stream_repr())), err=True)
+        return True
+
+    def save_checkpoint(self, step, key):
+        """Store outputs of a finished step in Git and record them as a checkpoint."""
+        checkpoints = self.client.checkpoints
+        paths = [o.produces.path for o in step.outputs]
+        if not checkpoints.enabled or not key or not paths:
+            return
+
+        repo = self.client.repo
+        tmp = self.client.renku_path / "tmp"
+        tmp.mkdir(parents=True, exist_ok=True)
+        index_dir = tempfile.mkdtemp(dir=str(tmp))
+        env = {"GIT_INDEX_FILE": os.path.join(index_dir, "index")}
+        try:
+            repo.git.add("--force", "--", *paths, env=env)
+            tree = repo.git.write_tree(env=env)
+            outputs = {path: repo.git.rev_parse("{0}:{1}".format(tree, path)) for path in paths}
+        except GitCommandError:
+            return
+        finally:
+            shutil.rmtree(index_dir, ignore_errors=True)
+
+        started, ended = self.times[step]
+        checkpoints.save(key, outputs, started, ended, self.usage.get(step))
+        with self._lock:
+            self.saved += 1
+
+    def restore(self):
+        """Replace outputs by their original versions."""
+        for source, backup in reversed(self.moved):
+            if source.is_dir() and not source.is_symlink():
+                shutil.rmtree(str(source))
+            elif os.path.lexists(str(source)):
+                source.unlink()
+            if backup:
+                shutil.move(backup, str(source))
+
+    def cleanup(self):
+        """Remove original versions of outputs."""
+        if self.backup_dir:
+            shutil.rmtree(self.backup_dir, ignore_errors=True)
+
+    def run_step(self, step):
+        """Execute a single step in the working directory."""
+        if self.resume and self.restore_checkpoint(step):
+            return
+        if self.reuse and self.restore_from_cache(step):
+            return
+
+        with self._lock:
+            key = self.step_key(step)
+
+        streams = {}
+        for input_ in step.inputs:
+            if input_.mapped_to:
+                streams[input_.mapped_to.stream_type] = input_.consumes.path
+        for output in step.outputs:
+            if output.mapped_to:
+                streams[output.mapped_to.stream_type] = output.produces.path
+
+            path = self.client.path / output.produces.path
+            # NOTE: Output directories that existed before the command ran are recreated empty.
+            is_directory = path.is_dir() or isinstance(output.produces, Collection)
+            directory = path if output.create_folder and is_directory else path.parent
+
+            self.move_aside(output.produces.path)
+            directory.mkdir(parents=True, exist_ok=True)
+
+        argv = step.to_argv()
+        click.echo("Executing: {0}{1}".format(" ".join(argv), "".join(step.to_stream_repr())), err=True)
+
+        with ExitStack() as stack:
+            files = {
+                name: stack.enter_context(open(str(self.client.path / path), "rb" if name == "stdin" else "wb"))
+                for name, path in streams.items()
+            }
+            if self.log_dir and ("stdout" not in files or "stderr" not in files):
+                log = stack.enter_context(open(os.path.join(self.log_dir, self.log_names[step]), "wb"))
+                files.setdefault("stdout", log)
+                files.setdefault("stderr", subprocess.STDOUT if files["stdout"] is log else log)
+            started = datetime.datetime.now(datetime.timezone.utc)
+            return_code, self.usage[step] = resource_usage.call(argv, cwd=str(self.client.path), **files)
+            self.times[step] = (started, datetime.datetime.now(datetime.timezone.utc))
+
+        if return_code not in (step.successcodes or {0}):
+            raise errors.InvalidSuccessCode(return_code, success_codes=step.successcodes)
+
+        self.save_checkpoint(step, key)
+
+
+def workflow_steps(workflow):
+    """Return steps of a workflow in an order in which they can be run."""
+    return _ordered(_steps(workflow))
+
+
+def _log_name(index, step):
+    """Return name of the log file of a step."""
+    argv = step.to_argv()
+    command = os.path.basename(argv[0]) if argv else "step"
+    return "{0:03d}_{1}.log".format(index + 1, command)
+
+
+def execute(
+    client, workflow, output_paths=None, jobs=None, reuse=False, resume=False, cpus=None, log_dir=None,
+):
+    """Run steps of a workflow in the working directory.
+
+    :param jobs: number of workflow steps executed at the same time
+    :param reuse: restore outputs of steps that were already executed with
+        the same inputs instead of running them
+    :param resume: restore outputs of steps that finished in an earlier
+        execution which failed
+    :param cpus: number of CPUs that running steps may use together
+    :param log_dir: directory for logs of standard streams of steps
+    :returns: the :class:`Execution` with reused steps and times and
+        resource usage of steps
+    """
+    output_paths = output_paths or set()
+    jobs = jobs or 1
+
+    steps = workflow_steps(workflow)
+    dependencies = _dependencies(steps)
+    execution = Execution(client, reuse=reuse, resume=resume, log_dir=log_dir)
+    execution.log_names = {step: _log_name(index, step) for index, step in enumerate(steps)}
+
+    def weight(index):
+        """Return the number of CPUs reserved for a step."""
+        return min(steps[index].cpus or 1, cpus) if cpus else 0
+
+    pending, running, finished = list(range(len(steps))), {}, set()
+    used = 0
+    error = None
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            while running or (pending and error is None):
+                while error is None and len(running) < jobs:
+                    ready = next(
+                        (
+                            index
+                            for index in pending
+                            if dependencies[index] <= finished and (not cpus or used + weight(index) <= cpus)
+                        ),
+                        None,
+                    )
+                    if ready is None:
+                        break
+                    pending.remove(ready)
+                    used += weight(ready)
+                    running[pool.submit(execution.run_step, steps[ready])] = ready
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    used -= weight(index)
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                    else:
+                        finished.add(index)
+
+        if error is not None:
+            raise error
+    except BaseException:
+        execution.restore()
+        if execution.saved:
+            click.echo(
+                "Outputs of {0} finished steps were saved, use --resume to continue.".format(execution.saved), err=True
+            )
+        raise
+    finally:
+        execution.cleanup()
+
+    client.checkpoints.clear()
+
+    unchanged_paths = client.remove_unmodified(output_paths)
+    if unchanged_paths:
+        click.echo(
+            "Unchanged files:\n\n\t{0}".format("\n\t".join(click.style(path, fg="yellow") for path in unchanged_paths))
+        )
+
+    return execution
+
+
+def record_execution(run, execution):
+    """Record times, resource usage and reused results of steps in an activity."""
+    runs = run.subprocesses.values() if isinstance(run, WorkflowRun) else [run]
+    for process_run in runs:
+        plan = process_run.association.plan
+        if plan in execution.times:
+            process_run.started_at_time, process_run.ended_at_time = execution.times[plan]
+        if plan in execution.usage:
+            process_run.add_annotations(
+                [
+                    resource_usage_annotation(
+                        execution.usage[plan], id="{0}/annotations/resource-usage".format(process_run._id)
+                    )
+                ]
+            )
+
+        activity = execution.reused.get(plan)
+        if activity:
+            process_run.add_annotations(
+                [
+                    Annotation(
+                        id="{0}/annotations/reused".format(process_run._id), source="renku", body={"@id": activity}
+                    )
+                ]
+            )
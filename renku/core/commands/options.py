@@ -21,6 +21,7 @@ import click
 
 from renku.core.errors import RenkuException, UsageError
 
+from . import cwl_runner, native_runner
 from .git import set_git_isolation
 
 
@@ -157,6 +158,23 @@ def option_siblings(func):
     return option_check_siblings(option_with_siblings(func))
 
 
+option_native = click.option(
+    "--native",
+    "runner",
+    flag_value=native_runner.execute,
+    default=True,
+    help="Run workflow steps directly in the working directory (default).",
+)
+option_cwl = click.option(
+    "--cwl", "runner", flag_value=cwl_runner.execute_workflow, help="Run workflow steps with cwltool.",
+)
+
+
+def option_runner(func):
+    """Combine workflow runner options."""
+    return option_native(option_cwl(func))
+
+
 option_external_storage_requested = click.option(
     "external_storage_requested",
     "--external-storage/--no-external-storage",
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018-2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Append-only index of activities and the paths they generated.
+
+Each line of the index file is a JSON array ``[path, commit, activity]``
+where ``activity`` is the path of the workflow file that generated ``path``
+at ``commit``. New entries are appended to the end of the file so that
+adding an activity does not require reading or rewriting the whole index.
+Duplicated lines are ignored when the index is loaded.
+"""
+
+import json
+from collections import defaultdict
+
+import attr
+import yaml
+
+from renku.core.models.datastructures import PathTrie
+
+
+@attr.s
+class ActivityIndex:
+    """Index of generated paths and commits to activity files."""
+
+    path = attr.ib()
+    """Path of the append-only index file."""
+
+    legacy_path = attr.ib(default=None)
+    """Path of the YAML index used by older Renku versions."""
+
+    _paths = attr.ib(default=None, init=False)
+    _commits = attr.ib(default=None, init=False)
+    _trie = attr.ib(default=None, init=False)
+
+    @property
+    def paths(self):
+        """Return mapping from path to commit to activity files."""
+        if self._paths is None:
+            self.load()
+        return self._paths
+
+    @property
+    def commits(self):
+        """Return mapping from commit to activity files."""
+        if self._commits is None:
+            self.load()
+        return self._commits
+
+    def parent_paths(self, path):
+        """Return indexed paths that are ancestors of the given path."""
+        if self._trie is None:
+            self.load()
+        return [parent for parent, _ in self._trie.ancestors(path) if parent != path]
+
+    @property
+    def activities(self):
+        """Return all indexed activity files."""
+        return {activity for activities in self.commits.values() for activity in activities}
+
+    def exists(self):
+        """Check if the index or its legacy version exists."""
+        return self.path.exists() or bool(self.legacy_path and self.legacy_path.exists())
+
+    def load(self):
+        """Read the index from disk."""
+        self._reset()
+
+        for path, commit, activity in self._iter_entries():
+            self._add_entry(path, commit, activity)
+
+    def _iter_entries(self):
+        """Yield all entries stored on disk."""
+        if self.path.exists():
+            with self.path.open("r") as stream:
+                for line in stream:
+                    line = line.strip()
+                    if line:
+                        yield tuple(json.loads(line))
+        elif self.legacy_path and self.legacy_path.exists():
+            with self.legacy_path.open("r") as stream:
+                data = yaml.safe_load(stream) or {}
+
+            for path, commits in data.items():
+                for commit, activities in commits.items():
+                    for activity in activities:
+                        yield path, commit, activity
+
+    def _reset(self):
+        """Clear the in-memory index."""
+        self._paths = {}
+        self._commits = defaultdict(list)
+        self._trie = PathTrie()
+
+    def _add_entry(self, path, commit, activity):
+        """Add an entry to the in-memory index; return ``False`` if known."""
+        if path not in self._paths:
+            self._paths[path] = {}
+            self._trie.add(path, path)
+
+        activities = self._paths[path].setdefault(commit, [])
+        if activity in activities:
+            return False
+
+        activities.append(activity)
+        if activity not in self._commits[commit]:
+            self._commits[commit].append(activity)
+        return True
+
+    def add(self, activity):
+        """Append generations of an activity to the index."""
+        activity_path = str(activity.path)
+        entries = [(g.path, g.commit.hexsha, activity_path) for g in activity.generated]
+
+        if self._paths is not None:
+            entries = [entry for entry in entries if self._add_entry(*entry)]
+
+        if not self.path.exists() and self.legacy_path and self.legacy_path.exists():
+            # NOTE: Convert the legacy index once, appending is cheap afterwards.
+            entries = list(self._iter_entries()) + entries
+            self.legacy_path.unlink()
+
+        if not entries:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as stream:
+            for entry in entries:
+                stream.write(json.dumps(entry) + "\n")
+
+    def rebuild(self, activities):
+        """Replace the index with generations of the given activities."""
+        self._reset()
+
+        entries = [
+            (g.path, g.commit.hexsha, str(activity.path))
+            for activity in activities
+            for g in activity.generated
+            if g.commit
+        ]
+        entries = [entry for entry in entries if self._add_entry(*entry)]
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("w") as stream:
+            for entry in entries:
+                stream.write(json.dumps(entry) + "\n")
+
+        if self.legacy_path and self.legacy_path.exists():
+            self.legacy_path.unlink()
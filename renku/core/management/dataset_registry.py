@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Lazy registry of datasets in the working directory.
+
+The registry maps paths of dataset metadata files to datasets and loads a
+dataset only when it is accessed. Loaded datasets are kept as long as the
+modification time, size and inode of their metadata file do not change.
+A file modified within ``RACY_NS`` of when its stat information was recorded
+may change again without a different modification time; such stamps are not
+trusted until they are verified after that window.
+
+Summaries with the attributes shown by ``renku dataset`` are stored in a
+JSON file in the cache directory. They are validated with the same stat
+information and, when it differs, with the Git blob SHA of the metadata
+file, so that a dataset is only loaded again when its content changed.
+"""
+
+import json
+import os
+import time
+from collections.abc import Mapping
+from pathlib import Path
+
+import attr
+
+from renku.core.management.parse_cache import blob_sha
+from renku.core.utils.datetime8601 import parse_date
+from renku.core.utils.file_changes import RACY_NS
+
+
+def _stamp(stat):
+    """Return values of a stat result that change with the file."""
+    return [stat.st_mtime_ns, stat.st_size, stat.st_ino]
+
+
+def _now():
+    """Return the current time in nanoseconds."""
+    return int(time.time() * 1e9)
+
+
+def _is_racy(stamp, recorded):
+    """Check if a file was modified too close to when its stamp was recorded."""
+    return stamp[0] >= recorded - RACY_NS
+
+
+@attr.s
+class DatasetSummary:
+    """Attributes of a dataset that are listed without loading it."""
+
+    path = attr.ib()
+    """Path of the metadata file relative to the project."""
+
+    uid = attr.ib(default=None)
+    name = attr.ib(default=None)
+    title = attr.ib(default=None)
+    version = attr.ib(default=None)
+    date_created = attr.ib(default=None, converter=parse_date)
+    creators_csv = attr.ib(default=None)
+    creators_full_csv = attr.ib(default=None)
+    tags_csv = attr.ib(default=None)
+    keywords_csv = attr.ib(default=None)
+
+    files = attr.ib(default=0)
+    """Number of files in the dataset."""
+
+    external_files = attr.ib(default=0)
+    """Number of external files in the dataset."""
+
+    stamp = attr.ib(default=None)
+    """Modification time, size and inode of the metadata file."""
+
+    racy = attr.ib(default=True)
+    """Whether the stamp was recorded too soon after the file was modified."""
+
+    sha = attr.ib(default=None)
+    """Git blob SHA of the metadata file."""
+
+    @classmethod
+    def from_dataset(cls, dataset, path, stamp, sha, racy=True):
+        """Create a summary of a loaded dataset."""
+        return cls(
+            path=path,
+            uid=dataset.uid,
+            name=dataset.name,
+            title=dataset.title,
+            version=dataset.version,
+            date_created=dataset.date_created,
+            creators_csv=dataset.creators_csv,
+            creators_full_csv=dataset.creators_full_csv,
+            tags_csv=dataset.tags_csv,
+            keywords_csv=dataset.keywords_csv,
+            files=len(dataset.files),
+            external_files=sum(1 for file_ in dataset.files if file_.external),
+            stamp=stamp,
+            racy=racy,
+            sha=sha,
+        )
+
+
+@attr.s(cmp=False)
+class DatasetRegistry(Mapping):
+    """Mapping from paths of metadata files to lazily loaded datasets."""
+
+    NAME = "datasets.json"
+    """Name of the file with summaries inside the cache directory."""
+
+    client = attr.ib()
+
+    path = attr.ib()
+    """File with summaries of datasets."""
+
+    enabled = attr.ib(default=True)
+    """Store summaries between invocations."""
+
+    _datasets = attr.ib(factory=dict, init=False)
+    _summaries = attr.ib(default=None, init=False)
+
+    def _paths(self):
+        """Return paths of all dataset metadata files."""
+        return sorted(self.client.renku_datasets_path.rglob(self.client.METADATA))
+
+    def __iter__(self):
+        """Iterate over paths of dataset metadata files."""
+        return iter(self._paths())
+
+    def __len__(self):
+        """Return number of datasets."""
+        return len(self._paths())
+
+    def __contains__(self, path):
+        """Check if a path is a dataset metadata file."""
+        return Path(path) in self._paths()
+
+    def __getitem__(self, path):
+        """Return the dataset of a metadata file and load it if it changed."""
+        path = Path(path)
+        try:
+            stamp = _stamp(os.stat(str(path)))
+        except OSError:
+            self._datasets.pop(path, None)
+            raise KeyError(path)
+
+        cached = self._datasets.get(path)
+        if cached and cached[0] == stamp and not _is_racy(stamp, cached[1]):
+            return cached[2]
+
+        recorded = _now()
+        dataset = self.client.load_dataset_from_path(path)
+        self._datasets[path] = (stamp, recorded, dataset)
+        return dataset
+
+    def invalidate(self, path=None):
+        """Forget loaded datasets of a path or of all paths."""
+        if path is None:
+            self._datasets.clear()
+        else:
+            self._datasets.pop(Path(path), None)
+
+    def summaries(self):
+        """Return summaries of all datasets."""
+        summaries = self._load_summaries()
+        paths = self._paths()
+        changed = False
+        result = []
+
+        for path in paths:
+            key = str(path.relative_to(self.client.path))
+            try:
+                stat = os.stat(str(path))
+            except OSError:
+                continue
+            stamp = _stamp(stat)
+            recorded = _now()
+
+            summary = summaries.get(key)
+            if summary is None or summary.stamp != stamp or summary.racy:
+                with open(str(path), "rb") as fp:
+                    sha = blob_sha(fp.read())
+                racy = _is_racy(stamp, recorded)
+                if summary is None or summary.sha != sha:
+                    summary = DatasetSummary.from_dataset(self[path], key, stamp, sha, racy=racy)
+                    changed = True
+                elif summary.stamp != stamp or summary.racy != racy:
+                    summary.stamp = stamp
+                    summary.racy = racy
+                    changed = True
+                summaries[key] = summary
+
+            result.append(summary)
+
+        keys = {str(path.relative_to(self.client.path)) for path in paths}
+        for key in set(summaries) - keys:
+            del summaries[key]
+            changed = True
+
+        if changed:
+            self._save_summaries()
+        return result
+
+    def _load_summaries(self):
+        """Return stored summaries by path of their metadata files."""
+        if self._summaries is None:
+            self._summaries = {}
+            if self.enabled:
+                try:
+                    with open(str(self.path), "r") as fp:
+                        data = json.load(fp)
+                    self._summaries = {key: DatasetSummary(**value) for key, value in data.items()}
+                except (OSError, ValueError, TypeError, AttributeError):
+                    pass
+        return self._summaries
+
+    def _save_summaries(self):
+        """Store summaries in the cache directory."""
+        if not self.enabled:
+            return
+
+        data = {key: attr.asdict(summary) for key, summary in self._summaries.items()}
+        for value in data.values():
+            if value["date_created"]:
+                value["date_created"] = value["date_created"].isoformat()
+        temporary = "{0}.{1}".format(self.path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(str(self.path)), exist_ok=True)
+            with open(temporary, "w") as fp:
+                json.dump(data, fp)
+            os.replace(temporary, str(self.path))
+        except OSError:
+            return
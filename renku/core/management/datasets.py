@@ -18,13 +18,14 @@
 """Client for handling datasets."""
 
 import concurrent.futures
+import hashlib
 import os
 import re
 import shutil
 import tempfile
 import time
 import uuid
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 from contextlib import contextmanager
 from pathlib import Path
 from subprocess import PIPE, SubprocessError, run
@@ -40,6 +41,7 @@ from wcmatch import glob
 from renku.core import errors
 from renku.core.management.clone import clone
 from renku.core.management.config import RENKU_HOME
+from renku.core.management.dataset_registry import DatasetRegistry
 from renku.core.management.migrate import is_project_unsupported, migrate
 from renku.core.models.datasets import (
     Dataset,
@@ -52,6 +54,8 @@ from renku.core.models.git import GitURL
 from renku.core.models.locals import with_reference
 from renku.core.models.provenance.agents import Person
 from renku.core.models.refs import LinkReference
+from renku.core.utils.download import download
+from renku.core.utils.file_copy import copy_files
 from renku.core.utils.urls import remove_credentials
 
 
@@ -68,6 +72,8 @@ class DatasetsApiMixin(object):
     CACHE = "cache"
     """Directory to cache transient data."""
 
+    _dataset_registry = None
+
     @property
     def renku_datasets_path(self):
         """Return a ``Path`` instance of Renku dataset metadata folder."""
@@ -100,12 +106,16 @@ class DatasetsApiMixin(object):
 
     @property
     def datasets(self):
-        """Return mapping from path to dataset."""
-        result = {}
-        paths = self.renku_datasets_path.rglob(self.METADATA)
-        for path in paths:
-            result[path] = self.load_dataset_from_path(path)
-        return result
+        """Return mapping from path to dataset.
+
+        Datasets are loaded when they are accessed and kept until their
+        metadata file changes.
+        """
+        if self._dataset_registry is None:
+            path = self.path / self.renku_home / self.CACHE / DatasetRegistry.NAME
+            enabled = bool(self.repo) and bool(self.find_ignored_paths(str(path.relative_to(self.path))))
+            self._dataset_registry = DatasetRegistry(client=self, path=path, enabled=enabled)
+        return self._dataset_registry
 
     def load_dataset_from_path(self, path, commit=None):
         """Return a dataset from a given path."""
@@ -224,6 +234,8 @@ class DatasetsApiMixin(object):
         all_at_once=False,
         destination_names=None,
         progress=None,
+        copy_mode="auto",
+        checksums=None,
     ):
         """Import the data into the data directory."""
         messages = []
@@ -248,6 +260,7 @@ class DatasetsApiMixin(object):
                 destination=destination,
                 extract=extract,
                 progress=progress,
+                checksums=checksums,
             )
         else:
             for url in urls:
@@ -326,6 +339,7 @@ class DatasetsApiMixin(object):
                     + "\n  ".join([str(p) for p in existing_files])
                 )
 
+        copies = []
         for data in files:
             operation = data.pop("operation", None)
             if not operation:
@@ -333,13 +347,15 @@ class DatasetsApiMixin(object):
 
             src, dst, action = operation
 
+            if action == "copy":
+                copies.append((src, dst))
+                continue
+
             # Remove existing file if any
             self.remove_file(dst)
             dst.parent.mkdir(parents=True, exist_ok=True)
 
-            if action == "copy":
-                shutil.copy(src, dst)
-            elif action == "move":
+            if action == "move":
                 shutil.move(src, dst, copy_function=shutil.copy)
             elif action == "symlink":
                 self._create_external_file(src, dst)
@@ -347,6 +363,8 @@ class DatasetsApiMixin(object):
             else:
                 raise errors.OperationError(f"Invalid action {action}")
 
+        copy_files(copies, mode=copy_mode, prepare=self.remove_file, progress=progress)
+
         # Track non-symlinks in LFS
         if self.check_external_storage():
             lfs_paths = self.track_paths_in_storage(*files_to_commit)
@@ -410,8 +428,14 @@ class DatasetsApiMixin(object):
 
         dst = destination / src.name
 
-        # if we have a directory, recurse
-        if src.is_dir():
+        if not src.is_dir():
+            return [self._add_local_file(src, dst, path, external)]
+
+        # NOTE: Walk directories with scandir to avoid a stat call per entry.
+        files = []
+        directories = [(src, dst, path)]
+        while directories:
+            src, dst, path = directories.pop()
             if dst.exists() and not dst.is_dir():
                 raise errors.ParameterError(f'Cannot copy directory to a file: "{dst}"')
             if src == (self.path / dataset.data_dir).resolve():
@@ -420,41 +444,43 @@ class DatasetsApiMixin(object):
             if self._check_protected_path(src):
                 raise errors.ProtectedFiles([src])
 
-            files = []
-            for f in src.iterdir():
-                files.extend(
-                    self._add_from_local(dataset=dataset, path=os.path.abspath(f), external=external, destination=dst)
-                )
-            return files
+            with os.scandir(str(src)) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        directories.append((Path(entry.path), dst / entry.name, entry.path))
+                    else:
+                        files.append(self._add_local_file(Path(entry.path), dst / entry.name, entry.path, external))
+        return files
+
+    def _add_local_file(self, src, dst, path, external):
+        """Return metadata of a local file and the operation to add it."""
+        # Check if file is in the project and return it
+        path_in_repo = None
+        if self._is_external_file(src):
+            path_in_repo = path
         else:
-            # Check if file is in the project and return it
-            path_in_repo = None
-            if self._is_external_file(src):
-                path_in_repo = path
+            try:
+                path_in_repo = src.relative_to(self.path)
+            except ValueError:
+                pass
             else:
-                try:
-                    path_in_repo = src.relative_to(self.path)
-                except ValueError:
-                    pass
-                else:
-                    if self._check_protected_path(src):
-                        raise errors.ProtectedFiles([src])
+                if self._check_protected_path(src):
+                    raise errors.ProtectedFiles([src])
 
-            if path_in_repo:
-                return [{"path": path_in_repo, "source": path_in_repo, "parent": self}]
+        if path_in_repo:
+            return {"path": path_in_repo, "source": path_in_repo, "parent": self}
 
         action = "symlink" if external else "copy"
-        return [
-            {
-                "path": dst.relative_to(self.path),
-                "source": os.path.relpath(str(src), str(self.path)),
-                "parent": self,
-                "operation": (src, dst, action),
-            }
-        ]
-
-    def _add_from_urls(self, dataset, urls, destination, destination_names, extract, progress):
+        return {
+            "path": dst.relative_to(self.path),
+            "source": os.path.relpath(str(src), str(self.path)),
+            "parent": self,
+            "operation": (src, dst, action),
+        }
+
+    def _add_from_urls(self, dataset, urls, destination, destination_names, extract, progress, checksums=None):
         files = []
+        checksums = checksums or [None] * len(urls)
         max_workers = min(os.cpu_count() - 1, 4) or 1
         with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
             futures = {
@@ -466,8 +492,9 @@ class DatasetsApiMixin(object):
                     extract=extract,
                     filename=name,
                     progress=progress,
+                    checksum=checksum,
                 )
-                for url, name in zip(urls, destination_names)
+                for url, name, checksum in zip(urls, destination_names, checksums)
             }
 
             for future in concurrent.futures.as_completed(futures):
@@ -475,13 +502,15 @@ class DatasetsApiMixin(object):
 
         return files
 
-    def _add_from_url(self, dataset, url, destination, extract, filename=None, progress=None):
+    def _add_from_url(self, dataset, url, destination, extract, filename=None, progress=None, checksum=None):
         """Process adding from url and return the location on disk."""
         url = self._provider_check(url)
 
         try:
             start = time.time() * 1e3
-            tmp_root, paths = self._download(url=url, filename=filename, extract=extract, progress_class=progress)
+            tmp_root, paths = self._download(
+                url=url, filename=filename, extract=extract, progress_class=progress, checksum=checksum
+            )
 
             exec_time = (time.time() * 1e3 - start) // 1e3
             # If execution time was less or equal to zero seconds,
@@ -852,17 +881,23 @@ class DatasetsApiMixin(object):
         # Update datasets' metadata
 
         modified_datasets = {}
+        new_files = defaultdict(list)
+        unlinked_paths = defaultdict(list)
 
         for file_ in updated_files:
             new_file = DatasetFile.from_revision(self, path=file_.path, based_on=file_.based_on, url=file_.url)
-            file_.dataset.update_files([new_file])
+            new_files[file_.dataset.name].append(new_file)
             modified_datasets[file_.dataset.name] = file_.dataset
 
         if delete:
             for file_ in deleted_files:
-                file_.dataset.unlink_file(file_.path)
+                unlinked_paths[file_.dataset.name].append(file_.path)
                 modified_datasets[file_.dataset.name] = file_.dataset
 
+        for name, dataset in modified_datasets.items():
+            dataset.update_files(new_files[name])
+            dataset.unlink_files(unlinked_paths[name])
+
         for dataset in modified_datasets.values():
             dataset.to_yaml()
 
@@ -979,10 +1014,7 @@ class DatasetsApiMixin(object):
 
     def has_external_files(self):
         """Return True if project has external files."""
-        for dataset in self.datasets.values():
-            for file_ in dataset.files:
-                if file_.external:
-                    return True
+        return any(summary.external_files for summary in self.datasets.summaries())
 
     def _is_path_within_repo(self, path):
         if not os.path.isabs(path):
@@ -1069,7 +1101,7 @@ class DatasetsApiMixin(object):
             return label.split("@")[1]
         return label
 
-    def _download(self, url, filename, extract, progress_class=None, chunk_size=16384):
+    def _download(self, url, filename, extract, progress_class=None, checksum=None):
         def extract_dataset(filepath):
             """Extract downloaded file."""
             try:
@@ -1081,32 +1113,19 @@ class DatasetsApiMixin(object):
                 filepath.unlink()
                 return Path(tmp), [p for p in Path(tmp).rglob("*")]
 
-        tmp_root = self.renku_path / self.CACHE
-        tmp_root.mkdir(parents=True, exist_ok=True)
-        tmp = tempfile.mkdtemp(dir=tmp_root)
-
-        with requests.get(url, stream=True, allow_redirects=True) as request:
-            request.raise_for_status()
-
+        if not filename:
+            u = parse.urlparse(url)
+            filename = Path(u.path).name
             if not filename:
-                u = parse.urlparse(url)
-                filename = Path(u.path).name
-                if not filename:
-                    raise errors.ParameterError(f"URL Cannot find a file to download from {url}")
+                raise errors.ParameterError(f"URL Cannot find a file to download from {url}")
 
-            download_to = Path(tmp) / filename
-            with open(str(download_to), "wb") as file_:
-                total_size = int(request.headers.get("content-length", 0))
-                progress_class = progress_class or DownloadProgressCallback
-                progress = progress_class(description=filename, total_size=total_size)
+        # NOTE: Partial downloads of a URL are kept in the same directory to resume them.
+        tmp = self.renku_path / self.CACHE / "downloads" / hashlib.sha256(url.encode("utf-8")).hexdigest()
+        tmp.mkdir(parents=True, exist_ok=True)
+
+        download_to = tmp / filename
+        download(url, download_to, progress_class=progress_class or DownloadProgressCallback, checksum=checksum)
 
-                try:
-                    for chunk in request.iter_content(chunk_size=chunk_size):
-                        if chunk:  # ignore keep-alive chunks
-                            file_.write(chunk)
-                            progress.update(size=len(chunk))
-                finally:
-                    progress.finalize()
         if extract:
             return extract_dataset(download_to)
 
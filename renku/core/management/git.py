@@ -20,6 +20,7 @@
 import glob
 import itertools
 import os
+import stat
 import sys
 import tempfile
 import time
@@ -46,6 +47,8 @@ def get_mapped_std_streams(lookup_paths, streams=("stdin", "stdout", "stderr")):
     for stream in streams:
         try:
             stream_stat = os.fstat(getattr(sys, stream).fileno())
+            if not stat.S_ISREG(stream_stat.st_mode):
+                continue
             key = stream_stat.st_dev, stream_stat.st_ino
             standard_inos[key] = stream
         except Exception:  # FIXME UnsupportedOperation
@@ -108,6 +111,9 @@ class GitCore:
     repo = attr.ib(init=False)
     """Store an instance of the Git repository."""
 
+    CHANGED_PATHS_BATCH = 1000
+    """Number of paths passed to a single Git command."""
+
     def __attrs_post_init__(self):
         """Initialize computed attributes."""
         from git import InvalidGitRepositoryError, Repo
@@ -131,12 +137,27 @@ class GitCore:
 
     @property
     def candidate_paths(self):
-        """Return all paths in the index and untracked files."""
+        """Return all paths in the index and untracked files.
+
+        Paths are generated lazily since reading the index is slow in large
+        repositories.
+        """
         repo_path = self.repo.working_dir
-        return [
-            os.path.join(repo_path, path)
-            for path in itertools.chain((x[0] for x in self.repo.index.entries), self.repo.untracked_files,)
-        ]
+        for path in itertools.chain((x[0] for x in self.repo.index.entries), self.repo.untracked_files):
+            yield os.path.join(repo_path, path)
+
+    def find_changed_paths(self, *paths):
+        """Return untracked and modified paths among the given paths."""
+        changed = set()
+        env = {"GIT_LITERAL_PATHSPECS": "1"}
+        paths = list(paths)
+        for start in range(0, len(paths), self.CHANGED_PATHS_BATCH):
+            batch = paths[start : start + self.CHANGED_PATHS_BATCH]
+            output = self.repo.git.ls_files("--others", "--exclude-standard", "-z", "--", *batch, env=env)
+            changed.update(path for path in output.split("\0") if path)
+            output = self.repo.git.diff("--name-only", "-z", "--diff-filter=d", "--", *batch, env=env)
+            changed.update(path for path in output.split("\0") if path)
+        return changed
 
     def find_ignored_paths(self, *paths):
         """Return ignored paths matching ``.gitignore`` file."""
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Snapshot of processed commits of the provenance graph.
+
+The snapshot stores activities built for each processed commit together with
+the latest commits of paths at the ``HEAD`` it was taken at. Git commits and
+clients are stored as references and are resolved against the current
+repository when the snapshot is loaded.
+
+Activities built from workflow files do not depend on ``HEAD`` and are reused
+as long as the snapshot ``HEAD`` is an ancestor of the current one. All other
+data is only reused when ``HEAD`` did not change. A snapshot is discarded
+after a rebase or a reset to an unrelated commit.
+
+The file is signed with a key stored in the user's configuration directory
+so that a snapshot which was not written by the current user is never
+unpickled.
+"""
+
+import copyreg
+import hashlib
+import hmac
+import io
+import os
+import pickle
+import posixpath
+import weakref
+
+import attr
+from git import Commit, Repo
+from git.exc import GitCommandError
+from git.util import hex_to_bin
+
+from renku.version import __version__
+
+KEY_NAME = "cache.key"
+"""Name of the file with the signing key in the user's config directory."""
+
+
+class _ForeignObject(Exception):
+    """Raised when an object of another repository is pickled."""
+
+
+def _dead_reference():
+    """Replace a dead weak reference."""
+    return None
+
+
+def _reduce_weakref(ref):
+    """Pickle a weak reference as a reference to the same object."""
+    obj = ref()
+    if obj is None:
+        return _dead_reference, ()
+    return weakref.ref, (obj,)
+
+
+def dumps(data, client):
+    """Pickle data storing commits, repositories and clients as references.
+
+    :raises pickle.PicklingError: if data refers to another repository.
+    """
+    from renku.core.management.repository import RepositoryApiMixin
+
+    def persistent_id(obj):
+        if isinstance(obj, Commit):
+            if obj.repo.working_dir != client.repo.working_dir:
+                raise _ForeignObject(obj)
+            return "commit", obj.hexsha
+        elif isinstance(obj, Repo):
+            if obj.working_dir != client.repo.working_dir:
+                raise _ForeignObject(obj)
+            return "repo", None
+        elif isinstance(obj, RepositoryApiMixin):
+            if obj is not client:
+                raise _ForeignObject(obj)
+            return "client", None
+
+    stream = io.BytesIO()
+    pickler = pickle.Pickler(stream, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = copyreg.dispatch_table.copy()
+    pickler.dispatch_table[weakref.ReferenceType] = _reduce_weakref
+    pickler.persistent_id = persistent_id
+    try:
+        pickler.dump(data)
+    except _ForeignObject as e:
+        raise pickle.PicklingError("Cannot pickle {0}".format(e.args[0]))
+    return stream.getvalue()
+
+
+def loads(content, client):
+    """Unpickle data resolving references against the given client."""
+
+    def persistent_load(pid):
+        kind, value = pid
+        if kind == "commit":
+            return Commit(client.repo, hex_to_bin(value))
+        elif kind == "repo":
+            return client.repo
+        elif kind == "client":
+            return client
+
+        raise pickle.UnpicklingError("Unknown reference {0}".format(pid))
+
+    unpickler = pickle.Unpickler(io.BytesIO(content))
+    unpickler.persistent_load = persistent_load
+    return unpickler.load()
+
+
+@attr.s
+class GraphCache:
+    """Persist processed activities and latest commits between commands."""
+
+    client = attr.ib()
+
+    NAME = "graph.pickle"
+    """Name of the snapshot file inside the cache directory."""
+
+    @property
+    def path(self):
+        """Return path of the snapshot file."""
+        return self.client.cache_path / self.NAME
+
+    def is_enabled(self):
+        """Check if the snapshot can be stored without being committed."""
+        if os.environ.get("RENKU_DISABLE_GRAPH_CACHE"):
+            return False
+        relative_path = str(self.path.relative_to(self.client.path))
+        return bool(self.client.repo) and bool(self.client.find_ignored_paths(relative_path))
+
+    def load(self):
+        """Return processed activities and latest commits valid for ``HEAD``."""
+        from renku.core.models.provenance.activities import ProcessRun
+
+        if not self.is_enabled() or not self.path.exists():
+            return {}, {}
+
+        try:
+            data = self._loads(self.path.read_bytes())
+        except Exception:
+            return {}, {}
+
+        if data.get("version") != __version__:
+            return {}, {}
+
+        head = self.client.repo.head.commit.hexsha
+        processed, latest_commits = data["processed"], data["latest_commits"]
+
+        if data["head"] == head:
+            return processed, latest_commits
+
+        try:
+            if not self.client.repo.is_ancestor(data["head"], head):
+                return {}, {}
+            changed = self.client.repo.git.diff("--name-only", "--no-renames", "-z", data["head"], head)
+        except (GitCommandError, ValueError):
+            return {}, {}
+
+        processed = {
+            hexsha: activity
+            for hexsha, activity in processed.items()
+            if isinstance(activity, ProcessRun) and activity.commit and activity.commit.hexsha == hexsha
+        }
+
+        modified = set()
+        for path in changed.split("\0"):
+            while path and path not in modified:
+                modified.add(path)
+                path = posixpath.dirname(path)
+        latest_commits = {path: commit for path, commit in latest_commits.items() if path not in modified}
+
+        return processed, latest_commits
+
+    def save(self, processed, latest_commits):
+        """Store processed activities and latest commits for ``HEAD``."""
+        if not self.is_enabled():
+            return
+
+        repo = self.client.repo
+        data = {
+            "version": __version__,
+            "head": repo.head.commit.hexsha,
+            "processed": processed,
+            "latest_commits": {
+                path: commit
+                for path, commit in latest_commits.items()
+                if commit is None or commit.repo.working_dir == repo.working_dir
+            },
+        }
+
+        try:
+            content = self._dumps(data)
+        except Exception:
+            # NOTE: Graphs with entities from submodules or otherwise unpicklable objects are not cached.
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_name("{0}.{1}".format(self.NAME, os.getpid()))
+        temporary.write_bytes(content)
+        os.replace(str(temporary), str(self.path))
+
+    def clear(self):
+        """Remove the snapshot."""
+        if self.path.exists():
+            self.path.unlink()
+
+    @property
+    def _key(self):
+        """Return the user's signing key and create it if needed."""
+        key_path = os.path.join(self.client.global_config_dir, KEY_NAME)
+        try:
+            with open(key_path, "rb") as key_file:
+                return key_file.read()
+        except FileNotFoundError:
+            os.makedirs(self.client.global_config_dir, exist_ok=True)
+            key = os.urandom(32)
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as key_file:
+                key_file.write(key)
+            return key
+
+    def _dumps(self, data):
+        """Pickle and sign data."""
+        content = dumps(data, self.client)
+        return hmac.new(self._key, content, hashlib.sha256).digest() + content
+
+    def _loads(self, content):
+        """Verify and unpickle data."""
+        digest, content = content[: hashlib.sha256().digest_size], content[hashlib.sha256().digest_size :]
+        if not hmac.compare_digest(digest, hmac.new(self._key, content, hashlib.sha256).digest()):
+            raise ValueError("Invalid signature of {0}".format(self.path))
+        return loads(content, self.client)
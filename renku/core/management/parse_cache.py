@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Content-addressed cache of parsed metadata files.
+
+Parsed YAML documents are stored with :mod:`marshal` in files named after
+the Git blob SHA of their content. Contents of Git blobs are never parsed
+again once their SHA is known and files in the working directory only need
+to be hashed. Modification times of entries are updated on every hit and
+the least recently used entries are removed once the cache grows over its
+maximum size.
+"""
+
+import hashlib
+import marshal
+import os
+
+import attr
+
+MAX_SIZE = 256 * 1024 ** 2
+"""Default maximum size of the cache in bytes."""
+
+
+def blob_sha(content):
+    """Return Git blob SHA of content."""
+    sha = hashlib.sha1(b"blob %d\0" % len(content))
+    sha.update(content)
+    return sha.hexdigest()
+
+
+@attr.s
+class ParseCache:
+    """Cache of parsed YAML metadata keyed by Git blob SHA."""
+
+    NAME = "parsed"
+    """Name of the directory inside the cache directory."""
+
+    path = attr.ib()
+    """Directory of cache entries."""
+
+    max_size = attr.ib(default=MAX_SIZE)
+    """Maximum size of all entries in bytes."""
+
+    enabled = attr.ib(default=True)
+
+    _size = attr.ib(default=None, init=False)
+
+    def read(self, path):
+        """Return parsed content of a file."""
+        with open(str(path), "rb") as fp:
+            content = fp.read()
+        return self._load(blob_sha(content), lambda: content)
+
+    def read_blob(self, blob):
+        """Return parsed content of a Git blob."""
+        return self._load(blob.hexsha, lambda: blob.data_stream.read())
+
+    def _load(self, key, read):
+        """Return cached data for a key or parse and store it."""
+        from renku.core.models.jsonld import load_yaml
+
+        if not self.enabled:
+            return load_yaml(read())
+
+        data = self.get(key)
+        if data is None:
+            data = load_yaml(read())
+            self.set(key, data)
+        return data
+
+    def _entry_path(self, key):
+        """Return path of an entry."""
+        return os.path.join(str(self.path), "marshal-{0}".format(marshal.version), key[:2], key[2:])
+
+    def get(self, key):
+        """Return cached data or ``None``."""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "rb") as fp:
+                data = marshal.load(fp)
+            os.utime(entry_path)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        if not isinstance(data, (dict, list)):
+            return None
+        return data
+
+    def set(self, key, data):
+        """Store data in the cache."""
+        try:
+            content = marshal.dumps(data)
+        except ValueError:
+            # NOTE: Data contains types that cannot be marshalled.
+            return
+
+        entry_path = self._entry_path(key)
+        temporary = "{0}.{1}".format(entry_path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            with open(temporary, "wb") as fp:
+                fp.write(content)
+            os.replace(temporary, entry_path)
+        except OSError:
+            return
+
+        if self._size is not None:
+            self._size += len(content)
+        if self.size > self.max_size:
+            self.evict()
+
+    @property
+    def size(self):
+        """Return size of all entries in bytes."""
+        if self._size is None:
+            self._size = sum(size for _, _, size in self._entries())
+        return self._size
+
+    def _entries(self):
+        """Yield path, access time and size of all entries."""
+        for root, _, files in os.walk(str(self.path)):
+            for name in files:
+                entry_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(entry_path)
+                except OSError:
+                    continue
+                yield entry_path, stat.st_mtime, stat.st_size
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its size."""
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        size = sum(size for _, _, size in entries)
+
+        for entry_path, _, entry_size in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.unlink(entry_path)
+            except OSError:
+                continue
+            size -= entry_size
+
+        self._size = size
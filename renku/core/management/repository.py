@@ -17,6 +17,7 @@
 # limitations under the License.
 """Client for handling a local repository."""
 import os
+import posixpath
 import shutil
 import subprocess
 import uuid
@@ -26,13 +27,15 @@ from subprocess import check_output
 
 import attr
 import filelock
-import yaml
 from jinja2 import Template
 from werkzeug.utils import cached_property, secure_filename
 
 from renku.core import errors
 from renku.core.compat import Path
+from renku.core.management.activity_index import ActivityIndex
 from renku.core.management.config import RENKU_HOME
+from renku.core.management.parse_cache import ParseCache
+from renku.core.management.step_cache import Checkpoints, StepCache
 from renku.core.models.locals import with_reference
 from renku.core.models.projects import Project
 from renku.core.models.refs import LinkReference
@@ -41,6 +44,11 @@ from .git import GitCore
 
 DEFAULT_DATA_DIR = "data"
 
+PREVIOUS_COMMITS_BATCH_SIZE = 1000
+"""Maximum number of paths passed to a single ``git log``."""
+
+_MISSING = object()
+
 
 def default_path():
     """Return default repository path."""
@@ -99,9 +107,12 @@ class RepositoryApiMixin(GitCore):
     WORKFLOW = "workflow"
     """Directory for storing workflow in Renku."""
 
-    ACTIVITY_INDEX = "activity_index.yaml"
+    ACTIVITY_INDEX = "activity_index.jsonl"
     """Caches activities that generated a path."""
 
+    LEGACY_ACTIVITY_INDEX = "activity_index.yaml"
+    """Activity cache used by older Renku versions."""
+
     RENKU_PROTECTED_PATHS = [
         "\\.renku/.*",
         "Dockerfile",
@@ -117,6 +128,12 @@ class RepositoryApiMixin(GitCore):
 
     _activity_index = None
 
+    _parse_cache = None
+
+    _step_cache = None
+
+    _checkpoints = None
+
     _remote_cache = {}
 
     def __attrs_post_init__(self):
@@ -136,6 +153,10 @@ class RepositoryApiMixin(GitCore):
 
         self._project = None
 
+        self._previous_commits = {}
+
+        self._commit_activity_cache = {}
+
         super().__attrs_post_init__()
 
         # initialize submodules
@@ -170,6 +191,55 @@ class RepositoryApiMixin(GitCore):
         """Path to the activity filepath cache."""
         return self.renku_path / self.ACTIVITY_INDEX
 
+    @property
+    def cache_path(self):
+        """Path to the directory with transient data."""
+        return self.renku_path / self.CACHE
+
+    @property
+    def activity_index(self):
+        """Return the append-only index of activities."""
+        if self._activity_index is None:
+            self._activity_index = ActivityIndex(
+                path=self.activity_index_path, legacy_path=self.renku_path / self.LEGACY_ACTIVITY_INDEX
+            )
+        return self._activity_index
+
+    @property
+    def parse_cache(self):
+        """Return the cache of parsed metadata files."""
+        if self._parse_cache is None:
+            path = self.cache_path / ParseCache.NAME
+            enabled = (
+                not os.environ.get("RENKU_DISABLE_PARSE_CACHE")
+                and bool(self.repo)
+                and bool(self.find_ignored_paths(str(path.relative_to(self.path))))
+            )
+            self._parse_cache = ParseCache(path=path, enabled=enabled)
+        return self._parse_cache
+
+    @property
+    def step_cache(self):
+        """Return the cache of results of workflow steps."""
+        if self._step_cache is None:
+            path = self.cache_path / StepCache.NAME
+            enabled = (
+                not os.environ.get("RENKU_DISABLE_STEP_CACHE")
+                and bool(self.repo)
+                and bool(self.find_ignored_paths(str(path.relative_to(self.path))))
+            )
+            self._step_cache = StepCache(path=path, enabled=enabled)
+        return self._step_cache
+
+    @property
+    def checkpoints(self):
+        """Return outputs of steps of unfinished workflow executions."""
+        if self._checkpoints is None:
+            path = self.cache_path / Checkpoints.NAME
+            enabled = bool(self.repo) and bool(self.find_ignored_paths(str(path.relative_to(self.path))))
+            self._checkpoints = Checkpoints(path=path, enabled=enabled)
+        return self._checkpoints
+
     @cached_property
     def cwl_prefix(self):
         """Return a CWL prefix."""
@@ -250,6 +320,10 @@ class RepositoryApiMixin(GitCore):
                     path = file_
 
         if not path:
+            if commit.hexsha not in self.activity_index.commits:
+                # NOTE: No activity generated anything in this commit.
+                return Activity(commit=commit, client=self)
+
             # search for activities a file could have been a part of
             activities = self.activities_for_paths(commit.stats.files.keys(), file_commit=commit, revision="HEAD")
             if len(activities) > 1:
@@ -259,8 +333,8 @@ class RepositoryApiMixin(GitCore):
             if activities:
                 return activities[0]
         else:
-            data = (commit.tree / path).data_stream.read()
-            process = Activity.from_jsonld(yaml.safe_load(data), client=self, commit=commit)
+            data = self.parse_cache.read_blob(commit.tree / path)
+            process = Activity.from_jsonld(data, client=self, commit=commit)
 
             return process
 
@@ -280,6 +354,17 @@ class RepositoryApiMixin(GitCore):
         """
         kwargs = {}
 
+        cache = None
+        if not return_first and not full and isinstance(paths, (str, Path)):
+            cache = self._get_previous_commits_cache(revision)
+
+        if cache is not None:
+            commit = cache.get(str(paths), _MISSING)
+            if commit is not _MISSING:
+                if commit is None:
+                    raise KeyError("Could not find a file {0} in range {1}".format(paths, revision))
+                return commit
+
         if full:
             kwargs["full_history"] = True
 
@@ -288,11 +373,125 @@ class RepositoryApiMixin(GitCore):
         else:
             file_commits = list(self.repo.iter_commits(revision, paths=paths, max_count=1, **kwargs))
 
+        if cache is not None:
+            cache[str(paths)] = file_commits[0] if file_commits else None
+
         if not file_commits:
             raise KeyError("Could not find a file {0} in range {1}".format(paths, revision))
 
         return file_commits[-1 if return_first else 0]
 
+    def find_previous_commits(self, paths, revision="HEAD"):
+        """Return a mapping from paths to the latest commits that modified them.
+
+        The history is walked once for all paths instead of calling
+        ``find_previous_commit`` for each of them. Results are cached per
+        revision and reused by ``find_previous_commit``. Paths that are not
+        present in the history are omitted from the result.
+        """
+        commit = self.repo.commit(revision)
+        cache = self._get_previous_commits_cache(commit)
+
+        paths = {str(path) for path in paths}
+        missing = sorted(path for path in paths if path not in cache)
+
+        for index in range(0, len(missing), PREVIOUS_COMMITS_BATCH_SIZE):
+            batch = missing[index : index + PREVIOUS_COMMITS_BATCH_SIZE]
+            found, complete = self._walk_previous_commits(batch, commit)
+            cache.update(found)
+
+            for path in batch:
+                if path in found:
+                    continue
+                if complete:
+                    cache[path] = None
+                    continue
+                try:
+                    self.find_previous_commit(path, revision=commit)
+                except KeyError:
+                    pass
+
+        return {path: cache[path] for path in paths if cache.get(path) is not None}
+
+    def _get_previous_commits_cache(self, revision):
+        """Return cached latest commits of paths for a revision."""
+        from git.exc import BadName
+
+        try:
+            hexsha = self.repo.commit(revision).hexsha
+        except (BadName, ValueError):
+            return None
+
+        return self._previous_commits.setdefault(hexsha, {})
+
+    def _walk_previous_commits(self, paths, commit):
+        """Find latest commits of paths with a single ``git log``.
+
+        Return found commits and whether the walk covered the whole history.
+        The walk stops at the first merge commit since history simplification
+        for a single path may follow a different parent.
+        """
+        pending = defaultdict(list)
+        for path in paths:
+            normalized = posixpath.normpath(path)
+            if normalized != "." and not posixpath.isabs(normalized):
+                pending[normalized].append(path)
+
+        complete = sum(len(originals) for originals in pending.values()) == len(paths)
+        found = {}
+
+        command = [
+            "git",
+            "--literal-pathspecs",
+            "log",
+            "--format=%x1e%H %P",
+            "--name-only",
+            "--no-renames",
+            "-z",
+            commit.hexsha,
+            "--",
+        ] + sorted(pending)
+
+        def process(record):
+            """Resolve pending paths modified in a commit record."""
+            header, _, files = record.partition(b"\0")
+            hexsha, *parents = header.decode().split()
+            if len(parents) > 1:
+                return False
+
+            file_commit = None
+            for file_ in files.lstrip(b"\n").split(b"\0"):
+                path = os.fsdecode(file_)
+                while path:
+                    if path in pending:
+                        file_commit = file_commit or self.repo.commit(hexsha)
+                        found.update((original, file_commit) for original in pending.pop(path))
+                    path = posixpath.dirname(path)
+            return True
+
+        with subprocess.Popen(command, cwd=str(self.path), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as proc:
+            buffer = b""
+            for chunk in iter(lambda: proc.stdout.read(1 << 16), b""):
+                *records, buffer = (buffer + chunk).split(b"\x1e")
+                for record in records:
+                    if record and not process(record):
+                        complete = False
+                        pending.clear()
+                        break
+                if not pending:
+                    proc.kill()
+                    break
+            else:
+                if buffer and not process(buffer):
+                    complete = False
+
+            returncode = proc.wait()
+
+        if returncode and pending:
+            complete = False
+
+        return found, complete
+
     @cached_property
     def workflow_names(self):
         """Return index of workflow names."""
@@ -330,10 +529,11 @@ class RepositoryApiMixin(GitCore):
             if subpath.exists() and is_renku.exists():
                 subclients[submodule] = self.__class__(path=subpath, parent=(self, submodule),)
 
+        self._subclients[parent_commit] = subclients
         return subclients
 
-    def resolve_in_submodules(self, commit, path):
-        """Resolve filename in submodules."""
+    def _find_subclient(self, commit, path):
+        """Return submodule, client and relative path of a file in a submodule or ``None``."""
         original_path = self.path / path
         in_vendor = str(path).startswith(".renku/vendors")
 
@@ -342,19 +542,46 @@ class RepositoryApiMixin(GitCore):
 
             for submodule, subclient in self.subclients(commit).items():
                 if (Path(submodule.path) / Path(".git")).exists():
-
                     try:
-                        subpath = original_path.relative_to(subclient.path)
-                        return (
-                            subclient,
-                            subclient.find_previous_commit(subpath, revision=submodule.hexsha),
-                            subpath,
-                        )
+                        return submodule, subclient, original_path.relative_to(subclient.path)
                     except ValueError:
                         pass
 
+    def resolve_in_submodules(self, commit, path):
+        """Resolve filename in submodules."""
+        found = self._find_subclient(commit, path)
+        if found:
+            submodule, subclient, subpath = found
+            return subclient, subclient.find_previous_commit(subpath, revision=submodule.hexsha), subpath
+
         return self, commit, path
 
+    def resolve_all_in_submodules(self, commits):
+        """Resolve filenames in submodules for a mapping from paths to commits.
+
+        Latest commits of files in each submodule are found with a single
+        history walk. Return a mapping from paths to the results of
+        ``resolve_in_submodules``.
+        """
+        found = {path: self._find_subclient(commit, path) for path, commit in commits.items()}
+
+        batches = {}
+        for result in found.values():
+            if result:
+                submodule, subclient, subpath = result
+                batches.setdefault(id(subclient), (submodule, subclient, []))[2].append(subpath)
+        for submodule, subclient, subpaths in batches.values():
+            subclient.find_previous_commits(subpaths, revision=submodule.hexsha)
+
+        resolved = {}
+        for path, result in found.items():
+            if result:
+                submodule, subclient, subpath = result
+                resolved[path] = subclient, subclient.find_previous_commit(subpath, revision=submodule.hexsha), subpath
+            else:
+                resolved[path] = self, commits[path], path
+        return resolved
+
     @contextmanager
     def with_commit(self, commit):
         """Yield the state of the repo at a specific commit."""
@@ -445,39 +672,27 @@ class RepositoryApiMixin(GitCore):
     @property
     def path_activity_cache(self):
         """Cache of all activities and their generated paths."""
-        # TODO: this is there for performance reasons. Remove once graph
-        # is stored as a flat, append-only list (Should be graph query
-        # in the future)
-        if self._activity_index:
-            return self._activity_index
-
-        path = self.activity_index_path
-
-        if path.exists():
-            with path.open("r") as stream:
-                self._activity_index = yaml.safe_load(stream)
-        else:
-            self._activity_index = {}
-
-        return self._activity_index
+        return self.activity_index.paths
 
     def add_to_activity_index(self, activity):
         """Add an activity and it's generations to the cache."""
-        for g in activity.generated:
-            if g.path not in self.path_activity_cache:
-                self.path_activity_cache[g.path] = {}
-            hexsha = g.commit.hexsha
-            if hexsha not in self.path_activity_cache[g.path]:
-                self.path_activity_cache[g.path][hexsha] = []
+        self.activity_index.add(activity)
+
+    def rebuild_activity_index(self):
+        """Recreate the activity index from workflow files in the history."""
+        from renku.core.models.provenance.activities import Activity
 
-            if activity.path in self.path_activity_cache[g.path][hexsha]:
-                continue
+        activities = []
+        for path in sorted(self.workflow_path.glob("*.yaml")):
+            path = path.relative_to(self.path)
+            try:
+                commit = self.find_previous_commit(path)
+            except KeyError:
+                continue  # NOTE: Uncommitted workflow files are not indexed.
 
-            self.path_activity_cache[g.path][g.commit.hexsha].append(activity.path)
+            activities.append(Activity.from_yaml(self.path / path, client=self, commit=commit))
 
-        if self.path_activity_cache:
-            with self.activity_index_path.open("w") as stream:
-                yaml.dump(self.path_activity_cache, stream)
+        self.activity_index.rebuild(activities)
 
     def activities_for_paths(self, paths, file_commit=None, revision="HEAD"):
         """Get all activities involving a path."""
@@ -487,15 +702,15 @@ class RepositoryApiMixin(GitCore):
 
         for p in paths:
             if p not in self.path_activity_cache:
-                parent_paths = [a for a in self.path_activity_cache.keys() if p.startswith(a)]
+                parent_paths = self.activity_index.parent_paths(p)
                 if not parent_paths:
                     continue
                 matching_activities = [
                     a
-                    for k, v in self.path_activity_cache.items()
-                    for ck, cv in v.items()
+                    for k in parent_paths
+                    for ck, cv in self.path_activity_cache[k].items()
                     for a in cv
-                    if k in parent_paths and (not file_commit or ck == file_commit.hexsha)
+                    if not file_commit or ck == file_commit.hexsha
                 ]
             else:
                 matching = self.path_activity_cache[p]
@@ -544,3 +759,9 @@ class RepositoryApiMixin(GitCore):
                 destination.mkdir(parents=True, exist_ok=True)
             except TypeError:
                 shutil.copy(file, destination)
+
+
+ACTIVITY_INDEX_PATHS = [
+    Path(RENKU_HOME) / RepositoryApiMixin.ACTIVITY_INDEX,
+    Path(RENKU_HOME) / RepositoryApiMixin.LEGACY_ACTIVITY_INDEX,
+]
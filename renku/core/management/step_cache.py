@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Content-addressed cache of results of workflow steps.
+
+A step is identified by a hash of its command line, the Git object SHAs of
+its inputs and of the files describing the environment of the project. The
+cache maps such a key to the Git object SHAs of outputs recorded by an earlier
+``ProcessRun`` so that outputs can be restored instead of recomputed. Entries
+are created from activities in the history of the project; every activity
+file is indexed only once.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import attr
+
+ENVIRONMENT_FILES = ("Dockerfile", "requirements.txt", "environment.yml", "environment.yaml", "install.R")
+"""Files describing the environment in which steps are run."""
+
+
+def object_sha(tree, path):
+    """Return SHA of a blob or a tree in a Git tree or ``None``."""
+    try:
+        return (tree / str(path)).hexsha
+    except KeyError:
+        return None
+
+
+def environment_fingerprint(tree):
+    """Return SHAs of environment files in a Git tree."""
+    return {path: object_sha(tree, path) for path in ENVIRONMENT_FILES}
+
+
+def step_key(argv, inputs, environment):
+    """Return the key of a step from its command line and SHAs."""
+    content = json.dumps([list(argv), sorted(inputs.items()), sorted(environment.items())])
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def run_command_line(run):
+    """Return command line of a plan including its standard streams."""
+    return run.to_argv() + list(run.to_stream_repr())
+
+
+def _write(path, content):
+    """Write a file atomically."""
+    temporary = "{0}.{1}".format(path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary, "w") as fp:
+            fp.write(content)
+        os.replace(temporary, path)
+    except OSError:
+        return
+
+
+def _read(path):
+    """Return content of a JSON entry with outputs or ``None``."""
+    try:
+        with open(path, "r") as fp:
+            data = json.load(fp)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or "outputs" not in data:
+        return None
+    return data
+
+
+@attr.s
+class StepCache:
+    """Cache of step outputs keyed by their command line and inputs."""
+
+    NAME = "steps"
+    """Name of the directory inside the cache directory."""
+
+    path = attr.ib()
+    """Directory of cache entries."""
+
+    enabled = attr.ib(default=True)
+
+    def _entry_path(self, key):
+        """Return path of an entry."""
+        return os.path.join(str(self.path), "results", key[:2], key[2:])
+
+    def _indexed_path(self, activity_path):
+        """Return path of the marker of an indexed activity file."""
+        return os.path.join(str(self.path), "activities", os.path.basename(str(activity_path)))
+
+    def get(self, key):
+        """Return activity and output SHAs of a step or ``None``."""
+        if not self.enabled:
+            return None
+        return _read(self._entry_path(key))
+
+    def set(self, key, activity, outputs):
+        """Store output SHAs of a step."""
+        if not self.enabled:
+            return
+        _write(self._entry_path(key), json.dumps({"activity": activity, "outputs": outputs}))
+
+    def is_indexed(self, activity):
+        """Check if results of an activity are in the cache."""
+        return os.path.exists(self._indexed_path(activity.path))
+
+    def index(self, activity):
+        """Add results of all process runs of an activity."""
+        from renku.core.models.provenance.activities import WorkflowRun
+
+        if not self.enabled or not activity.commit or self.is_indexed(activity):
+            return
+
+        runs = activity.subprocesses.values() if isinstance(activity, WorkflowRun) else [activity]
+        for run in runs:
+            tree = (run.commit or activity.commit).tree
+            plan = run.association.plan
+
+            inputs = {i.consumes.path: object_sha(tree, i.consumes.path) for i in plan.inputs}
+            outputs = {o.produces.path: object_sha(tree, o.produces.path) for o in plan.outputs}
+            if not outputs or None in inputs.values() or None in outputs.values():
+                continue
+
+            key = step_key(run_command_line(plan), inputs, environment_fingerprint(tree))
+            self.set(key, run._id, outputs)
+
+        _write(self._indexed_path(activity.path), "")
+
+
+@attr.s
+class Checkpoints:
+    """Outputs of steps of a workflow execution that did not finish.
+
+    Entries use the keys of the step cache. Besides the Git object SHAs of
+    outputs they hold the times and resource usage of a step so that they
+    can be recorded when the execution is resumed.
+    """
+
+    NAME = "checkpoints"
+    """Name of the directory inside the cache directory."""
+
+    path = attr.ib()
+    """Directory of checkpoints."""
+
+    enabled = attr.ib(default=True)
+
+    def _entry_path(self, key):
+        """Return path of an entry."""
+        return os.path.join(str(self.path), key[:2], key[2:])
+
+    def get(self, key):
+        """Return outputs, times and resource usage of a step or ``None``."""
+        if not self.enabled:
+            return None
+        return _read(self._entry_path(key))
+
+    def save(self, key, outputs, started, ended, usage=None):
+        """Store output SHAs of a finished step."""
+        if not self.enabled:
+            return
+        data = {"outputs": outputs, "started": started.isoformat(), "ended": ended.isoformat(), "usage": usage}
+        _write(self._entry_path(key), json.dumps(data))
+
+    def clear(self):
+        """Remove all checkpoints."""
+        shutil.rmtree(str(self.path), ignore_errors=True)
@@ -21,7 +21,9 @@ import os
 import re
 import shlex
 import tempfile
+import threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from shutil import move, which
 from subprocess import PIPE, STDOUT, call, check_output, run
@@ -36,9 +38,22 @@ from renku.core.utils.file_size import parse_file_size
 from .git import _expand_directories
 from .repository import RepositoryApiMixin
 
-# Batch size for when renku is expanding a large list
-# of files into an argument string.
-ARGUMENT_BATCH_SIZE = 100
+# Maximum length of an argument string when renku is expanding a large
+# list of files into it.
+ARGUMENT_MAX_LENGTH = 64 * 1024
+
+
+def _batches_by_length(paths, max_length=ARGUMENT_MAX_LENGTH):
+    """Yield lists of paths whose comma-separated length is below a limit."""
+    batch, length = [], 0
+    for path in paths:
+        if batch and length + len(path) + 1 > max_length:
+            yield batch
+            batch, length = [], 0
+        batch.append(path)
+        length += len(path) + 1
+    if batch:
+        yield batch
 
 
 def check_external_storage_wrapper(fn):
@@ -234,32 +249,81 @@ class StorageApiMixin(RepositoryApiMixin):
         return files
 
     @check_external_storage_wrapper
-    def pull_paths_from_storage(self, *paths):
-        """Pull paths from LFS."""
-        import math
+    def pull_paths_from_storage(self, *paths, progress=None):
+        """Pull paths from LFS.
 
-        client_dict = defaultdict(list)
+        Only files that are still LFS pointers are pulled. Each repository is
+        pulled with as few ``git lfs pull`` calls as possible and submodules
+        are pulled at the same time.
+
+        :param progress: a class like ``DownloadProgressCallback`` that is
+            notified of the number of pulled bytes
+        """
+        client_dict = defaultdict(dict)
+        commit = self.repo.commit()
 
         for path in _expand_directories(paths):
-            client, commit, path = self.resolve_in_submodules(self.repo.commit(), path)
+            size = self.get_lfs_pointer_size(path)
+            if size is None:
+                continue
+
+            client, _, path = self.resolve_in_submodules(commit, path)
             try:
                 absolute_path = Path(path).resolve()
                 relative_path = absolute_path.relative_to(client.path)
             except ValueError:  # An external file
                 absolute_path = Path(os.path.abspath(path))
                 relative_path = absolute_path.relative_to(client.path)
-            client_dict[client.path].append(str(relative_path))
+            client_dict[client.path][str(relative_path)] = size
 
-        for client_path, paths in client_dict.items():
-            batch_size = math.ceil(len(paths) / ARGUMENT_BATCH_SIZE)
-            for index in range(batch_size):
-                run(
-                    self._CMD_STORAGE_PULL
-                    + [shlex.quote(",".join(paths[index * ARGUMENT_BATCH_SIZE : (index + 1) * ARGUMENT_BATCH_SIZE]))],
-                    cwd=client_path,
-                    stdout=PIPE,
-                    stderr=STDOUT,
-                )
+        if not client_dict:
+            return
+
+        total_size = sum(size for sizes in client_dict.values() for size in sizes.values())
+        progress = progress(description="Pulling from Git LFS", total_size=total_size) if progress else None
+        lock = threading.Lock()
+
+        def pull(client_path, sizes):
+            """Pull all pointers of a repository."""
+            for batch in _batches_by_length(sorted(sizes)):
+                command = self._CMD_STORAGE_PULL + [shlex.quote(",".join(batch))]
+                run(command, cwd=client_path, stdout=PIPE, stderr=STDOUT)
+                if progress:
+                    with lock:
+                        progress.update(sum(sizes[path] for path in batch))
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(client_dict)) as pool:
+                for future in [pool.submit(pull, path, sizes) for path, sizes in client_dict.items()]:
+                    future.result()
+        finally:
+            if progress:
+                progress.finalize()
+
+    def get_lfs_pointer_size(self, path):
+        """Return size of a file that is a Git LFS pointer or ``None`` if it was pulled."""
+        try:
+            with open(str(path), "rb") as file_:
+                content = file_.read(1024)
+        except OSError:
+            return None
+
+        if not content.startswith(self._LFS_HEADER.encode("utf-8")):
+            return None
+
+        match = re.search(rb"^size (\d+)$", content, re.MULTILINE)
+        return int(match.group(1)) if match else None
+
+    def get_lfs_pointer_sizes(self, *paths):
+        """Return sizes of files that are Git LFS pointers which were not pulled."""
+        sizes = {}
+
+        for path in _expand_directories(str(self.path / path) for path in paths):
+            size = self.get_lfs_pointer_size(path)
+            if size is not None:
+                sizes[os.path.relpath(path, str(self.path))] = size
+
+        return sizes
 
     @check_external_storage_wrapper
     def clean_storage_cache(self, *paths):
@@ -17,6 +17,7 @@
 # limitations under the License.
 """Represent a ``CommandLineToolFactory`` for tracking workflows."""
 
+import datetime
 import os
 import re
 import shlex
@@ -30,6 +31,7 @@ from git import Actor
 
 from renku.core import errors
 from renku.core.commands.echo import INFO
+from renku.core.utils.file_changes import InotifyWatcher, Snapshot
 from renku.version import __version__, version_url
 
 from ...management.config import RENKU_HOME
@@ -44,6 +46,9 @@ RENKU_FILELIST_PATH = os.getenv("RENKU_FILELIST_PATH", RENKU_TMP_DIR)
 INDIRECT_INPUTS_LIST = os.path.join(RENKU_FILELIST_PATH, "inputs.txt")
 INDIRECT_OUTPUTS_LIST = os.path.join(RENKU_FILELIST_PATH, "outputs.txt")
 
+OUTPUT_DETECTION_MODES = ("git", "snapshot", "inotify")
+"""Ways of detecting files written by a command."""
+
 
 @attr.s
 class CommandLineToolFactory(object):
@@ -58,6 +63,9 @@ class CommandLineToolFactory(object):
 
     no_input_detection = attr.ib(default=False)
     no_output_detection = attr.ib(default=False)
+    output_detection = attr.ib(default=None)
+    lazy_directories = attr.ib(default=None)
+    cpus = attr.ib(default=None)
 
     directory = attr.ib(default=".", converter=lambda path: Path(path).resolve(),)
     working_dir = attr.ib(default=".", converter=lambda path: Path(path).resolve(),)
@@ -81,6 +89,12 @@ class CommandLineToolFactory(object):
     messages = attr.ib(default=None)
     warnings = attr.ib(default=None)
 
+    started_at_time = attr.ib(default=None, init=False)
+    ended_at_time = attr.ib(default=None, init=False)
+    resource_usage = attr.ib(default=None, init=False)
+
+    _existing_paths = attr.ib(factory=dict, init=False, repr=False)
+
     def __attrs_post_init__(self):
         """Derive basic information."""
         self.baseCommand, detect = self.split_command_and_args()
@@ -129,8 +143,91 @@ class CommandLineToolFactory(object):
         if hasattr(self, "annotations") and self.annotations:
             process_run.add_annotations(self.annotations)
 
+        if self.started_at_time and self.ended_at_time:
+            process_run.started_at_time = self.started_at_time
+            process_run.ended_at_time = self.ended_at_time
+
         return process_run
 
+    def use_lazy_directories(self, client):
+        """Return if input directories are recorded without their members."""
+        if self.lazy_directories is not None:
+            return self.lazy_directories
+        return str(client.get_value("renku", "lazy_directories")).lower() == "true"
+
+    def _output_watcher(self, client):
+        """Return a watcher of files for the output detection mode or ``None``."""
+        mode = self.output_detection or client.get_value("renku", "output_detection") or "git"
+        if mode not in OUTPUT_DETECTION_MODES:
+            raise errors.ConfigurationError(
+                "Invalid output detection mode '{0}', use one of: {1}".format(mode, ", ".join(OUTPUT_DETECTION_MODES))
+            )
+
+        if mode == "snapshot":
+            return Snapshot(client.path, self._output_directories(client))
+        elif mode == "inotify":
+            return InotifyWatcher(client.path)
+
+    def _output_directories(self, client):
+        """Return directories that the command probably writes to.
+
+        These are the working directory, directories in command line arguments
+        and directories of explicit outputs and redirected streams. Only
+        directories that are arguments themselves are watched with their
+        subdirectories.
+        """
+        root = client.path.resolve()
+        directories = {}
+
+        def add(path, recursive=False):
+            """Add the closest existing directory of a path."""
+            path = Path(os.path.abspath(str(path)))
+            try:
+                while not path.exists() and path != path.parent:
+                    path, recursive = path.parent, False
+                if not path.is_dir():
+                    path, recursive = path.parent, False
+                relative = str(path.resolve().relative_to(root))
+            except (OSError, ValueError):
+                return
+            directories[relative] = directories.get(relative, False) or recursive
+
+        add(self.directory)
+        for argument in self.command_line[1:]:
+            value = argument.split("=")[-1]
+            if value:
+                add(self.directory / value, recursive=True)
+        for path in self.explicit_outputs:
+            add(path, recursive=True)
+        for stream in (self.stdout, self.stderr):
+            if stream:
+                add(self.working_dir / stream)
+
+        return directories
+
+    def _changed_paths(self, client, changes, no_output):
+        """Return paths of files created or modified by the command.
+
+        Paths reported by a watcher are checked with Git. All changes in the
+        repository are used if there was no watcher, it cannot tell which files
+        changed or if none of the reported files changed.
+        """
+        repo = client.repo
+        if changes is not None:
+            changed, uncertain = changes
+            paths = sorted(changed | uncertain)
+            changed = client.find_changed_paths(*paths) if paths else set()
+            if changed or no_output:
+                return changed
+
+        # Capture newly created files through redirects.
+        candidates = set(repo.untracked_files)
+
+        # Capture modified files through redirects.
+        candidates |= {o.a_path for o in repo.index.diff(None) if not o.deleted_file}
+
+        return candidates
+
     def iter_input_files(self, basedir):
         """Yield tuples with input id and path."""
         stdin = getattr(self, "stdin", None)
@@ -140,6 +237,13 @@ class CommandLineToolFactory(object):
             if input_.type in PATH_OBJECTS and input_.default:
                 yield (input_.id, os.path.normpath(os.path.join(basedir, str(input_.default.path))))
 
+    @contextmanager
+    def timed(self):
+        """Record start and end times of the command run inside the block."""
+        self.started_at_time = datetime.datetime.now(datetime.timezone.utc)
+        yield self
+        self.ended_at_time = datetime.datetime.now(datetime.timezone.utc)
+
     @contextmanager
     def watch(self, client, no_output=False):
         """Watch a Renku repository for changes to detect outputs."""
@@ -156,7 +260,26 @@ class CommandLineToolFactory(object):
         pm.hook.pre_run(tool=self)
         self.existing_directories = {str(p.relative_to(client.path)) for p in client.path.glob("**/")}
 
-        yield self
+        watcher = self._output_watcher(client) if repo and not self.no_output_detection else None
+        if watcher:
+            watcher.start()
+
+        self.started_at_time = self.ended_at_time = None
+        started_at_time = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            yield self
+        except BaseException:
+            if watcher:
+                watcher.close()
+            raise
+        if self.ended_at_time is None:
+            # NOTE: The command was not timed with ``timed()``.
+            self.started_at_time = started_at_time
+            self.ended_at_time = datetime.datetime.now(datetime.timezone.utc)
+        changes = watcher.stop() if watcher else None
+
+        # NOTE The command may have created or removed paths.
+        self._existing_paths.clear()
 
         if repo:
             # Include indirect inputs and outputs before further processing
@@ -178,11 +301,7 @@ class CommandLineToolFactory(object):
 
             if not self.no_output_detection:
                 # Calculate possible output paths.
-                # Capture newly created files through redirects.
-                candidates |= {file_ for file_ in repo.untracked_files}
-
-                # Capture modified files through redirects.
-                candidates |= {o.a_path for o in repo.index.diff(None) if not o.deleted_file}
+                candidates |= self._changed_paths(client, changes, no_output)
 
             # Include explicit outputs
             candidates |= {str(path.relative_to(self.working_dir)) for path in self.explicit_outputs}
@@ -263,6 +382,13 @@ class CommandLineToolFactory(object):
         if ignore and candidate in ignore:
             return
 
+        key = str(candidate)
+        if key not in self._existing_paths:
+            self._existing_paths[key] = self._existing_path(candidate)
+        return self._existing_paths[key]
+
+    def _existing_path(self, candidate):
+        """Return a path instance if the candidate exists."""
         candidate = Path(candidate)
 
         if not candidate.is_absolute():
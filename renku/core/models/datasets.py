@@ -402,6 +402,8 @@ class Dataset(Entity, CreatorMixin, ReferenceMixin):
 
     name = attr.ib(default=None, kw_only=True)
 
+    _files_index = attr.ib(default=None, init=False, repr=False, cmp=False)
+
     @date_created.default
     def _now(self):
         """Define default value for datetime fields."""
@@ -464,19 +466,42 @@ class Dataset(Entity, CreatorMixin, ReferenceMixin):
                 return True
         return False
 
+    def _files_by_path(self):
+        """Return mapping from paths to indices of files.
+
+        The mapping is built again when ``files`` is replaced or its length
+        changes.
+        """
+        files = self.files
+        if self._files_index is None or self._files_index[0] is not files or self._files_index[1] != len(files):
+            index = {}
+            for position, file_ in enumerate(files):
+                index.setdefault(str(file_.path), position)
+            self._files_index = (files, len(files), index)
+        return self._files_index[2]
+
     def find_files(self, paths):
         """Return all paths that are in files container."""
-        files_paths = {str(self.client.path / f.path) for f in self.files}
-        return {p for p in paths if str(p) in files_paths}
+        index = self._files_by_path()
+        prefix = str(self.client.path)
+        return {p for p in paths if str(p).startswith(prefix) and os.path.relpath(str(p), prefix) in index}
 
     def find_file(self, filename, return_index=False):
         """Find a file in files container."""
-        for index, file_ in enumerate(self.files):
-            if str(file_.path) == str(filename):
-                if return_index:
-                    return index
-                file_.client = self.client
-                return file_
+        filename = str(filename)
+        position = self._files_by_path().get(filename)
+        if position is not None and str(self.files[position].path) != filename:
+            # NOTE: A file was changed in place.
+            self._files_index = None
+            position = self._files_by_path().get(filename)
+
+        if position is None:
+            return
+        if return_index:
+            return position
+        file_ = self.files[position]
+        file_.client = self.client
+        return file_
 
     def update_metadata(self, other_dataset):
         """Updates instance attributes with other dataset attributes.
@@ -509,14 +534,14 @@ class Dataset(Entity, CreatorMixin, ReferenceMixin):
     def rename_files(self, rename):
         """Rename files using the path mapping function."""
         files = []
+        paths = set()
 
         for file_ in self.files:
             new_path = rename(file_.path)
-            new_file = attr.evolve(file_, path=new_path)
-            if not self.find_file(new_file.path):
-                files.append(new_file)
-            else:
+            if str(new_path) in paths:
                 raise FileExistsError
+            paths.add(str(new_path))
+            files.append(attr.evolve(file_, path=new_path))
 
         renamed = attr.evolve(self, files=files)
         setattr(renamed, "__reference__", self.__reference__)
@@ -534,6 +559,18 @@ class Dataset(Entity, CreatorMixin, ReferenceMixin):
         index = self.find_file(file_path, return_index=True)
         return self.files.pop(index)
 
+    def unlink_files(self, file_paths):
+        """Unlink files from dataset and return them.
+
+        :param file_paths: Relative paths used as keys inside files container.
+        """
+        index = self._files_by_path()
+        positions = {index[str(path)] for path in file_paths if str(path) in index}
+
+        unlinked = [file_ for position, file_ in enumerate(self.files) if position in positions]
+        self.files[:] = [file_ for position, file_ in enumerate(self.files) if position not in positions]
+        return unlinked
+
     def __attrs_post_init__(self):
         """Post-Init hook."""
         super().__attrs_post_init__()
@@ -551,16 +588,7 @@ class Dataset(Entity, CreatorMixin, ReferenceMixin):
             self.path = str(self.client.renku_datasets_path / self.uid)
 
         if self.files and self.client is not None:
-            for dataset_file in self.files:
-                path = Path(dataset_file.path)
-                file_exists = path.exists() or (path.is_symlink() and os.path.lexists(path))
-
-                if dataset_file.client is None and file_exists:
-                    client, _, _ = self.client.resolve_in_submodules(
-                        self.client.find_previous_commit(dataset_file.path, revision="HEAD"), dataset_file.path,
-                    )
-
-                    dataset_file.client = client
+            self._set_file_clients()
 
         try:
             if self.client:
@@ -572,10 +600,47 @@ class Dataset(Entity, CreatorMixin, ReferenceMixin):
         if not self.name:
             self.name = generate_default_name(self.title, self.version)
 
+    def _set_file_clients(self):
+        """Set clients of existing files and resolve files in submodules.
+
+        Only symlinks and vendored files can be in submodules. Their latest
+        commits are resolved with a single history walk and taken from their
+        labels if they are not found; files are then resolved with one
+        history walk per submodule. Other files need no Git calls.
+        """
+        in_submodules = []
+        for dataset_file in self.files:
+            if dataset_file.client is not None:
+                continue
+
+            path = Path(dataset_file.path)
+            if path.is_symlink() or str(path).startswith(".renku/vendors"):
+                if os.path.lexists(path):
+                    in_submodules.append(dataset_file)
+            elif path.exists():
+                dataset_file.client = self.client
+
+        if not in_submodules:
+            return
+
+        commits = self.client.find_previous_commits((f.path for f in in_submodules), revision="HEAD")
+        for dataset_file in in_submodules:
+            commit = commits.get(str(dataset_file.path))
+            if commit is None:
+                label = dataset_file._label or ""
+                commit = self.client.repo.commit(label.rsplit("@", 1)[1]) if "@" in label else None
+            if commit is None:
+                raise KeyError("Could not find a file {0} in range HEAD".format(dataset_file.path))
+            commits[str(dataset_file.path)] = commit
+
+        resolved = self.client.resolve_all_in_submodules({str(f.path): commits[str(f.path)] for f in in_submodules})
+        for dataset_file in in_submodules:
+            dataset_file.client, _, _ = resolved[str(dataset_file.path)]
+
     @classmethod
     def from_yaml(cls, path, client=None, commit=None):
         """Return an instance from a YAML file."""
-        data = jsonld.read_yaml(path)
+        data = jsonld.read_yaml(path, cache=client.parse_cache if client else None)
 
         self = cls.from_jsonld(data=data, client=client, commit=commit)
         self.__reference__ = path
@@ -234,3 +234,72 @@ class DirectoryTree(dict):
                     queue.append((value, parents + [key]))
                 else:
                     yield os.path.sep.join(parents + [key])
+
+
+class PathTrie(object):
+    """Map paths to values and find values stored for their ancestors.
+
+    Example usage:
+
+    >>> trie = PathTrie()
+    >>> trie.add('data', 1)
+    >>> trie.add('data/raw/file.csv', 2)
+    >>> trie.add('database', 3)
+    >>> [path for path, _ in trie.ancestors('data/raw/file.csv')]
+    ['data', 'data/raw/file.csv']
+    >>> [value for _, value in trie.ancestors('data/other/file.csv')]
+    [1]
+    >>> 'data/raw' in trie
+    False
+    >>> trie.get('database')
+    3
+
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self):
+        """Create an empty trie."""
+        self._root = {}
+
+    @staticmethod
+    def _parts(path):
+        """Split a path into its components."""
+        return [part for part in str(path).split("/") if part and part != "."]
+
+    def add(self, path, value):
+        """Store a value for the given path."""
+        node = self._root
+        for part in self._parts(path):
+            node = node.setdefault(part, {})
+        node[None] = value
+
+    def get(self, path, default=None):
+        """Return the value stored for the path."""
+        node = self._root
+        for part in self._parts(path):
+            node = node.get(part)
+            if node is None:
+                return default
+        return node.get(None, default)
+
+    def __contains__(self, path):
+        """Check if a value is stored for the path."""
+        node = self._root
+        for part in self._parts(path):
+            node = node.get(part)
+            if node is None:
+                return False
+        return None in node
+
+    def ancestors(self, path):
+        """Yield ``(path, value)`` for the path and its ancestors, topmost first."""
+        node = self._root
+        prefix = []
+        for part in self._parts(path):
+            node = node.get(part)
+            if node is None:
+                return
+            prefix.append(part)
+            if None in node:
+                yield "/".join(prefix), node[None]
@@ -23,8 +23,10 @@ import weakref
 from urllib.parse import quote, urljoin
 
 import attr
+from git import Tree
+from gitdb.util import hex_to_bin
 
-from renku.core.models.calamus import JsonLDSchema, Nested, fields, prov, rdfs, schema, wfprov
+from renku.core.models.calamus import JsonLDSchema, Nested, fields, prov, rdfs, renku, schema, wfprov
 from renku.core.models.projects import Project, ProjectSchema
 
 
@@ -33,6 +35,16 @@ def _str_or_none(data):
     return str(data) if data is not None else data
 
 
+def get_tree_hash(commit, path):
+    """Return hash of the Git tree of a directory in a commit or ``None``."""
+    try:
+        tree = commit.tree / str(path)
+    except KeyError:
+        return
+    if tree.type == "tree":
+        return tree.hexsha
+
+
 @attr.s(cmp=False,)
 class CommitMixin:
     """Represent a commit mixin."""
@@ -94,25 +106,34 @@ class Entity(CommitMixin):
     )
 
     @classmethod
-    def from_revision(cls, client, path, revision="HEAD", parent=None, find_previous=True, **kwargs):
-        """Return dependency from given path and revision."""
+    def from_revision(cls, client, path, revision="HEAD", parent=None, find_previous=True, lazy=False, **kwargs):
+        """Return dependency from given path and revision.
+
+        With ``lazy``, members of a directory are not listed and are read
+        from its Git tree when they are needed.
+        """
         if find_previous:
             revision = client.find_previous_commit(path, revision=revision)
 
         client, commit, path = client.resolve_in_submodules(revision, path,)
 
         path_ = client.path / path
-        if path != "." and path_.is_dir():
+        tree_hash = get_tree_hash(commit, path) if lazy and path != "." and path_.is_dir() else None
+        if tree_hash:
+            entity = Collection(client=client, commit=commit, path=path, parent=parent, tree_hash=tree_hash)
+        elif path != "." and path_.is_dir():
             entity = Collection(client=client, commit=commit, path=path, members=[], parent=parent,)
 
             files_in_commit = commit.stats.files
+            member_paths = [
+                str(member.relative_to(client.path)) for member in path_.iterdir() if member.name != ".gitkeep"
+            ]
 
-            # update members with commits
-            for member in path_.iterdir():
-                if member.name == ".gitkeep":
-                    continue
+            # resolve latest commits of all members at once
+            client.find_previous_commits((p for p in member_paths if p not in files_in_commit), revision=commit)
 
-                member_path = str(member.relative_to(client.path))
+            # update members with commits
+            for member_path in member_paths:
                 find_previous = True
 
                 if member_path in files_in_commit:
@@ -157,7 +178,51 @@ class Entity(CommitMixin):
 class Collection(Entity):
     """Represent a directory with files."""
 
-    members = attr.ib(kw_only=True, default=None)
+    _members = attr.ib(kw_only=True, default=None)
+
+    tree_hash = attr.ib(kw_only=True, default=None)
+    """Hash of the Git tree of the directory if members are not listed."""
+
+    @property
+    def members(self):
+        """Return members and read them from the Git tree if not listed."""
+        if self._members is None:
+            self.members = self.tree_members()
+        return self._members
+
+    @members.setter
+    def members(self, members):
+        """Set members of the collection."""
+        self._members = members
+        for member in members:
+            member._parent = weakref.ref(self)
+
+    def tree_members(self):
+        """Generate members as entities from the Git tree of the directory."""
+        if not self.client or not self.tree_hash:
+            return []
+
+        tree = Tree(self.client.repo, hex_to_bin(self.tree_hash), path=self.path)
+        items = [item for item in tree if item.name != ".gitkeep" and item.type in ("tree", "blob")]
+
+        # NOTE Resolve latest commits of all members at once.
+        commits = (
+            self.client.find_previous_commits((item.path for item in items), revision=self.commit)
+            if self.commit
+            else {}
+        )
+
+        members = []
+        for item in items:
+            commit = commits.get(item.path, self.commit)
+            if item.type == "tree":
+                member = Collection(
+                    commit=commit, client=self.client, path=item.path, parent=self, tree_hash=item.hexsha
+                )
+            else:
+                member = Entity(commit=commit, client=self.client, path=item.path, parent=self)
+            members.append(member)
+        return members
 
     def default_members(self):
         """Generate default members as entities from current path."""
@@ -184,31 +249,31 @@ class Collection(Entity):
     @property
     def entities(self):
         """Recursively return all files."""
+        if self.client and not self.commit and self._label and "@UNCOMMITTED" not in self._label:
+            self.commit = self.client.repo.commit(self._label.rsplit("@")[1])
+
         for member in self.members:
             if not member.client and self.client:
                 member.client = self.client
             yield from member.entities
 
-        if self.client and not self.commit and self._label and "@UNCOMMITTED" not in self._label:
-            self.commit = self.client.repo.commit(self._label.rsplit("@")[1])
-
         yield self
 
     def set_client(self, client):
         """Sets the clients on this entity."""
         super().set_client(client)
 
-        for m in self.members:
+        for m in self._members or []:
             m.set_client(client)
 
     def __attrs_post_init__(self):
         """Init members."""
         super().__attrs_post_init__()
 
-        if self.members is None:
-            self.members = self.default_members()
+        if self._members is None and not self.tree_hash:
+            self._members = self.default_members()
 
-        for member in self.members:
+        for member in self._members or []:
             member._parent = weakref.ref(self)
 
 
@@ -245,7 +310,8 @@ class CollectionSchema(EntitySchema):
         rdf_type = [prov.Collection]
         model = Collection
 
-    members = Nested(prov.hadMember, [EntitySchema, "CollectionSchema"], many=True)
+    _members = Nested(prov.hadMember, [EntitySchema, "CollectionSchema"], init_name="members", many=True, missing=None)
+    tree_hash = fields.String(renku.treeHash, missing=None)
 
 
 def generate_label(path, hexsha):
@@ -57,10 +57,18 @@ class NoDatesSafeLoader(SafeLoader):
 NoDatesSafeLoader.remove_implicit_resolver("tag:yaml.org,2002:timestamp")
 
 
-def read_yaml(path):
+def load_yaml(content):
+    """Parse YAML content and return it as a dict."""
+    return yaml.load(content, Loader=NoDatesSafeLoader) or {}
+
+
+def read_yaml(path, cache=None):
     """Load YAML file and return its content as a dict."""
+    if cache is not None:
+        return cache.read(path)
+
     with Path(path).open(mode="r") as fp:
-        return yaml.load(fp, Loader=NoDatesSafeLoader) or {}
+        return load_yaml(fp)
 
 
 def write_yaml(path, data):
@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Fast loading of flattened JSON-LD written by Renku schemas.
+
+Loading through calamus creates nested schemas for every document, dispatches
+every object through the marshmallow machinery, inspects model signatures for
+every object and scans all nodes of a document to resolve reverse properties.
+
+The loader compiles each schema class once into a plan of its fields and
+builds models directly from flattened JSON-LD. Values of fields other than
+nested ones are still deserialized by the schema fields. Schemas with hooks
+or options that are not supported and documents which cannot be loaded by
+the plan are loaded with calamus instead.
+"""
+
+import inspect
+
+from calamus import fields
+from calamus.utils import normalize_id, normalize_type
+from marshmallow import EXCLUDE, RAISE, class_registry, missing
+from marshmallow.base import SchemaABC
+
+from renku.core.models.calamus import JsonLDSchema, Nested
+
+_PLANS = {}
+"""Compiled plans of schema classes, ``None`` for unsupported schemas."""
+
+_SUPPORTED_HOOKS = {("post_load", False): ["make_instance"]}
+"""Load hooks that the plans implement."""
+
+
+class _Unsupported(Exception):
+    """Raised when a schema or data cannot be loaded by a plan."""
+
+
+def load(schema_class, data, client=None, commit=None):
+    """Load flattened JSON-LD data with a schema."""
+    plan = _compile(schema_class)
+
+    if plan is not None and isinstance(data, list):
+        try:
+            return _Document(data).load(plan, client=client, commit=commit)
+        except _Unsupported:
+            # NOTE: Calamus loads documents of other shapes and reports errors for invalid data.
+            pass
+
+    return schema_class(client=client, commit=commit, flattened=True).load(data)
+
+
+def _compile(schema_class):
+    """Return a plan for a schema class."""
+    if schema_class not in _PLANS:
+        _PLANS[schema_class] = None
+        try:
+            _PLANS[schema_class] = _Plan(schema_class)
+        except _Unsupported:
+            pass
+
+    return _PLANS[schema_class]
+
+
+def _resolve_schema(nest, schema_class):
+    """Return a schema class for a value of ``Nested.nested``."""
+    if isinstance(nest, type) and issubclass(nest, SchemaABC):
+        return nest
+    elif nest == "self":
+        return schema_class
+    elif isinstance(nest, str):
+        return class_registry.get_class(nest)
+
+    raise _Unsupported(nest)
+
+
+class _Field(object):
+    """Compiled field of a schema."""
+
+    def __init__(self, name, field, schema_class):
+        self.name = name
+        self.field = field
+        self.attribute = field.attribute or name
+        self.key = field.data_key if field.data_key is not None else name
+        self.reverse = getattr(field, "reverse", False)
+        self.many = getattr(field, "many", False)
+        self.nested = None
+
+        if isinstance(field, fields.Nested):
+            self.nested = {}
+            for nest in field.nested:
+                nested_class = _resolve_schema(nest, schema_class)
+                propagate_client = (
+                    issubclass(schema_class, JsonLDSchema)
+                    and isinstance(field, Nested)
+                    and field.propagate_client
+                    and issubclass(nested_class, JsonLDSchema)
+                )
+                self.nested[str(normalize_type(nested_class.opts.rdf_type))] = (nested_class, propagate_client)
+        elif isinstance(field, fields.List) and isinstance(field.inner, fields.Nested):
+            raise _Unsupported(field)
+
+
+class _Plan(object):
+    """Compiled schema class."""
+
+    def __init__(self, schema_class):
+        schema = schema_class(flattened=True)
+
+        if schema.unknown not in (EXCLUDE, RAISE) or schema.lazy:
+            raise _Unsupported(schema_class)
+        for hook, names in schema._hooks.items():
+            if names and hook[0] not in ("pre_dump", "post_dump") and _SUPPORTED_HOOKS.get(hook) != names:
+                raise _Unsupported(schema_class)
+
+        self.schema_class = schema_class
+        self.model = schema.opts.model
+        self.rdf_type = schema.opts.rdf_type
+        self.fields = [_Field(name, field, schema_class) for name, field in schema.load_fields.items()]
+        self.init_names = {name: field.init_name for name, field in schema.load_fields.items() if field.init_name}
+        self.is_renku = isinstance(schema, JsonLDSchema)
+
+        self.known_keys = None
+        if schema.unknown == RAISE:
+            self.known_keys = {field.key for field in self.fields} | {"@type", "@reverse"}
+            if schema.opts.id_generation_strategy:
+                self.known_keys.add("@id")
+
+        parameters = inspect.signature(self.model).parameters.values()
+        self.positional = [
+            p.name
+            for p in parameters
+            if p.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.POSITIONAL_ONLY)
+        ]
+        self.keyword = [p.name for p in parameters if p.kind is inspect.Parameter.KEYWORD_ONLY]
+        self.has_kwargs = any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters)
+        names = {p.name for p in parameters}
+        self.has_client = "client" in names
+        self.has_commit = "commit" in names
+
+    def reversed_properties(self):
+        """Return reversed properties and their schemas in the schema tree."""
+        properties = {}
+        visited = set()
+        plans = [self]
+        while plans:
+            plan = plans.pop()
+            if plan is None or plan.schema_class in visited:
+                continue
+            visited.add(plan.schema_class)
+
+            for field in plan.fields:
+                for schema_class, _ in (field.nested or {}).values():
+                    if field.reverse:
+                        properties.setdefault(field.key, set()).add(schema_class)
+                    plans.append(_compile(schema_class))
+
+        return properties
+
+    def make_instance(self, data):
+        """Create a model in the same way as ``calamus.JsonLDSchema``."""
+        for old_key, new_key in self.init_names.items():
+            if new_key in data:
+                raise ValueError("Initialization name {} for {} is already in data {}".format(new_key, old_key, data))
+            data[new_key] = data.pop(old_key, None)
+
+        args = []
+        for name in self.positional:
+            if name not in data:
+                raise ValueError("Field {} not found in data {}".format(name, data))
+            args.append(data.pop(name))
+        kwargs = {name: data.pop(name) for name in self.keyword if name in data}
+
+        if self.has_kwargs:
+            instance = self.model(*args, **kwargs, **data)
+        else:
+            instance = self.model(*args, **kwargs)
+
+        unset_data = []
+        for key, value in data.items():
+            if hasattr(instance, key):
+                if not getattr(instance, key):
+                    setattr(instance, key, value)
+            else:
+                unset_data.append(key)
+
+        if unset_data:
+            raise ValueError(
+                "The following fields were not found on class {}:\n\t{}".format(self.model, "\n\t".join(unset_data))
+            )
+
+        return instance
+
+
+class _Document(object):
+    """Flattened JSON-LD document being loaded."""
+
+    def __init__(self, data):
+        self.data = data
+        self.objects = {}
+        for node in data:
+            if not isinstance(node, dict) or "@id" not in node:
+                raise _Unsupported(node)
+            self.objects[node["@id"]] = node
+
+        self._reverse_links = {}
+        self._reversed_properties = None
+        self._commits = {}
+
+    def load(self, plan, client, commit):
+        """Load the only node of the plan's type."""
+        rdf_type = set(normalize_id(plan.rdf_type))
+        roots = [node for node in self.data if set(normalize_id(node.get("@type", []))) == rdf_type]
+        if len(roots) != 1:
+            raise _Unsupported(roots)
+
+        self._reversed_properties = plan.reversed_properties()
+        return self._load_node(plan, roots[0], client=client, commit=commit)
+
+    def _load_node(self, plan, node, client, commit=None):
+        """Create a model from a node."""
+        if node.get("@context"):
+            raise _Unsupported(node)
+
+        if plan.known_keys is not None:
+            for key in node.keys() - plan.known_keys:
+                if not issubclass(plan.schema_class, tuple(self._reversed_properties.get(key, ()))):
+                    # NOTE: Let calamus decide if the key is valid.
+                    raise _Unsupported(key)
+
+        data = {}
+        for field in plan.fields:
+            if field.reverse:
+                value = node.get("@reverse", missing)
+                if value is not missing:
+                    value = value.get(field.key, missing)
+                else:
+                    value = self._get_reverse_links(field.key, node["@id"]) or missing
+            else:
+                value = node.get(field.key, missing)
+
+            if field.nested is None or value is missing:
+                value = field.field.deserialize(value, field.key, node)
+            else:
+                value = self._load_nested(field, value, client)
+
+            if value is not missing:
+                data[field.attribute] = value
+
+        if plan.is_renku:
+            self._add_client_and_commit(plan, data, client, commit)
+
+        return plan.make_instance(data)
+
+    def _load_nested(self, field, value, client):
+        """Load values of a nested field."""
+        value = self._dereference(value, field)
+
+        if field.many:
+            if not isinstance(value, list):
+                value = [value]
+            return [self._load_entry(field, v, client) for v in value]
+
+        if isinstance(value, list):
+            if len(value) > 1:
+                raise ValueError("Got multiple values for nested field {} but many is not set.".format(field.name))
+            value = value[0]
+        return self._load_entry(field, value, client)
+
+    def _load_entry(self, field, value, client):
+        """Load a single nested node."""
+        try:
+            schema_class, propagate_client = field.nested[str(normalize_type(value["@type"]))]
+        except (KeyError, TypeError):
+            raise _Unsupported(value)
+        plan = _compile(schema_class)
+        if plan is None:
+            raise _Unsupported(schema_class)
+
+        return self._load_node(plan, value, client=client if propagate_client else None)
+
+    def _dereference(self, value, field):
+        """Replace references with copies of referenced nodes."""
+        if isinstance(value, list):
+            return [self._dereference(v, field) for v in value]
+        elif isinstance(value, dict) and not (len(value) == 1 and "@id" in value):
+            return value
+        elif isinstance(value, dict):
+            value = value["@id"]
+        elif not isinstance(value, str):
+            raise ValueError("Nested field needs to be a dict or an id entry/list, got {}".format(value))
+
+        if value not in self.objects:
+            raise _Unsupported(value)
+        node = dict(self.objects[value])
+        if field.reverse:
+            del node[field.key]
+        return node
+
+    def _get_reverse_links(self, key, id_):
+        """Return ids of nodes referring to a node with the given property."""
+        if key not in self._reverse_links:
+            links = self._reverse_links[key] = {}
+            for node in self.objects.values():
+                if key in node:
+                    for target in set(normalize_id(node[key])):
+                        links.setdefault(target, []).append(node["@id"])
+
+        return list(self._reverse_links[key].get(normalize_id(id_)[0], ()))
+
+    def _add_client_and_commit(self, plan, data, client, commit):
+        """Add client and commit as ``renku.core.models.calamus.JsonLDSchema`` does."""
+        if plan.has_client and client:
+            if "client" in data:
+                raise ValueError("Field client is already in data {}".format(data))
+            data["client"] = client
+
+        if not plan.has_commit:
+            return
+
+        label = data.get("_label")
+        if not commit and client and label and "@UNCOMMITTED" not in label and "@" in label:
+            revision = label.rsplit("@")[1]
+            if revision not in self._commits:
+                try:
+                    self._commits[revision] = client.repo.commit(revision)
+                except ValueError as e:
+                    if "could not be resolved, git returned" not in str(e):
+                        raise
+                    # NOTE: This means the commit does not exist in the local repository. Could be an external file?
+                    self._commits[revision] = None
+            commit = self._commits[revision]
+
+        if commit:
+            if "commit" in data:
+                raise ValueError("Field commit is already in data {}".format(data))
+            data["commit"] = commit
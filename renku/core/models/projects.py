@@ -88,7 +88,7 @@ class Project(ReferenceMixin):
     @classmethod
     def from_yaml(cls, path, client=None):
         """Return an instance from a YAML file."""
-        data = jsonld.read_yaml(path)
+        data = jsonld.read_yaml(path, cache=client.parse_cache if client else None)
         self = cls.from_jsonld(data=data, client=client)
         self.__reference__ = path
 
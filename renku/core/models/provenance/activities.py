@@ -28,7 +28,7 @@ import attr
 from git import NULL_TREE
 from marshmallow import EXCLUDE
 
-from renku.core.models import jsonld
+from renku.core.models import jsonld, loader
 from renku.core.models.calamus import Nested, fields, oa, prov, rdfs, wfprov
 from renku.core.models.cwl.annotation import AnnotationSchema
 from renku.core.models.entities import (
@@ -343,7 +343,7 @@ class Activity(CommitMixin, ReferenceMixin):
     @classmethod
     def from_yaml(cls, path, client=None, commit=None):
         """Return an instance from a YAML file."""
-        data = jsonld.read_yaml(path)
+        data = jsonld.read_yaml(path, cache=client.parse_cache if client else None)
 
         self = cls.from_jsonld(data=data, client=client, commit=commit)
         self.__reference__ = path
@@ -370,7 +370,7 @@ class Activity(CommitMixin, ReferenceMixin):
         elif any(str(wfprov.ProcessRun) in d["@type"] for d in data):
             schema = ProcessRunSchema
 
-        return schema(client=client, commit=commit, flattened=True).load(data)
+        return loader.load(schema, data, client=client, commit=commit)
 
     def as_jsonld(self):
         """Create JSON-LD."""
@@ -487,7 +487,8 @@ class ProcessRun(Activity):
             entity = input_.consumes
             if update_commits:
                 revision = client.find_previous_commit(input_path, revision=commit.hexsha)
-                entity = Entity.from_revision(client, input_path, revision)
+                lazy = bool(getattr(entity, "tree_hash", None))
+                entity = Entity.from_revision(client, input_path, revision, lazy=lazy)
 
             dependency = Usage(entity=entity, role=input_.sanitized_id, id=usage_id)
 
@@ -540,7 +541,7 @@ class ProcessRun(Activity):
         if not isinstance(data, list):
             raise ValueError(data)
 
-        return ProcessRunSchema(client=client, commit=commit, flattened=True).load(data)
+        return loader.load(ProcessRunSchema, data, client=client, commit=commit)
 
     def as_jsonld(self):
         """Create JSON-LD."""
@@ -678,7 +679,7 @@ class WorkflowRun(ProcessRun):
         if not isinstance(data, list):
             raise ValueError(data)
 
-        return WorkflowRunSchema(client=client, commit=commit, flattened=True).load(data)
+        return loader.load(WorkflowRunSchema, data, client=client, commit=commit)
 
     def as_jsonld(self):
         """Create JSON-LD."""
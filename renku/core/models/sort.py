@@ -17,6 +17,7 @@
 # limitations under the License.
 """Process Git repository."""
 
+from array import array
 from collections import deque
 
 GRAY, BLACK = 0, 1
@@ -26,21 +27,117 @@ def topological(nodes):
     """Return nodes in a topological order."""
     order, enter, state = deque(), set(nodes), {}
 
-    def dfs(node):
-        """Visit nodes in depth-first order."""
+    while enter:
+        node = enter.pop()
         state[node] = GRAY
-        for parent in nodes.get(node, ()):
-            color = state.get(parent, None)
-            if color == GRAY:
-                raise ValueError("cycle")
-            if color == BLACK:
-                continue
-            enter.discard(parent)
-            dfs(parent)
-        order.appendleft(node)
-        state[node] = BLACK
+        stack = [(node, iter(nodes.get(node, ())))]
 
-    while enter:
-        dfs(enter.pop())
+        while stack:
+            node, parents = stack[-1]
+            for parent in parents:
+                color = state.get(parent, None)
+                if color == GRAY:
+                    raise ValueError("cycle")
+                if color == BLACK:
+                    continue
+                enter.discard(parent)
+                state[parent] = GRAY
+                stack.append((parent, iter(nodes.get(parent, ()))))
+                break
+            else:
+                stack.pop()
+                order.appendleft(node)
+                state[node] = BLACK
 
     return order
+
+
+class IndexedGraph(object):
+    """Graph lowered to integer indices for bulk ancestor queries.
+
+    Nodes are numbered in the order they are discovered and parent indices of
+    all nodes are stored in a single array. Parents of stale nodes are not
+    visited. Stale ancestors of every node are kept as a bitset over stale
+    nodes which is computed once when the node is finished in an iterative
+    depth-first traversal.
+    """
+
+    def __init__(self, parents, is_stale, key=None):
+        """Create a graph from callbacks returning parents and staleness."""
+        self._parents = parents
+        self._is_stale = is_stale
+        self._key = key or (lambda node: node)
+
+        self._indices = {}
+        self._nodes = []
+        self._edges = array("l")
+        self._start = array("l")
+        self._end = array("l")
+        self._stale = array("l")
+        self._ancestors = []
+
+    def __len__(self):
+        """Return number of lowered nodes."""
+        return len(self._nodes)
+
+    def stale_ancestors(self, node):
+        """Return stale nodes reachable from a node in discovery order."""
+        bits = self._ancestors[self._lower(node)]
+        result = []
+        while bits:
+            lowest = bits & -bits
+            result.append(self._nodes[self._stale[lowest.bit_length() - 1]])
+            bits ^= lowest
+        return result
+
+    def _add(self, node):
+        """Number a node and return its parents that need to be visited."""
+        index = len(self._nodes)
+        self._indices[self._key(node)] = index
+        self._nodes.append(node)
+        self._start.append(len(self._edges))
+        self._end.append(len(self._edges))
+
+        if self._is_stale(node):
+            self._ancestors.append(1 << len(self._stale))
+            self._stale.append(index)
+            return index, []
+
+        self._ancestors.append(None)
+        return index, list(self._parents(node))
+
+    def _finish(self, index, parents):
+        """Store edges of a node and combine stale ancestors of its parents."""
+        if self._ancestors[index] is not None:
+            return
+
+        self._start[index] = len(self._edges)
+        self._edges.extend(self._indices[self._key(parent)] for parent in parents)
+        self._end[index] = len(self._edges)
+
+        bits = 0
+        for parent_index in self._edges[self._start[index] : self._end[index]]:
+            # NOTE: Parents on a cycle are not finished yet and are skipped.
+            bits |= self._ancestors[parent_index] or 0
+        self._ancestors[index] = bits
+
+    def _lower(self, node):
+        """Return index of a node and lower all its ancestors."""
+        index = self._indices.get(self._key(node))
+        if index is not None:
+            return index
+
+        root, parents = self._add(node)
+        stack = [(root, parents, iter(parents))]
+        while stack:
+            index, parents, remaining = stack[-1]
+            for parent in remaining:
+                if self._key(parent) not in self._indices:
+                    parent_index, parent_parents = self._add(parent)
+                    stack.append((parent_index, parent_parents, iter(parent_parents)))
+                    break
+            else:
+                stack.pop()
+                self._finish(index, parents)
+
+        return root
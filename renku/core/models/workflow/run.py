@@ -31,7 +31,7 @@ from marshmallow import EXCLUDE
 
 from renku.core.models.calamus import JsonLDSchema, Nested, fields, prov, renku
 from renku.core.models.cwl.types import PATH_OBJECTS
-from renku.core.models.entities import Collection, CommitMixin, CommitMixinSchema, Entity
+from renku.core.models.entities import Collection, CommitMixin, CommitMixinSchema, Entity, get_tree_hash
 from renku.core.models.workflow.parameters import (
     CommandArgument,
     CommandArgumentSchema,
@@ -43,20 +43,28 @@ from renku.core.models.workflow.parameters import (
 )
 
 
-def _entity_from_path(client, path, commit):
-    """Gets the entity associated with a path."""
+def _entity_from_path(client, path, commit, lazy=False):
+    """Gets the entity associated with a path.
+
+    With ``lazy``, a directory is recorded with the hash of its Git tree
+    instead of its members.
+    """
     client, commit, path = client.resolve_in_submodules(
         client.find_previous_commit(path, revision=commit.hexsha), path,
     )
 
     entity_cls = Entity
+    kwargs = {}
     if (client.path / path).is_dir():
         entity_cls = Collection
+        tree_hash = get_tree_hash(commit, path) if lazy else None
+        if tree_hash:
+            kwargs["tree_hash"] = tree_hash
 
     if str(path).startswith(os.path.join(client.renku_home, client.DATASETS)):
         return client.load_dataset_from_path(path, commit=commit)
     else:
-        return entity_cls(commit=commit, client=client, path=str(path),)
+        return entity_cls(commit=commit, client=client, path=str(path), **kwargs)
 
 
 def _convert_cmd_binding(binding, client, commit):
@@ -69,7 +77,7 @@ def _convert_cmd_binding(binding, client, commit):
     return CommandArgument(id=id_, position=binding.position, value=binding.valueFrom)
 
 
-def _convert_cmd_input(input, client, commit, run_id):
+def _convert_cmd_input(input, client, commit, run_id, lazy=False):
     """Convert a cwl input to ``CommandInput``."""
     val = input.default
 
@@ -85,12 +93,12 @@ def _convert_cmd_input(input, client, commit, run_id):
                 id=CommandInput.generate_id(run_id, input.inputBinding.position),
                 position=input.inputBinding.position,
                 prefix=prefix,
-                consumes=_entity_from_path(client, input.default.path, commit),
+                consumes=_entity_from_path(client, input.default.path, commit, lazy=lazy),
             )
         else:
             return CommandInput(
                 id=CommandInput.generate_id(run_id, "stdin" if input.id == "input_stdin" else None),
-                consumes=_entity_from_path(client, input.default.path, commit),
+                consumes=_entity_from_path(client, input.default.path, commit, lazy=lazy),
                 mapped_to=MappedIOStream(client=client, stream_type="stdin") if input.id == "input_stdin" else None,
             )
     else:
@@ -167,6 +175,9 @@ class Run(CommitMixin):
 
     outputs = attr.ib(kw_only=True, factory=list)
 
+    cpus = attr.ib(kw_only=True, default=None)
+    """Number of CPUs used by the command."""
+
     _activity = attr.ib(kw_only=True, default=None)
 
     @staticmethod
@@ -206,8 +217,9 @@ class Run(CommitMixin):
                 if i in factory.inputs:
                     factory.inputs.remove(i)
 
+        lazy = factory.use_lazy_directories(client)
         for i in factory.inputs:
-            res = _convert_cmd_input(i, client, commit, run_id)
+            res = _convert_cmd_input(i, client, commit, run_id, lazy=lazy)
 
             if isinstance(res, CommandInput):
                 inputs.append(res)
@@ -224,6 +236,7 @@ class Run(CommitMixin):
             arguments=[_convert_cmd_binding(a, client, commit) for a in factory.arguments] + arguments,
             inputs=inputs,
             outputs=outputs,
+            cpus=factory.cpus,
         )
 
     @property
@@ -409,6 +422,7 @@ class RunSchema(CommitMixinSchema):
     arguments = Nested(renku.hasArguments, CommandArgumentSchema, many=True, missing=None)
     inputs = Nested(renku.hasInputs, CommandInputSchema, many=True, missing=None)
     outputs = Nested(renku.hasOutputs, CommandOutputSchema, many=True, missing=None)
+    cpus = fields.Integer(renku.cpus, missing=None)
 
 
 class OrderedSubprocessSchema(JsonLDSchema):
@@ -17,4 +17,6 @@
 # limitations under the License.
 """Renku plugin implementations."""
 
-__all__ = []
+from renku.core.plugins.implementations.resource_usage import ResourceUsage
+
+__all__ = ["ResourceUsage"]
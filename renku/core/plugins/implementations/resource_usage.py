@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Annotate ``renku run`` steps with the resources they used."""
+
+import json
+
+from renku.core.models.cwl.annotation import Annotation
+from renku.core.plugins import hookimpl
+
+SOURCE = "renku resource usage"
+"""Creator of resource usage annotations."""
+
+
+def resource_usage_annotation(usage, id="_:resource-usage"):
+    """Return an ``Annotation`` with the resource usage of a step."""
+    return Annotation(id=id, source=SOURCE, body=json.dumps(usage, sort_keys=True))
+
+
+def get_resource_usage(process_run):
+    """Return the resource usage recorded for a ``ProcessRun`` or ``None``."""
+    for annotation in process_run.annotations or []:
+        if annotation.source != SOURCE:
+            continue
+        try:
+            return json.loads(annotation.body)
+        except (TypeError, ValueError):
+            return None
+
+
+class ResourceUsage(object):
+    """Add resources used by the command of ``renku run`` to its activity."""
+
+    @hookimpl
+    def cmdline_tool_annotations(self, tool):
+        """Return the resource usage annotation of a tool."""
+        if not tool.resource_usage:
+            return []
+        return [resource_usage_annotation(tool.resource_usage)]
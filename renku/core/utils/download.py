@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Resumable HTTP downloads.
+
+A file is downloaded to ``<name>.part`` next to its destination. When the
+server accepts byte ranges and returns a validator (a strong ``ETag`` or
+``Last-Modified``), an interrupted download continues from the data already
+on disk, both after a dropped connection and in a later invocation. The
+validator and size of the remote file are stored in ``<name>.part.json``
+and a partial file is discarded when they change; ranges are requested with
+``If-Range`` so that a file changed in the meantime is not joined with old
+data. Large files are split into ranges that are downloaded in parallel;
+the end of the data written for each range is stored in the same file. The
+result is checked against a provider checksum, e.g. ``md5:<hex>``, before it
+is moved to its destination.
+"""
+
+import concurrent.futures
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+
+from renku.core import errors
+
+CHUNK_SIZE = 64 * 1024
+"""Number of bytes read from a response at once."""
+
+PARALLEL_THRESHOLD = 64 * 1024 ** 2
+"""Files of at least this many bytes are downloaded in parallel ranges."""
+
+MAX_PARTS = 4
+"""Maximum number of ranges downloaded in parallel."""
+
+MAX_RETRIES = 5
+"""Number of times a failed request is retried."""
+
+TIMEOUT = (30, 120)
+"""Connect and read timeouts of requests in seconds."""
+
+CHECKSUM_ALGORITHMS = {32: "md5", 40: "sha1", 64: "sha256", 128: "sha512"}
+"""Hash algorithms of checksums without a prefix by their length."""
+
+RETRIED_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.Timeout,
+)
+
+
+def parse_checksum(checksum):
+    """Return hash algorithm and hex digest of a checksum or ``None``."""
+    if not checksum:
+        return None
+
+    algorithm, _, digest = checksum.rpartition(":")
+    algorithm = algorithm.lower().replace("-", "") or CHECKSUM_ALGORITHMS.get(len(digest))
+    if algorithm not in hashlib.algorithms_available:
+        return None
+    return algorithm, digest.lower()
+
+
+def verify_checksum(path, checksum):
+    """Raise an error if the content of a file does not match a checksum."""
+    parsed = parse_checksum(checksum)
+    if not parsed:
+        return
+
+    algorithm, digest = parsed
+    hash_ = hashlib.new(algorithm)
+    with open(str(path), "rb") as file_:
+        for chunk in iter(lambda: file_.read(CHUNK_SIZE), b""):
+            hash_.update(chunk)
+
+    if hash_.hexdigest() != digest:
+        raise errors.OperationError(
+            'Checksum of "{0}" does not match: expected {1}, got {2}'.format(path.name, digest, hash_.hexdigest())
+        )
+
+
+def _ranges(size, parts):
+    """Split a size into ranges of start and end offsets (exclusive)."""
+    part_size = -(-size // parts)
+    return [[start, min(start + part_size, size)] for start in range(0, size, part_size)]
+
+
+class RemoteFileChanged(errors.OperationError):
+    """Raised when a remote file changes while it is downloaded."""
+
+
+def _read_state(path):
+    """Return stored state of a partial file or an empty dict."""
+    try:
+        with open(str(path), "r") as file_:
+            data = json.load(file_)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_state(path, data):
+    """Store state of a partial file."""
+    with open(str(path), "w") as file_:
+        file_.write(json.dumps(data))
+
+
+def _discard(part_path):
+    """Remove a partial file and its state."""
+    for path in (part_path, part_path.with_name(part_path.name + ".json")):
+        try:
+            os.remove(str(path))
+        except FileNotFoundError:
+            pass
+
+
+def _prepare_partial(part_path, validator, size):
+    """Keep a partial file only if it belongs to the same remote file.
+
+    Return whether the partial file can be resumed.
+    """
+    state_path = part_path.with_name(part_path.name + ".json")
+    state = _read_state(state_path)
+    if not validator or state.get("validator") != validator or state.get("size") != size:
+        _discard(part_path)
+    if not validator:
+        return False
+
+    if not state_path.exists():
+        _write_state(state_path, {"validator": validator, "size": size})
+    return True
+
+
+class _State:
+    """Offsets of data written for each range of a partial file."""
+
+    def __init__(self, path, ranges, validator, size):
+        """Load stored offsets of the same ranges or start from scratch."""
+        self.path = path
+        self.lock = threading.Lock()
+        self.ranges = ranges
+        self.validator = validator
+        self.size = size
+        self.offsets = [start for start, _ in ranges]
+
+        data = _read_state(path)
+        if data.get("ranges") == ranges and isinstance(data.get("offsets"), list):
+            self.offsets = data["offsets"]
+
+    @property
+    def written(self):
+        """Return number of bytes written."""
+        return sum(offset - start for offset, (start, _) in zip(self.offsets, self.ranges))
+
+    def update(self, index, offset):
+        """Set the offset of a range."""
+        with self.lock:
+            self.offsets[index] = offset
+
+    def save(self):
+        """Store offsets next to the partial file."""
+        with self.lock:
+            data = {"validator": self.validator, "size": self.size, "ranges": self.ranges, "offsets": self.offsets}
+        _write_state(self.path, data)
+
+
+class _Progress:
+    """Progress that counts reported bytes so that they can be taken back."""
+
+    def __init__(self, progress):
+        """Wrap a progress of the ``DownloadProgressCallback`` interface."""
+        self.progress = progress
+        self.lock = threading.Lock()
+        self.reported = 0
+
+    def update(self, size):
+        """Report downloaded bytes."""
+        with self.lock:
+            self.reported += size
+        self.progress.update(size=size)
+
+    def rewind(self):
+        """Take back all reported bytes when a download starts from scratch."""
+        with self.lock:
+            reported, self.reported = self.reported, 0
+        if reported:
+            self.progress.update(size=-reported)
+
+    def finalize(self):
+        """Finish the progress."""
+        self.progress.finalize()
+
+
+def _retry(function, retries):
+    """Call a function and retry it with a backoff on connection errors."""
+    for attempt in range(retries + 1):
+        try:
+            return function()
+        except RETRIED_ERRORS:
+            if attempt == retries:
+                raise
+            time.sleep(min(2 ** attempt, 30) * 0.1)
+
+
+def _probe(session, url):
+    """Return final URL, size, validator and whether byte ranges are accepted.
+
+    The validator is a strong ``ETag`` or else ``Last-Modified``; weak ETags
+    cannot be used with ``If-Range``.
+    """
+    try:
+        response = session.head(url, allow_redirects=True, timeout=TIMEOUT)
+    except requests.exceptions.RequestException:
+        return url, None, None, False
+
+    if response.status_code >= 400:
+        return url, None, None, False
+
+    size = response.headers.get("content-length")
+    accepts_ranges = response.headers.get("accept-ranges", "").lower() == "bytes"
+    etag = response.headers.get("etag")
+    validator = etag if etag and not etag.startswith("W/") else response.headers.get("last-modified")
+    return response.url, int(size) if size and size.isdigit() else None, validator, accepts_ranges
+
+
+def _download_range(session, url, part_path, state, index, progress):
+    """Download a range of a file and write it at its offset."""
+    offset, end = state.offsets[index], state.ranges[index][1]
+    if offset >= end:
+        return
+
+    headers = {"Range": "bytes={0}-{1}".format(offset, end - 1), "If-Range": state.validator}
+    with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise RemoteFileChanged("Remote file changed while downloading {0}".format(url))
+
+        with open(str(part_path), "r+b") as file_:
+            file_.seek(offset)
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                chunk = chunk[: end - offset]
+                if not chunk:
+                    continue
+                file_.write(chunk)
+                offset += len(chunk)
+                state.update(index, offset)
+                progress.update(size=len(chunk))
+
+
+def _download_parallel(session, url, part_path, size, validator, parts, progress, retries):
+    """Download ranges of a file in parallel and resume stored ranges."""
+    state = _State(part_path.with_name(part_path.name + ".json"), _ranges(size, parts), validator, size)
+    if not part_path.exists():
+        state.offsets = [start for start, _ in state.ranges]
+    with open(str(part_path), "ab") as file_:
+        if file_.tell() != size:
+            file_.truncate(size)
+
+    progress.update(size=state.written)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(len(state.ranges)) as executor:
+            futures = [
+                executor.submit(
+                    _retry, lambda i=i: _download_range(session, url, part_path, state, i, progress), retries
+                )
+                for i in range(len(state.ranges))
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+    except RemoteFileChanged:
+        _discard(part_path)
+        raise
+    except BaseException:
+        state.save()
+        raise
+
+
+def _download_stream(session, url, part_path, size, validator, progress):
+    """Download a file in one request and resume from a partial file."""
+    offset = part_path.stat().st_size if validator and part_path.exists() else 0
+    headers = {"Range": "bytes={0}-".format(offset), "If-Range": validator} if offset else {}
+
+    with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+        if response.status_code == 416:
+            if size is not None and offset == size:
+                # NOTE: The partial file is already complete.
+                return
+            raise RemoteFileChanged("Remote file changed while downloading {0}".format(url))
+        response.raise_for_status()
+        if response.status_code != 206:
+            offset = 0
+        if not offset:
+            progress.rewind()
+
+        with open(str(part_path), "ab" if offset else "wb") as file_:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if chunk:  # ignore keep-alive chunks
+                    file_.write(chunk)
+                    progress.update(size=len(chunk))
+
+
+def download(
+    url, path, progress_class, checksum=None, parts=MAX_PARTS, threshold=PARALLEL_THRESHOLD, retries=MAX_RETRIES
+):
+    """Download a URL to a path, resuming partial downloads.
+
+    :param progress_class: class with the interface of
+        ``DownloadProgressCallback`` to report downloaded bytes.
+    :param checksum: checksum of the file from its provider, e.g.
+        ``md5:<hex>``.
+    :raises: ``requests.exceptions.HTTPError`` if a request fails.
+    """
+    part_path = path.with_name(path.name + ".part")
+
+    with requests.Session() as session:
+        url, size, validator, accepts_ranges = _probe(session, url)
+        validator = validator if accepts_ranges else None
+        resumable = _prepare_partial(part_path, validator, size)
+        progress = _Progress(progress_class(description=path.name, total_size=size or 0))
+
+        try:
+            if resumable and size and size >= threshold and parts > 1:
+                _download_parallel(session, url, part_path, size, validator, parts, progress, retries)
+            else:
+                if resumable and part_path.exists():
+                    progress.update(size=part_path.stat().st_size)
+                try:
+                    _retry(lambda: _download_stream(session, url, part_path, size, validator, progress), retries)
+                except RemoteFileChanged:
+                    _discard(part_path)
+                    raise
+        finally:
+            progress.finalize()
+
+    try:
+        verify_checksum(part_path, checksum)
+    except errors.OperationError:
+        _discard(part_path)
+        raise
+
+    os.replace(str(part_path), str(path))
+    _discard(part_path)
+    return path
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Detect files changed by a command without asking Git.
+
+A :class:`Snapshot` records inode, size and modification time of files in a
+few directories before a command runs and compares them afterwards. Files
+modified shortly before the snapshot cannot be told apart from files modified
+by the command and are reported as uncertain. An :class:`InotifyWatcher`
+receives the changes from the kernel on Linux instead. Both return ``None``
+from :meth:`stop` if they cannot tell which files changed.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import time
+
+RACY_NS = 1000000000
+"""Files modified this many nanoseconds before a snapshot are uncertain."""
+
+SKIPPED_DIRECTORIES = {".git"}
+"""Directories that are never watched."""
+
+
+def _walk(path, recursive=True):
+    """Yield directory entries of files in a directory.
+
+    Entries of subdirectories are yielded instead of their content if
+    ``recursive`` is false.
+    """
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name in SKIPPED_DIRECTORIES:
+                    continue
+                if recursive and entry.is_dir(follow_symlinks=False):
+                    yield from _walk(entry.path)
+                else:
+                    yield entry
+    except OSError:
+        return
+
+
+def _directories(path):
+    """Yield a directory and all its subdirectories."""
+    yield path
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False) and entry.name not in SKIPPED_DIRECTORIES:
+                    yield from _directories(entry.path)
+    except OSError:
+        return
+
+
+class Snapshot(object):
+    """Compare stat information of files in directories before and after a command.
+
+    :param root: the repository path that returned paths are relative to
+    :param directories: mapping of directories to a flag whether their
+        subdirectories are included
+    """
+
+    def __init__(self, root, directories):
+        self.root = str(root)
+        self.directories = directories
+        self._files = None
+        self._started = None
+
+    def _stat(self):
+        """Return inode, size and modification time of files by path.
+
+        Subdirectories of directories without their subdirectories have no
+        stat information.
+        """
+        files = {}
+        for directory, recursive in self.directories.items():
+            for entry in _walk(os.path.join(self.root, directory), recursive=recursive):
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        files[entry.path] = None
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                files[entry.path] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def start(self):
+        """Take the snapshot."""
+        self._started = int(time.time() * 1e9)
+        self._files = self._stat() if self.directories else None
+
+    def stop(self):
+        """Return changed and uncertain paths or ``None`` if nothing was watched."""
+        if self._files is None:
+            return None
+
+        changed, uncertain = set(), set()
+        for path, stat in self._stat().items():
+            if stat is None:
+                if path not in self._files:
+                    changed.update(entry.path for entry in _walk(path))
+            elif self._files.get(path) != stat:
+                changed.add(path)
+            elif stat[2] >= self._started - RACY_NS:
+                uncertain.add(path)
+
+        return (
+            {os.path.relpath(path, self.root) for path in changed},
+            {os.path.relpath(path, self.root) for path in uncertain},
+        )
+
+    def close(self):
+        """Forget the snapshot."""
+        self._files = None
+
+
+class InotifyWatcher(object):
+    """Collect files written in a directory tree with Linux inotify.
+
+    Directories created while watching are not watched themselves; all files
+    in them are reported instead.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+
+    EVENT = struct.Struct("iIII")
+    """Layout of ``struct inotify_event`` without the name."""
+
+    def __init__(self, root):
+        self.root = str(root)
+        self._fd = None
+        self._watches = {}
+
+    @staticmethod
+    def _libc():
+        """Return the C library if it supports inotify."""
+        if not hasattr(os, "O_CLOEXEC"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        except OSError:
+            return None
+        return libc if hasattr(libc, "inotify_init1") else None
+
+    def start(self):
+        """Add watches to all directories."""
+        libc = self._libc()
+        if libc is None:
+            return
+
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return
+        self._fd = fd
+
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE | self.IN_ONLYDIR
+        for directory in _directories(self.root):
+            watch = libc.inotify_add_watch(fd, os.fsencode(directory), mask)
+            if watch < 0:
+                self.close()
+                return
+            self._watches[watch] = directory
+
+    def close(self):
+        """Stop watching."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _events(self):
+        """Yield masks and paths of queued events."""
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(data):
+                watch, mask, _, length = self.EVENT.unpack_from(data, offset)
+                offset += self.EVENT.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                directory = self._watches.get(watch)
+                yield mask, os.path.join(directory, name) if directory and name else None
+
+    def stop(self):
+        """Return changed paths and no uncertain paths or ``None`` if not watching."""
+        if self._fd is None:
+            return None
+
+        changed = set()
+        try:
+            for mask, path in self._events():
+                if mask & self.IN_Q_OVERFLOW:
+                    return None
+                if path is None:
+                    continue
+                if mask & self.IN_ISDIR:
+                    changed.update(entry.path for entry in _walk(path))
+                else:
+                    changed.add(path)
+        finally:
+            self.close()
+
+        return {os.path.relpath(path, self.root) for path in changed if os.path.lexists(path)}, set()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Copy many files in parallel with the cheapest method available.
+
+In ``auto`` mode a file is cloned with a reflink (``FICLONE``) on file
+systems that support it, copied inside the kernel with
+:func:`os.copy_file_range` and only then copied through user space.
+``reflink`` and ``hardlink`` modes fail instead of falling back to a copy,
+since hardlinks share their content with the source and are never created
+unless requested.
+"""
+
+import concurrent.futures
+import os
+import shutil
+import threading
+
+from renku.core import errors
+
+COPY_MODES = ("auto", "copy", "reflink", "hardlink")
+"""Modes of copying files."""
+
+FICLONE = 0x40049409
+"""Linux ioctl request to clone a file."""
+
+COPY_CHUNK_SIZE = 64 * 1024 ** 2
+"""Number of bytes copied by one ``copy_file_range`` call."""
+
+
+def reflink(src, dst):
+    """Clone a file so that it shares its blocks with the source."""
+    import fcntl
+
+    with open(str(src), "rb") as source, open(str(dst), "wb") as destination:
+        try:
+            fcntl.ioctl(destination.fileno(), FICLONE, source.fileno())
+        except OSError:
+            destination.close()
+            os.remove(str(dst))
+            raise
+    shutil.copymode(str(src), str(dst))
+
+
+def copy_file_range(src, dst):
+    """Copy a file inside the kernel."""
+    if not hasattr(os, "copy_file_range"):
+        raise OSError("copy_file_range is not available")
+
+    with open(str(src), "rb") as source, open(str(dst), "wb") as destination:
+        try:
+            while os.copy_file_range(source.fileno(), destination.fileno(), COPY_CHUNK_SIZE):
+                pass
+        except OSError:
+            destination.close()
+            os.remove(str(dst))
+            raise
+    shutil.copymode(str(src), str(dst))
+
+
+def hardlink(src, dst):
+    """Create a hardlink to a file."""
+    os.link(str(src), str(dst))
+
+
+def copy(src, dst):
+    """Copy a file through user space."""
+    shutil.copy(str(src), str(dst))
+
+
+METHODS = {
+    "auto": (reflink, copy_file_range, copy),
+    "copy": (copy,),
+    "reflink": (reflink,),
+    "hardlink": (hardlink,),
+}
+"""Methods tried in order for each copy mode."""
+
+
+def copy_file(src, dst, mode="auto"):
+    """Copy a file with the first method of a mode that succeeds."""
+    methods = METHODS[mode]
+    for method in methods[:-1]:
+        try:
+            return method(src, dst)
+        except OSError:
+            continue
+
+    try:
+        return methods[-1](src, dst)
+    except OSError as e:
+        if mode in ("reflink", "hardlink"):
+            raise errors.OperationError('Cannot {0} "{1}" to "{2}": {3}'.format(mode, src, dst, e)) from e
+        raise
+
+
+def copy_files(files, mode="auto", max_workers=None, prepare=None, progress=None):
+    """Copy pairs of source and destination paths in parallel.
+
+    :param prepare: function called with each destination before it is
+        written, e.g. to remove an existing file.
+    :param progress: progress class with the interface of
+        ``DownloadProgressCallback`` to report copied bytes.
+    """
+    if mode not in COPY_MODES:
+        raise errors.ParameterError("Invalid copy mode: {0}".format(mode))
+
+    files = list(files)
+    if not files:
+        return
+
+    max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+    lock = threading.Lock()
+    bar = None
+    if progress:
+        bar = progress("Copying files", total_size=sum(os.path.getsize(str(src)) for src, _ in files))
+
+    def copy_one(src, dst):
+        """Copy a single file and report its size."""
+        if prepare:
+            prepare(dst)
+        os.makedirs(str(dst.parent), exist_ok=True)
+        copy_file(src, dst, mode=mode)
+        if bar:
+            with lock:
+                bar.update(os.path.getsize(str(dst)))
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            futures = [executor.submit(copy_one, src, dst) for src, dst in files]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+    finally:
+        if bar:
+            bar.finalize()
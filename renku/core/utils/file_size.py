@@ -55,3 +55,13 @@ def parse_file_size(size_str):
     unit = units[res.group(2).lower()]
 
     return int(value * unit)
+
+
+def format_file_size(size):
+    """Format a size in bytes as a human readable string."""
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1000 or unit == "TB":
+            break
+        size /= 1000
+
+    return "{0} {1}".format(size, unit) if unit == "B" else "{0:.1f} {1}".format(size, unit)
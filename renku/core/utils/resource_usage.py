@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measure resources used by a subprocess.
+
+Wall time, CPU time and peak memory are taken from ``wait4`` and the bytes
+read and written from ``/proc/<pid>/io`` of the finished process before it is
+reaped. Both include children of the process. Values that are not available
+on a platform are left out.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+IO_FIELDS = {
+    "rchar": "read_chars",
+    "wchar": "write_chars",
+    "read_bytes": "read_bytes",
+    "write_bytes": "write_bytes",
+}
+"""Fields of ``/proc/<pid>/io`` and their names in the measured usage."""
+
+
+def _read_io(pid):
+    """Return I/O counters of a process."""
+    usage = {}
+    try:
+        with open("/proc/{0}/io".format(pid), "r") as fp:
+            for line in fp:
+                name, _, value = line.partition(":")
+                if name in IO_FIELDS:
+                    usage[IO_FIELDS[name]] = int(value)
+    except (OSError, ValueError):
+        return {}
+    return usage
+
+
+def _exit_code(status):
+    """Return exit code of a process from its wait status."""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def _wait(process):
+    """Wait for a process to finish and return its resource usage."""
+    if not hasattr(os, "wait4"):
+        process.wait()
+        return {}
+
+    usage = {}
+    if hasattr(os, "waitid"):
+        # NOTE: Keep the finished process around to read its I/O counters.
+        os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+        usage.update(_read_io(process.pid))
+
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = _exit_code(status)
+
+    # NOTE: ``ru_maxrss`` is in bytes on macOS and in kilobytes elsewhere.
+    scale = 1 if sys.platform == "darwin" else 1024
+    usage.update(
+        {
+            "user_time": round(rusage.ru_utime, 6),
+            "system_time": round(rusage.ru_stime, 6),
+            "max_rss": rusage.ru_maxrss * scale,
+        }
+    )
+    return usage
+
+
+def call(args, **kwargs):
+    """Run a command like ``subprocess.call`` and measure its resource usage.
+
+    :returns: the exit code and a dictionary of used resources
+    """
+    started = time.monotonic()
+    with subprocess.Popen(args, **kwargs) as process:
+        try:
+            usage = _wait(process)
+        except BaseException:
+            process.kill()
+            if process.returncode is None:
+                process.wait()
+            raise
+
+    usage["wall_time"] = round(time.monotonic() - started, 6)
+    return process.returncode, usage
@@ -309,6 +309,23 @@ def test_datasets_list_non_empty(output_format, runner, project):
     assert "my-dataset" not in result.output
 
 
+def test_datasets_list_summaries_same_as_datasets(runner, client):
+    """Test listing datasets from stored summaries shows the same table as loaded datasets."""
+    for name in ("first", "second"):
+        result = runner.invoke(cli, ["dataset", "create", name, "--title", name.title(), "-k", "keyword"])
+        assert 0 == result.exit_code
+
+    columns = ",".join(DATASETS_COLUMNS)
+    expected = DATASETS_FORMATS["tabular"](client, list(client.datasets.values()), columns=columns)
+
+    for _ in range(2):
+        # NOTE: The second listing reads summaries stored by the first one.
+        result = runner.invoke(cli, ["dataset", "--columns", columns])
+        assert 0 == result.exit_code
+        assert expected == result.output.rstrip("\n")
+        assert "+00:00" not in result.output
+
+
 @pytest.mark.parametrize(
     "columns,headers,values",
     [
@@ -369,6 +386,24 @@ def test_add_and_create_dataset(directory_tree, runner, project, client, subdire
     assert 1 == result.exit_code
 
 
+@pytest.mark.parametrize("copy_mode,linked", [("copy", False), ("auto", False), ("hardlink", True)])
+def test_add_with_copy_mode(directory_tree, runner, client, copy_mode, linked):
+    """Test local files are copied or linked depending on the copy mode."""
+    result = runner.invoke(
+        cli,
+        ["dataset", "add", "--create", "--copy-mode", copy_mode, "my-dataset", str(directory_tree)],
+        catch_exceptions=False,
+    )
+    assert 0 == result.exit_code, result.output
+
+    path = client.path / DATA_DIR / "my-dataset" / "directory_tree" / "dir2" / "file2"
+    assert "5678" == path.read_text()
+    assert linked == (path.stat().st_ino == Path(directory_tree.join("dir2", "file2")).stat().st_ino)
+
+    dataset = client.load_dataset("my-dataset")
+    assert {"file", "file2"} == {Path(f.path).name for f in dataset.files}
+
+
 def test_add_and_create_dataset_with_lfs_warning(directory_tree, runner, project, client_with_lfs_warning):
     """Test add data with lfs warning."""
 
@@ -78,3 +78,25 @@ def test_dataset_log_invalidation_strict(tmpdir, runner, project, client, format
 
     assert 0 == result.exit_code, result.output
     assert "wasInvalidatedBy" in result.output
+
+
+@pytest.mark.parametrize("format", ["ascii", "json-ld"])
+def test_log_parallel(runner, client, run, monkeypatch, format):
+    """Test log output does not depend on the number of processes."""
+    monkeypatch.setenv("RENKU_DISABLE_GRAPH_CACHE", "1")
+
+    source = client.path / "source.txt"
+    source.write_text("content")
+    client.repo.git.add("--all")
+    client.repo.index.commit("Add source")
+
+    assert 0 == run(args=["run", "wc", "-c"], stdin=source, stdout="count.txt")
+    assert 0 == run(args=["run", "cp", "count.txt", "copy.txt"])
+    assert 0 == run(args=["run", "cat", "source.txt", "copy.txt"], stdout="all.txt")
+
+    serial = runner.invoke(cli, ["log", "--format", format, "all.txt"])
+    assert 0 == serial.exit_code, serial.output
+
+    parallel = runner.invoke(cli, ["log", "--format", format, "--jobs", "2", "all.txt"])
+    assert 0 == parallel.exit_code, parallel.output
+    assert serial.output == parallel.output
@@ -73,3 +73,118 @@ def test_run_clean(runner, project, run_shell):
     assert "output" in result.output
     assert ".yaml" in result.output
     assert ".renku/workflow/" in result.output
+
+
+def test_run_activity_index(runner, client, run):
+    """Test activity index is appended and can be rebuilt."""
+    assert 0 == run(args=("run", "echo", "a"), stdout="output")
+
+    lines = client.activity_index_path.read_text().splitlines()
+    assert 1 == len(lines)
+    assert '"output"' in lines[0]
+
+    client.activity_index_path.unlink()
+    client.repo.index.remove([str(client.activity_index_path)])
+    client.repo.index.commit("remove activity index")
+
+    result = runner.invoke(cli, ["doctor"])
+    assert 1 == result.exit_code
+    assert "activity index is missing" in result.output
+
+    result = runner.invoke(cli, ["doctor", "--fix"])
+    assert 0 == result.exit_code, result.output
+    assert lines == client.activity_index_path.read_text().splitlines()
+    assert not client.repo.is_dirty()
+
+
+@pytest.mark.parametrize("mode", ["git", "snapshot", "inotify"])
+def test_run_output_detection(renku_cli, client, mode):
+    """Test outputs are detected in all output detection modes."""
+    (client.path / "source.txt").write_text("data")
+    (client.path / "unchanged.txt").write_text("data\n")
+    client.repo.git.add("source.txt", "unchanged.txt")
+    client.repo.index.commit("Add files")
+
+    script = 'mkdir -p out/sub && cp "$0" out/sub/copy.txt && echo data > unchanged.txt && touch top.txt'
+    exit_code, plan = renku_cli("run", "--output-detection", mode, "sh", "-c", script, "source.txt")
+
+    assert 0 == exit_code
+    assert {"out/sub/copy.txt", "top.txt"} == {o.produces.path for o in plan.outputs}
+
+
+def test_run_failing_command_closes_watcher(renku_cli, client, monkeypatch):
+    """Test the inotify watcher is closed when the command fails."""
+    from renku.core.utils.file_changes import InotifyWatcher
+
+    watchers = []
+    start = InotifyWatcher.start
+
+    def start_spy(self):
+        watchers.append(self)
+        return start(self)
+
+    monkeypatch.setattr(InotifyWatcher, "start", start_spy)
+
+    exit_code, _ = renku_cli("run", "--output-detection", "inotify", "sh", "-c", "touch out.txt && false")
+
+    assert 0 != exit_code
+    assert 1 == len(watchers)
+    assert watchers[0]._fd is None
+
+
+def test_run_snapshot_falls_back_to_git(renku_cli, client):
+    """Test outputs outside of watched directories are found with Git."""
+    (client.path / "models" / "deep").mkdir(parents=True)
+    (client.path / "models" / "deep" / "README").write_text("models")
+    client.repo.git.add("models")
+    client.repo.index.commit("Add models")
+
+    exit_code, plan = renku_cli("run", "--output-detection", "snapshot", "sh", "-c", "touch models/deep/model.txt")
+
+    assert 0 == exit_code
+    assert {"models/deep/model.txt"} == {o.produces.path for o in plan.outputs}
+
+
+def test_run_lazy_directories(renku_cli, runner, client):
+    """Test input directories are recorded by their Git tree."""
+    (client.path / "images" / "raw").mkdir(parents=True)
+    (client.path / "images" / "a.txt").write_text("a")
+    (client.path / "images" / "raw" / "b.txt").write_text("b")
+    client.repo.git.add("images")
+    client.repo.index.commit("Add images")
+
+    exit_code, plan = renku_cli("run", "--lazy-directories", "ls", "-R", "images", stdout=client.path / "list.txt")
+
+    assert 0 == exit_code
+    collection = plan.inputs[0].consumes
+    assert client.repo.head.commit.tree["images"].hexsha == collection.tree_hash
+    assert collection._members is None
+    assert {"images", "images/a.txt", "images/raw", "images/raw/b.txt"} == {e.path for e in collection.entities}
+
+    (client.path / "images" / "raw" / "c.txt").write_text("c")
+    client.repo.git.add("images")
+    client.repo.index.commit("Add more images")
+
+    result = runner.invoke(cli, ["status"])
+    assert 1 == result.exit_code
+    assert "images/raw/c.txt" in result.output
+
+    exit_code, plan = renku_cli("update")
+    assert 0 == exit_code
+    assert "c.txt" in (client.path / "list.txt").read_text()
+    assert plan.inputs[0].consumes.tree_hash
+
+
+@pytest.mark.parametrize("streams", [{}, {"stderr": "errors.txt"}])
+def test_run_pull_progress_not_in_mapped_stderr(client, run, monkeypatch, streams):
+    """Test progress of pulled inputs is not shown in a mapped or non-terminal stderr."""
+    from renku.core.management import LocalClient
+
+    calls = []
+    monkeypatch.setattr(LocalClient, "check_external_storage", lambda self: True)
+    monkeypatch.setattr(
+        LocalClient, "pull_paths_from_storage", lambda self, *paths, progress=None: calls.append(progress)
+    )
+
+    assert 0 == run(args=("run", "sh", "-c", "echo error >&2"), **streams)
+    assert [None] == calls
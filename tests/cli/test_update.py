@@ -17,13 +17,16 @@
 # limitations under the License.
 """Test ``update`` command."""
 
+import time
 from pathlib import Path
 
 import git
+import pytest
 
 from renku.cli import cli
 from renku.core.management.repository import DEFAULT_DATA_DIR as DATA_DIR
 from renku.core.models.entities import Collection
+from renku.core.plugins.implementations.resource_usage import get_resource_usage
 
 
 def update_and_commit(data, file_, repo):
@@ -321,3 +324,304 @@ def test_relative_path_for_directory_input(client, run, renku_cli):
     assert 1 == len(cwl.inputs)
     assert isinstance(cwl.inputs[0].consumes, Collection)
     assert "data" == cwl.inputs[0].consumes.path
+
+
+def test_status_graph_snapshot(client, run, runner):
+    """Test status reuses and invalidates the graph snapshot."""
+    from renku.core.management.graph_cache import GraphCache
+
+    source = client.path / "source.txt"
+    update_and_commit("1", source, client.repo)
+    assert 0 == run(args=["run", "wc", "-c"], stdin=source, stdout="result.txt")
+
+    cache = GraphCache(client)
+    assert 0 == runner.invoke(cli, ["status"]).exit_code
+    assert cache.path.exists()
+    assert not client.repo.is_dirty(untracked_files=True)
+
+    processed, _ = cache.load()
+    assert client.repo.head.commit.hexsha in processed
+
+    update_and_commit("12", source, client.repo)
+    processed, latest_commits = cache.load()
+    assert processed
+    assert "source.txt" not in latest_commits
+
+    result = runner.invoke(cli, ["status"])
+    assert 1 == result.exit_code
+    assert "source.txt" in result.output
+
+    client.repo.git.reset("--hard", "HEAD~2")
+    assert ({}, {}) == cache.load()
+    assert 0 == runner.invoke(cli, ["status"]).exit_code
+
+
+def test_status_skips_unchanged_graph_snapshot(client, run, monkeypatch):
+    """Test the graph snapshot is not stored again when it did not change."""
+    from renku.core.commands.graph import Graph
+    from renku.core.management.graph_cache import GraphCache
+
+    source = client.path / "source.txt"
+    update_and_commit("1", source, client.repo)
+    assert 0 == run(args=["run", "wc", "-c"], stdin=source, stdout="result.txt")
+
+    saves = []
+    save = GraphCache.save
+
+    def save_spy(self, processed, latest_commits):
+        saves.append(len(processed))
+        return save(self, processed, latest_commits)
+
+    monkeypatch.setattr(GraphCache, "save", save_spy)
+
+    graph = Graph(client)
+    graph.build_status()
+    assert saves
+    saved = len(saves)
+
+    graph.build_status()
+    assert saved == len(saves)
+
+
+def test_update_parallel(runner, project, renku_cli, no_lfs_warning):
+    """Test running independent steps of an update at the same time."""
+    cwd = Path(project)
+    source = cwd / "source.txt"
+    repo = git.Repo(project)
+
+    update_and_commit("1", source, repo)
+
+    for name in ("first", "second", "third"):
+        assert 0 == renku_cli("run", "cp", str(source), str(cwd / "{}.txt".format(name)))[0]
+    assert 0 == renku_cli("run", "cp", str(cwd / "first.txt"), str(cwd / "last.txt"))[0]
+
+    update_and_commit("2", source, repo)
+
+    exit_code, run = renku_cli("update", "--jobs", "2")
+    assert 0 == exit_code
+    assert 4 == len(run.subprocesses)
+    assert not repo.is_dirty(untracked_files=True)
+
+    for name in ("first", "second", "third", "last"):
+        assert "2" == (cwd / "{}.txt".format(name)).read_text().strip(), name
+
+    assert 0 == runner.invoke(cli, ["status"]).exit_code
+
+
+@pytest.mark.parametrize("engine", ["--native", "--cwl"])
+def test_update_engines(runner, project, renku_cli, no_lfs_warning, engine):
+    """Test updating files with the native and the CWL runner."""
+    cwd = Path(project)
+    source = cwd / "source.txt"
+    output = cwd / "result.txt"
+    repo = git.Repo(project)
+
+    update_and_commit("1", source, repo)
+    assert 0 == renku_cli("run", "wc", "-c", stdin=source, stdout=output)[0]
+    assert 0 == renku_cli("run", "cp", str(output), str(cwd / "copy.txt"))[0]
+
+    update_and_commit("12", source, repo)
+
+    exit_code, run = renku_cli("update", engine)
+    assert 0 == exit_code
+    assert 2 == len(run.subprocesses)
+    assert not repo.is_dirty(untracked_files=True)
+    assert "2" == output.read_text().strip()
+    assert "2" == (cwd / "copy.txt").read_text().strip()
+
+
+@pytest.mark.parametrize("engine", ["--native", "--cwl"])
+def test_update_existing_output_directory(runner, project, renku_cli, no_lfs_warning, engine):
+    """Test updating a command that writes into an output directory that existed before."""
+    cwd = Path(project)
+    source = cwd / "source.txt"
+    script = cwd / "script.sh"
+    output = cwd / "output"
+    repo = git.Repo(project)
+
+    update_and_commit('cp "$1" "$2/copy.txt"\n', script, repo)
+    update_and_commit("1", source, repo)
+    output.mkdir()
+
+    assert 0 == renku_cli("run", "sh", str(script), str(source), str(output))[0]
+
+    update_and_commit("2", source, repo)
+
+    exit_code, _ = renku_cli("update", engine)
+    assert 0 == exit_code
+    assert "2" == (output / "copy.txt").read_text()
+    assert not repo.is_dirty(untracked_files=True)
+
+
+def test_update_failure_restores_outputs(runner, project, renku_cli, no_lfs_warning):
+    """Test outputs are restored when a step of the native runner fails."""
+    cwd = Path(project)
+    source = cwd / "source.txt"
+    script = cwd / "script.sh"
+    repo = git.Repo(project)
+
+    update_and_commit('grep ok "$1" > "$2"\n', script, repo)
+    update_and_commit("ok", source, repo)
+
+    assert 0 == renku_cli("run", "cp", str(source), str(cwd / "first.txt"))[0]
+    assert 0 == renku_cli("run", "sh", str(script), str(cwd / "first.txt"), str(cwd / "second.txt"))[0]
+    assert "ok" == (cwd / "second.txt").read_text().strip()
+
+    update_and_commit("fail", source, repo)
+
+    result = runner.invoke(cli, ["update"])
+    assert 0 != result.exit_code
+    assert "ok" == (cwd / "first.txt").read_text()
+    assert "ok" == (cwd / "second.txt").read_text().strip()
+    assert not repo.is_dirty(untracked_files=True)
+
+
+def test_update_resume(runner, project, renku_cli, no_lfs_warning, monkeypatch):
+    """Test a failed update continues with outputs of finished steps."""
+    cwd = Path(project)
+    source = cwd / "source.txt"
+    script = cwd / "script.sh"
+    repo = git.Repo(project)
+
+    update_and_commit('test -z "$RENKU_TEST_FAIL" && cp "$1" "$2"\n', script, repo)
+    update_and_commit("1", source, repo)
+
+    assert 0 == renku_cli("run", "cp", str(source), str(cwd / "first.txt"))[0]
+    assert 0 == renku_cli("run", "sh", str(script), str(cwd / "first.txt"), str(cwd / "second.txt"))[0]
+
+    update_and_commit("2", source, repo)
+    monkeypatch.setenv("RENKU_TEST_FAIL", "1")
+    result = runner.invoke(cli, ["update", "--no-reuse"])
+    assert 0 != result.exit_code
+    assert "Outputs of 1 finished steps were saved" in result.output
+    assert "1" == (cwd / "first.txt").read_text()
+    assert not repo.is_dirty(untracked_files=True)
+
+    monkeypatch.delenv("RENKU_TEST_FAIL")
+    exit_code, run = renku_cli("update", "--no-reuse", "--resume")
+    assert 0 == exit_code
+    assert "2" == (cwd / "second.txt").read_text()
+    assert not repo.is_dirty(untracked_files=True)
+
+    steps = list(run.activity.subprocesses.values())
+    assert all(step.started_at_time < step.ended_at_time for step in steps)
+    assert not list(Path(project).glob(".renku/cache/checkpoints/*"))
+
+
+def test_update_reuses_results(runner, project, renku_cli, no_lfs_warning):
+    """Test outputs of steps executed with the same inputs are restored."""
+    cwd = Path(project)
+    source = cwd / "source.txt"
+    output = cwd / "result.txt"
+    repo = git.Repo(project)
+
+    update_and_commit("1", source, repo)
+    assert 0 == renku_cli("run", "wc", "-c", stdin=source, stdout=output)[0]
+    assert 0 == renku_cli("run", "cp", str(output), str(cwd / "copy.txt"))[0]
+
+    update_and_commit("12", source, repo)
+    result = runner.invoke(cli, ["update"])
+    assert 0 == result.exit_code, result.output
+    assert "Reusing" not in result.output
+
+    update_and_commit("1", source, repo)
+    exit_code, run = renku_cli("update")
+    assert 0 == exit_code
+    assert not repo.is_dirty(untracked_files=True)
+    assert "1" == output.read_text().strip()
+    assert "1" == (cwd / "copy.txt").read_text().strip()
+
+    steps = run.activity.subprocesses.values()
+    annotations = [a for step in steps for a in step.annotations if a._id.endswith("/annotations/reused")]
+    assert len(steps) == len(annotations)
+    assert all("/activities/" in str(a.body) for a in annotations)
+
+    update_and_commit("12", source, repo)
+    result = runner.invoke(cli, ["update", "--no-reuse"])
+    assert 0 == result.exit_code, result.output
+    assert "Reusing" not in result.output
+    assert "2" == output.read_text().strip()
+
+
+def test_update_records_resource_usage(runner, project, renku_cli, no_lfs_warning):
+    """Test resources used by each step of an update are recorded."""
+    cwd = Path(project)
+    source = cwd / "source.txt"
+    output = cwd / "result.txt"
+    repo = git.Repo(project)
+
+    update_and_commit("1", source, repo)
+    assert 0 == renku_cli("run", "wc", "-c", stdin=source, stdout=output)[0]
+    assert 0 == renku_cli("run", "cp", str(output), str(cwd / "copy.txt"))[0]
+
+    update_and_commit("12", source, repo)
+    exit_code, run = renku_cli("update", "--no-reuse")
+    assert 0 == exit_code
+
+    for step in run.activity.subprocesses.values():
+        usage = get_resource_usage(step)
+        assert usage["wall_time"] >= 0
+        assert usage["max_rss"] > 0
+
+
+def test_update_dry_run(runner, project, renku_cli, no_lfs_warning):
+    """Test showing the plan of an update without running it."""
+    cwd = Path(project)
+    source = cwd / "source.txt"
+    output = cwd / "result.txt"
+    repo = git.Repo(project)
+
+    update_and_commit("1", source, repo)
+    assert 0 == renku_cli("run", "wc", "-c", stdin=source, stdout=output)[0]
+    assert 0 == renku_cli("run", "cp", str(output), str(cwd / "copy.txt"))[0]
+
+    pointer = "version https://git-lfs.github.com/spec/v1\noid sha256:{0}\nsize 204800\n".format("0" * 64)
+    update_and_commit(pointer, source, repo)
+    commit = repo.head.commit
+
+    result = runner.invoke(cli, ["update", "--dry-run"])
+    assert 0 == result.exit_code, result.output
+    assert "1. wc -c < source.txt > result.txt" in result.output
+    assert "2. cp result.txt copy.txt" in result.output
+    assert "Outputs: copy.txt" in result.output
+    assert "(from 1 earlier runs)" in result.output
+    assert "Git LFS data to pull: 204.8 KB in 1 files" in result.output
+
+    assert commit == repo.head.commit
+    assert not repo.is_dirty(untracked_files=True)
+    assert "1" == output.read_text().strip()
+
+
+def test_dry_run_estimate_without_pull_time(client, run, monkeypatch):
+    """Test time spent pulling inputs is not recorded as runtime of a step."""
+    from renku.core.commands.dry_run import previous_durations
+    from renku.core.management import LocalClient
+
+    source = client.path / "source.txt"
+    update_and_commit("1", source, client.repo)
+
+    with monkeypatch.context() as monkey:
+        monkey.setattr(LocalClient, "check_external_storage", lambda self: True)
+        monkey.setattr(LocalClient, "track_paths_in_storage", lambda self, *paths: [])
+        monkey.setattr(LocalClient, "pull_paths_from_storage", lambda self, *paths, progress=None: time.sleep(2))
+        assert 0 == run(args=["run", "wc", "-c"], stdin=source, stdout="result.txt")
+
+    activity = next(iter(client.activities_for_paths(["result.txt"])))
+    durations = previous_durations(client, activity.association.plan)
+
+    assert 1 == len(durations)
+    assert durations[0] < 2
+
+
+@pytest.mark.parametrize("command", [["update"], ["rerun", "result.txt"]])
+def test_cwl_runner_cannot_resume(client, run, runner, command):
+    """Test --resume is rejected with the cwltool runner."""
+    source = client.path / "source.txt"
+    update_and_commit("1", source, client.repo)
+    assert 0 == run(args=["run", "wc", "-c"], stdin=source, stdout="result.txt")
+    update_and_commit("12", source, client.repo)
+
+    result = runner.invoke(cli, command + ["--cwl", "--resume"])
+
+    assert 2 == result.exit_code
+    assert "Cannot use --resume with --cwl" in result.output
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test ``workflow`` commands."""
+
+from pathlib import Path
+
+import git
+
+from renku.cli import cli
+
+
+def update_and_commit(data, file_, repo):
+    """Update a file and commit it."""
+    file_.write_text(data)
+    repo.git.add(str(file_))
+    repo.index.commit("Updated {0}".format(file_.name))
+
+
+def test_workflow_execute(runner, project, renku_cli, client, no_lfs_warning):
+    """Test executing a named workflow again."""
+    cwd = Path(project)
+    source = cwd / "source.txt"
+    result = cwd / "result.txt"
+    copy = cwd / "copy.txt"
+    repo = git.Repo(project)
+
+    update_and_commit("1", source, repo)
+    exit_code, run = renku_cli("run", "--cpus", "2", "wc", "-c", stdin=source, stdout=result)
+    assert 0 == exit_code
+    assert 2 == run.cpus
+    assert 0 == renku_cli("run", "sh", "-c", 'cat "$0" > "$1"; echo done', str(result), str(copy))[0]
+
+    update_and_commit("12", source, repo)
+    assert 0 == runner.invoke(cli, ["update"]).exit_code
+    assert 0 == runner.invoke(cli, ["workflow", "set-name", "count"]).exit_code
+
+    update_and_commit("123", source, repo)
+    exit_code, run = renku_cli("workflow", "execute", "--cpus", "2", "count")
+    assert 0 == exit_code
+    assert "3" == result.read_text().strip()
+    assert "3" == copy.read_text().strip()
+    assert not repo.is_dirty(untracked_files=True)
+
+    steps = [step.process for step in run.subprocesses]
+    assert [2, None] == [step.cpus for step in steps]
+
+    logs = {log.name: log.read_text() for log in cwd.glob(".renku/logs/*/*.log")}
+    assert {"001_wc.log": "", "002_sh.log": "done\n"} == logs
+
+    result = runner.invoke(cli, ["workflow", "execute", "unknown"])
+    assert 2 == result.exit_code
+    assert 'No workflow named "unknown"' in result.output
@@ -41,3 +41,26 @@ def test_local_client(tmpdir):
 def test_ignored_paths(paths, ignored, client):
     """Test resolution of ignored paths."""
     assert client.find_ignored_paths(*paths) == ignored
+
+
+def test_find_previous_commits(client):
+    """Test resolving latest commits of many paths at once."""
+    (client.path / "data").mkdir(exist_ok=True)
+    for name in ("data/a", "data/b", "c d"):
+        (client.path / name).write_text(name)
+        client.repo.index.add([name])
+        client.repo.index.commit("add {}".format(name))
+
+    (client.path / "data" / "a").write_text("modified")
+    client.repo.index.add(["data/a"])
+    client.repo.index.commit("modify data/a")
+
+    paths = ["data", "data/a", "data/b", "c d", "missing"]
+    commits = client.find_previous_commits(paths)
+
+    assert "missing" not in commits
+    for path in paths[:-1]:
+        assert list(client.repo.iter_commits("HEAD", paths=path, max_count=1))[0] == commits[path]
+
+    with pytest.raises(KeyError):
+        client.find_previous_commit("missing")
@@ -19,6 +19,7 @@
 import os
 import shutil
 import stat
+import time
 from pathlib import Path
 
 import pytest
@@ -28,8 +29,9 @@ from renku.core import errors
 from renku.core.commands.dataset import add_file, create_dataset, file_unlink, list_datasets, list_files
 from renku.core.errors import ParameterError
 from renku.core.management.repository import DEFAULT_DATA_DIR as DATA_DIR
-from renku.core.models.datasets import Dataset
+from renku.core.models.datasets import Dataset, DatasetFile
 from renku.core.models.provenance.agents import Person
+from renku.core.utils.file_changes import RACY_NS
 from renku.core.utils.contexts import chdir
 from tests.utils import raises
 
@@ -196,3 +198,139 @@ def test_unlink_default(directory_tree, client):
 
     with pytest.raises(ParameterError):
         file_unlink("dataset", (), ())
+
+
+def test_dataset_registry_reloads_changed_datasets(client):
+    """Test datasets are loaded once and again when their metadata changes."""
+    with client.with_dataset("dataset", create=True) as dataset:
+        dataset.title = "First"
+
+    path = client.get_dataset_path("dataset")
+    mtime_ns = int(time.time() * 1e9) - 10 * RACY_NS
+    os.utime(str(path), ns=(mtime_ns, mtime_ns))
+    dataset = client.datasets[path]
+    assert dataset is client.datasets[path]
+
+    summaries = client.datasets.summaries()
+    assert ["First"] == [s.title for s in summaries]
+    assert 0 == summaries[0].files
+
+    with client.with_dataset("dataset") as dataset:
+        dataset.title = "Second"
+
+    assert "Second" == client.datasets[path].title
+    assert ["Second"] == [s.title for s in client.datasets.summaries()]
+
+
+def test_dataset_registry_verifies_racy_stamps(client):
+    """Test datasets modified right after they were loaded are not taken from caches."""
+    with client.with_dataset("dataset", create=True) as dataset:
+        dataset.title = "First"
+
+    path = client.get_dataset_path("dataset")
+    assert "First" == client.datasets[path].title
+    assert ["First"] == [s.title for s in client.datasets.summaries()]
+
+    before = os.stat(str(path))
+    content = path.read_text().replace("First", "Fifth")
+    with open(str(path), "w") as fp:
+        fp.write(content)
+    os.utime(str(path), ns=(before.st_atime_ns, before.st_mtime_ns))
+
+    assert "Fifth" == client.datasets[path].title
+    assert ["Fifth"] == [s.title for s in client.datasets.summaries()]
+
+
+def test_dataset_bulk_file_operations():
+    """Test files of a dataset are found, renamed and unlinked by path."""
+    dataset = Dataset(name="dataset")
+    dataset.update_files([DatasetFile(path="data/dataset/{}".format(i)) for i in range(5)])
+    dataset.update_files([DatasetFile(path="data/dataset/0", based_on=DatasetFile(path="source/0"))])
+
+    assert 5 == len(dataset.files)
+    assert 3 == dataset.find_file("data/dataset/3", return_index=True)
+    assert dataset.find_file("data/dataset/0").based_on
+
+    unlinked = dataset.unlink_files(["data/dataset/1", "data/dataset/3", "data/dataset/missing"])
+    assert ["data/dataset/1", "data/dataset/3"] == [f.path for f in unlinked]
+    assert dataset.find_file("data/dataset/1") is None
+    assert 1 == dataset.find_file("data/dataset/2", return_index=True)
+
+    renamed = dataset.rename_files(lambda path: path.replace("data/dataset", "data/other"))
+    assert renamed.find_file("data/other/4")
+    with pytest.raises(FileExistsError):
+        dataset.rename_files(lambda path: "data/dataset/0")
+
+
+def test_load_dataset_without_commits_of_files(directory_tree, client, monkeypatch):
+    """Test loading a dataset does not look up commits of regular files."""
+    with chdir(client.path):
+        create_dataset("dataset")
+        add_file([directory_tree.strpath], "dataset")
+
+        calls = []
+        find_previous_commit = client.find_previous_commit
+
+        def find_previous_commit_spy(paths, *args, **kwargs):
+            calls.append(paths)
+            return find_previous_commit(paths, *args, **kwargs)
+
+        monkeypatch.setattr(client, "find_previous_commit", find_previous_commit_spy)
+        monkeypatch.setattr(client, "find_previous_commits", lambda *args, **kwargs: pytest.fail("History walked"))
+
+        dataset = client.load_dataset("dataset")
+
+    assert 1 < len(dataset.files)
+    assert all(f.client is client for f in dataset.files)
+    assert 1 >= len(calls)
+
+
+def test_set_file_clients_in_submodules(client, tmp_path, monkeypatch):
+    """Test files in submodules are resolved with one history walk per repository."""
+    sub_repo = Repo.init(str(tmp_path / "sub"))
+    for name in (".renku/metadata.yml", "data/a", "data/b"):
+        path = tmp_path / "sub" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+    sub_repo.git.add("--all")
+    sub_repo.index.commit("Add files")
+
+    with chdir(client.path):
+        client.repo.git.execute(
+            ["git", "-c", "protocol.file.allow=always", "submodule", "add", str(tmp_path / "sub"), ".renku/vendors/sub"]
+        )
+        os.makedirs("data/dataset")
+        for name in ("a", "b"):
+            os.symlink("../../.renku/vendors/sub/data/{}".format(name), "data/dataset/{}".format(name))
+        client.repo.git.add("--all")
+        client.repo.index.commit("Add submodule")
+        # NOTE: An uncommitted file is resolved with the commit of its label.
+        os.symlink("../../.renku/vendors/sub/data/a", "data/dataset/c")
+        label = "data/dataset/c@{}".format(client.repo.head.commit.hexsha)
+
+        dataset = Dataset(
+            name="dataset",
+            files=[
+                DatasetFile(path="data/dataset/a"),
+                DatasetFile(path="data/dataset/b"),
+                DatasetFile(path="data/dataset/c", label=label),
+            ],
+        )
+        dataset.client = client
+
+        walks = []
+        walk_previous_commits = type(client)._walk_previous_commits
+
+        def walk_spy(self, paths, commit):
+            walks.append(paths)
+            return walk_previous_commits(self, paths, commit)
+
+        monkeypatch.setattr(type(client), "_walk_previous_commits", walk_spy)
+        monkeypatch.setattr(Repo, "iter_commits", lambda *args, **kwargs: pytest.fail("Commit looked up per file"))
+
+        dataset._set_file_clients()
+
+    sub_path = (client.path / ".renku/vendors/sub").resolve()
+    assert all(f.client.path == sub_path for f in dataset.files)
+    assert 2 == len(walks)
+    assert client.subclients(client.repo.head.commit) is client.subclients(client.repo.head.commit)
@@ -173,7 +173,10 @@ def test_create_from_template(local_client, template):
         template_files = [
             f
             for f in local_client.path.glob("**/*")
-            if ".git" not in str(f) and not str(f).endswith(".renku/metadata.yml")
+            if ".git" not in str(f)
+            and not str(f).endswith(".renku/metadata.yml")
+            and local_client.cache_path not in f.parents
+            and f != local_client.cache_path
         ]
         for template_file in template_files:
             expected_file = template_path / template_file.relative_to(local_client.path)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test native workflow runner."""
+
+from types import SimpleNamespace
+
+from renku.core.commands.native_runner import _dependencies, _ordered
+
+
+def _step(name, inputs, outputs):
+    """Return a step with the given paths."""
+    return SimpleNamespace(
+        name=name,
+        inputs=[SimpleNamespace(consumes=SimpleNamespace(path=path)) for path in inputs],
+        outputs=[SimpleNamespace(produces=SimpleNamespace(path=path)) for path in outputs],
+    )
+
+
+def test_ordered_steps():
+    """Test steps generating inputs are run first."""
+    steps = [
+        _step("last", ["data/b/file"], ["result"]),
+        _step("second", ["a"], ["data/b"]),
+        _step("first", ["source"], ["a"]),
+        _step("other", ["source"], ["other"]),
+    ]
+
+    order = [step.name for step in _ordered(steps)]
+
+    assert order.index("first") < order.index("second") < order.index("last")
+
+
+def test_step_dependencies():
+    """Test steps wait for steps writing paths they use."""
+    steps = [
+        _step("first", ["source"], ["a"]),
+        _step("second", ["a"], ["data/b"]),
+        _step("other", ["source"], ["other"]),
+        _step("overwrite", ["source"], ["data/b/file"]),
+        _step("reader", ["other"], ["source"]),
+    ]
+
+    assert [set(), {0}, set(), {1}, {0, 2, 3}] == _dependencies(steps)
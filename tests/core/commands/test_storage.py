@@ -95,3 +95,46 @@ def test_lfs_storage_unpushed_clean(runner, project, client_with_remote):
 
     assert 0 == result.exit_code
     assert "These paths were ignored as they are not pushed" in result.output
+
+
+def test_lfs_pull_only_pointers(client, monkeypatch):
+    """Test only files that are LFS pointers are pulled with their sizes reported."""
+    from renku.core.management import storage
+
+    (client.path / "data").mkdir(exist_ok=True)
+    (client.path / "data" / "pointer").write_text(
+        "{0}v1\noid sha256:{1}\nsize 42\n".format(client._LFS_HEADER, "0" * 64)
+    )
+    (client.path / "data" / "pulled").write_text("pulled content")
+
+    commands, pulled = [], []
+
+    class Progress:
+        def __init__(self, description, total_size):
+            pulled.append(total_size)
+
+        def update(self, size):
+            pulled.append(size)
+
+        def finalize(self):
+            pulled.append("done")
+
+    monkeypatch.setattr(client, "check_external_storage", lambda: True)
+    monkeypatch.setattr(storage, "run", lambda command, **kwargs: commands.append(command))
+
+    client.pull_paths_from_storage(str(client.path / "data"), progress=Progress)
+
+    assert [client._CMD_STORAGE_PULL + ["data/pointer"]] == commands
+    assert [42, 42, "done"] == pulled
+
+    commands.clear()
+    client.pull_paths_from_storage(str(client.path / "data" / "pulled"), progress=Progress)
+    assert [] == commands
+
+
+def test_batches_by_length():
+    """Test paths are split into arguments of limited length."""
+    from renku.core.management.storage import _batches_by_length
+
+    assert [["a", "b"], ["cc"]] == list(_batches_by_length(["a", "b", "cc"], max_length=4))
+    assert [] == list(_batches_by_length([]))
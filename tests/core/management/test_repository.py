@@ -92,3 +92,124 @@ def test_import_from_template(local_client):
         compiled_content = compiled_file.read_text()
         expected_content = "name: name" "description: description" "created: now" "updated: now"
         assert expected_content == compiled_content
+
+
+def test_activity_index_append_only(tmp_path):
+    """Test activity index appends entries and ignores duplicates."""
+    from types import SimpleNamespace
+
+    from renku.core.management.activity_index import ActivityIndex
+
+    def _activity(path, *outputs):
+        generated = [SimpleNamespace(path=o, commit=SimpleNamespace(hexsha="abc")) for o in outputs]
+        return SimpleNamespace(path=path, generated=generated)
+
+    index = ActivityIndex(path=tmp_path / "index.jsonl")
+    index.add(_activity(".renku/workflow/1.yaml", "output", "data/output"))
+    index.add(_activity(".renku/workflow/1.yaml", "output"))
+    index.add(_activity(".renku/workflow/2.yaml", "output"))
+
+    assert 4 == len(index.path.read_text().splitlines())
+
+    index = ActivityIndex(path=tmp_path / "index.jsonl")
+    assert [".renku/workflow/1.yaml", ".renku/workflow/2.yaml"] == index.paths["output"]["abc"]
+    assert {".renku/workflow/1.yaml", ".renku/workflow/2.yaml"} == index.activities
+    assert ["abc"] == list(index.commits.keys())
+
+
+def test_activity_index_legacy(tmp_path):
+    """Test activity index converts the legacy YAML index."""
+    from types import SimpleNamespace
+
+    import yaml
+
+    from renku.core.management.activity_index import ActivityIndex
+
+    legacy_path = tmp_path / "index.yaml"
+    legacy_path.write_text(yaml.dump({"output": {"abc": [".renku/workflow/1.yaml"]}}))
+
+    index = ActivityIndex(path=tmp_path / "index.jsonl", legacy_path=legacy_path)
+    assert {"output": {"abc": [".renku/workflow/1.yaml"]}} == index.paths
+
+    generated = [SimpleNamespace(path="other", commit=SimpleNamespace(hexsha="def"))]
+    index.add(SimpleNamespace(path=".renku/workflow/2.yaml", generated=generated))
+
+    assert not legacy_path.exists()
+    assert {
+        "output": {"abc": [".renku/workflow/1.yaml"]},
+        "other": {"def": [".renku/workflow/2.yaml"]},
+    } == ActivityIndex(path=tmp_path / "index.jsonl").paths
+
+
+def test_activity_index_parent_paths(tmp_path):
+    """Test finding indexed ancestors of a path."""
+    from types import SimpleNamespace
+
+    from renku.core.management.activity_index import ActivityIndex
+
+    generated = [SimpleNamespace(path=p, commit=SimpleNamespace(hexsha="abc")) for p in ("data", "data/raw", "db")]
+
+    index = ActivityIndex(path=tmp_path / "index.jsonl")
+    index.add(SimpleNamespace(path=".renku/workflow/1.yaml", generated=generated))
+
+    assert ["data", "data/raw"] == index.parent_paths("data/raw/file.csv")
+    assert ["data"] == index.parent_paths("data/raw")
+    assert [] == index.parent_paths("database/file.csv")
+
+
+def test_parse_cache(tmp_path, monkeypatch):
+    """Test parsed files are read from the cache."""
+    from renku.core.management.parse_cache import ParseCache, blob_sha
+    from renku.core.models import jsonld
+
+    path = tmp_path / "metadata.yml"
+    path.write_text("name: dataset\nfiles:\n- path: data/file\n")
+
+    cache = ParseCache(path=tmp_path / "cache")
+    assert {"name": "dataset", "files": [{"path": "data/file"}]} == cache.read(path)
+
+    def fail(content):
+        raise AssertionError("Cached content parsed again")
+
+    monkeypatch.setattr(jsonld, "load_yaml", fail)
+
+    data = ParseCache(path=tmp_path / "cache").read(path)
+    assert {"name": "dataset", "files": [{"path": "data/file"}]} == data
+    assert "595a3aeae4904608eee47f61ba721453a70460b0" == blob_sha(b"name: x\n")
+
+
+def test_parse_cache_eviction(tmp_path):
+    """Test least recently used entries are evicted."""
+    import os
+
+    from renku.core.management.parse_cache import ParseCache
+
+    cache = ParseCache(path=tmp_path / "cache", max_size=1024)
+    for key in ("a" * 40, "b" * 40, "c" * 40):
+        cache.set(key, {"value": key * 5})
+        os.utime(cache._entry_path(key), (0, 0))
+
+    assert cache.get("a" * 40) is not None
+    cache.set("d" * 40, {"value": "d" * 400})
+
+    assert cache.size <= 1024
+    assert cache.get("a" * 40) is not None
+    assert cache.get("d" * 40) is not None
+    assert cache.get("b" * 40) is None
+
+
+def test_step_cache(tmp_path):
+    """Test results of steps are stored by their key."""
+    from renku.core.management.step_cache import StepCache, step_key
+
+    key = step_key(["wc", "-c", "<", "input"], {"input": "a" * 40}, {"Dockerfile": "b" * 40})
+    assert key == step_key(["wc", "-c", "<", "input"], {"input": "a" * 40}, {"Dockerfile": "b" * 40})
+    assert key != step_key(["wc", "-c", "<", "input"], {"input": "c" * 40}, {"Dockerfile": "b" * 40})
+
+    cache = StepCache(path=tmp_path / "cache")
+    assert cache.get(key) is None
+
+    cache.set(key, "activity", {"output": "d" * 40})
+    assert {"activity": "activity", "outputs": {"output": "d" * 40}} == cache.get(key)
+
+    assert StepCache(path=tmp_path / "cache", enabled=False).get(key) is None
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test fast loading of JSON-LD documents."""
+
+import pytest
+
+from renku.core.models import jsonld, loader
+from renku.core.models.provenance.activities import ProcessRunSchema, WorkflowRunSchema
+
+
+def _workflow_files(client):
+    """Return workflow files of the client."""
+    return sorted(client.workflow_path.glob("*.yaml"))
+
+
+def test_compiled_plans():
+    """Test that activity schemas are loaded without calamus."""
+    assert loader._compile(ProcessRunSchema) is not None
+    assert loader._compile(WorkflowRunSchema) is not None
+
+
+@pytest.mark.parametrize("schema_class", [ProcessRunSchema, WorkflowRunSchema])
+def test_load_same_as_calamus(client, run, schema_class):
+    """Test that loaded activities match the ones loaded by calamus."""
+    assert 0 == run(args=("run", "touch", "data/input"))
+    assert 0 == run(args=("run", "cp", "data/input", "data/intermediate"))
+    assert 0 == run(args=("run", "cp", "data/intermediate", "data/output"))
+    with client.commit():
+        (client.path / "data" / "input").write_text("changed")
+    assert 0 == run(args=("update",))
+
+    loaded = 0
+    for path in _workflow_files(client):
+        data = jsonld.read_yaml(path)
+        commit = client.find_previous_commit(path)
+        try:
+            expected = schema_class(client=client, commit=commit, flattened=True).load(data)
+        except Exception:
+            continue
+
+        plan = loader._compile(schema_class)
+        activity = loader._Document(data).load(plan, client=client, commit=commit)
+
+        assert type(expected) is type(activity)
+        assert expected.as_jsonld() == activity.as_jsonld()
+        loaded += 1
+
+    assert loaded > 0
+
+
+def test_load_falls_back_to_calamus(client, run, monkeypatch):
+    """Test that documents which cannot be loaded by a plan use calamus."""
+    assert 0 == run(args=("run", "touch", "data/output"))
+    path = _workflow_files(client)[0]
+    data = jsonld.read_yaml(path)
+
+    def fail(*args, **kwargs):
+        raise loader._Unsupported()
+
+    monkeypatch.setattr(loader._Document, "load", fail)
+    activity = loader.load(ProcessRunSchema, data, client=client)
+
+    assert "data/output" == activity.generated[0].path
+
+
+def test_load_propagates_other_errors(client, run, monkeypatch):
+    """Test that errors other than an unsupported shape are not hidden."""
+    assert 0 == run(args=("run", "touch", "data/output"))
+    data = jsonld.read_yaml(_workflow_files(client)[0])
+
+    def fail(*args, **kwargs):
+        raise ValueError("invalid")
+
+    monkeypatch.setattr(loader._Document, "load", fail)
+
+    with pytest.raises(ValueError):
+        loader.load(ProcessRunSchema, data, client=client)
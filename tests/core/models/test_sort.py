@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test graph sorting and traversal."""
+
+import pytest
+
+from renku.core.models.sort import IndexedGraph, topological
+
+
+def test_topological_order():
+    """Test nodes are sorted before their parents."""
+    nodes = {"c": ["b"], "b": ["a"], "d": ["a", "c"]}
+
+    order = list(topological(nodes))
+
+    assert {"a", "b", "c", "d"} == set(order)
+    for node, parents in nodes.items():
+        assert all(order.index(node) < order.index(parent) for parent in parents)
+
+
+def test_topological_cycle():
+    """Test cycles are detected."""
+    with pytest.raises(ValueError):
+        topological({"a": ["b"], "b": ["a"]})
+
+
+def test_topological_long_chain():
+    """Test sorting a chain longer than the recursion limit."""
+    nodes = {i: [i - 1] for i in range(1, 100000)}
+
+    assert list(range(99999, -1, -1)) == list(topological(nodes))
+
+
+def test_stale_ancestors():
+    """Test stale ancestors are found without visiting their parents."""
+    parents = {"output": ["step"], "step": ["input", "script"], "input": ["raw"], "raw": []}
+    visited = []
+
+    def _parents(node):
+        visited.append(node)
+        return parents.get(node, [])
+
+    graph = IndexedGraph(parents=_parents, is_stale=lambda node: node in {"input", "script"}, key=str)
+
+    assert ["input", "script"] == graph.stale_ancestors("output")
+    assert ["output", "step"] == visited
+    assert ["input"] == graph.stale_ancestors("input")
+    assert [] == graph.stale_ancestors("raw")
+    assert 5 == len(graph)
+
+
+def test_stale_ancestors_long_chain():
+    """Test propagating staleness along a chain longer than the recursion limit."""
+    graph = IndexedGraph(parents=lambda node: [node - 1] if node else [], is_stale=lambda node: node == 0)
+
+    assert [0] == graph.stale_ancestors(100000)
@@ -18,7 +18,9 @@
 """Test plugins for the ``run`` command."""
 
 from renku.cli import cli
+from renku.core.models.provenance.activities import Activity
 from renku.core.plugins import pluginmanager as pluginmanager
+from renku.core.plugins.implementations.resource_usage import get_resource_usage
 
 
 def test_renku_pre_run_hook(monkeypatch, dummy_pre_run_plugin_hook, runner, project):
@@ -68,3 +70,14 @@ def test_renku_processrun_cwl_hook(monkeypatch, dummy_processrun_plugin_hook, ru
         result = runner.invoke(cli, ["log", "--format", "json-ld"])
         assert "Dummy ProcessRun Hook" in result.output
         assert "dummy ProcessRun hook body" in result.output
+
+
+def test_renku_run_resource_usage(runner, client):
+    """Test resources used by the command are recorded."""
+    result = runner.invoke(cli, ["run", "--no-output", "echo", "test"])
+    assert 0 == result.exit_code
+
+    path = next(client.workflow_path.glob("*.yaml"))
+    usage = get_resource_usage(Activity.from_yaml(path, client=client))
+    assert usage["wall_time"] >= 0
+    assert {"user_time", "system_time", "max_rss"} <= set(usage)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark suite tests."""
+
+from benchmarks import scenarios
+from benchmarks.datasets import time_dataset_files
+from benchmarks.generator import write_files
+from benchmarks.loader import time_loader
+
+
+def test_write_files(tmp_path):
+    """Test generated files have the requested size and deterministic content."""
+    paths = write_files(tmp_path / "data", 3, 1000, seed=1)
+
+    assert 3 == len(paths)
+    assert all(1000 == path.stat().st_size for path in paths)
+    assert [p.read_bytes() for p in paths] == [p.read_bytes() for p in write_files(tmp_path / "other", 3, 1000, seed=1)]
+
+
+def test_measure_modifying_scenario(tmp_path):
+    """Test scenarios that modify a project run on a copy."""
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "file").write_text("content")
+
+    scenario = scenarios.Scenario("rm", ["-c", "import os; os.remove('file')"], modifies=True)
+    result = scenarios.measure(scenario, project, renku="python", repeat=2)
+
+    assert [0, 0] == result["exit_codes"]
+    assert 2 == len(result["times"])
+    assert (project / "file").exists()
+
+
+def test_compare():
+    """Test comparing results of two runs."""
+    before = {"results": [{"scenario": "status", "median": 2.0}, {"scenario": "log", "median": 1.0}]}
+    after = {"results": [{"scenario": "status", "median": 1.0}]}
+
+    assert ([("status", 2.0, 1.0, 0.5)], []) == scenarios.compare(before, after)
+
+
+def test_measure_failing_scenario(tmp_path):
+    """Test failed runs are not timed and not compared."""
+    scenario = scenarios.Scenario("fail", ["-c", "import sys; sys.exit('usage')"])
+    result = scenarios.measure(scenario, tmp_path, renku="python", repeat=2)
+
+    assert [1, 1] == result["exit_codes"]
+    assert 2 == result["failures"]
+    assert "usage" == result["error"]
+    assert result["median"] is None
+
+    before = {"results": [{"scenario": "fail", "median": 1.0, "exit_codes": [0]}]}
+    assert ([], ["fail"]) == scenarios.compare(before, {"results": [result]})
+
+
+def test_time_dataset_files():
+    """Test timing bulk operations on dataset files."""
+    result = time_dataset_files(100)
+
+    assert 100 == result["files"]
+    assert {"update_files", "update_existing_files", "rename_files", "unlink_files"} == set(result["times"])
+
+
+def test_time_loader(client, run):
+    """Test timing loading of workflow files."""
+    assert 0 == run(args=("run", "touch", "output"))
+
+    result = time_loader(client.path, repeat=1)
+
+    assert 1 == result["documents"]
+    assert {"plan", "calamus"} == set(result["times"])
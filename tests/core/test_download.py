@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 - Swiss Data Science Center (SDSC)
+# A partnership between École Polytechnique Fédérale de Lausanne (EPFL) and
+# Eidgenössische Technische Hochschule Zürich (ETHZ).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Resumable download tests."""
+
+import hashlib
+import http.server
+import os
+import json
+import re
+import socketserver
+import threading
+
+import pytest
+
+from renku.core import errors
+from renku.core.utils.download import download
+
+CONTENT = os.urandom(300000)
+
+
+class _Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """Threading HTTP server."""
+
+    daemon_threads = True
+
+
+class Progress:
+    """Progress collecting downloaded bytes."""
+
+    def __init__(self, description, total_size):
+        """Initialize progress."""
+        self.total_size = total_size
+        self.downloaded = 0
+
+    def update(self, size):
+        """Add downloaded bytes."""
+        self.downloaded += size
+
+    def finalize(self):
+        """Finish progress."""
+
+
+@pytest.fixture
+def http_server():
+    """Serve content with byte ranges and drop connections on request."""
+    state = {"ranges": True, "drop": 0, "requests": [], "content": CONTENT, "etag": '"v1"'}
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def _send(self, body):
+            content = state["content"]
+            start, end = 0, len(content)
+            match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+            if_range = self.headers.get("If-Range")
+            if match and state["ranges"] and (if_range is None or if_range == state["etag"]):
+                start = int(match.group(1))
+                end = int(match.group(2)) + 1 if match.group(2) else len(content)
+                self.send_response(206)
+                self.send_header("Content-Range", "bytes {0}-{1}/{2}".format(start, end - 1, len(content)))
+            else:
+                self.send_response(200)
+            if state["ranges"]:
+                self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", state["etag"])
+            self.send_header("Content-Length", str(end - start))
+            self.end_headers()
+
+            if not body:
+                return
+            state["requests"].append(self.headers.get("Range"))
+            data = content[start:end]
+            if state["drop"]:
+                state["drop"] -= 1
+                self.wfile.write(data[: len(data) // 2])
+                self.wfile.flush()
+                self.connection.shutdown(2)
+                return
+            self.wfile.write(data)
+
+        def do_HEAD(self):
+            self._send(body=False)
+
+        def do_GET(self):
+            self._send(body=True)
+
+        def log_message(self, *args):
+            pass
+
+    server = _Server(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = "http://127.0.0.1:{0}/file.bin".format(server.server_address[1])
+    yield state
+    server.shutdown()
+
+
+def test_download_resumes_dropped_connection(http_server, tmp_path):
+    """Test a dropped connection continues from the received data."""
+    http_server["drop"] = 1
+    checksum = "md5:" + hashlib.md5(CONTENT).hexdigest()
+
+    path = download(http_server["url"], tmp_path / "file.bin", Progress, checksum=checksum)
+
+    assert CONTENT == path.read_bytes()
+    assert 2 == len(http_server["requests"])
+    assert http_server["requests"][1].startswith("bytes=")
+    assert not (tmp_path / "file.bin.part").exists()
+
+
+def _write_partial(path, content, etag):
+    """Write a partial file of an earlier download."""
+    (path.parent / (path.name + ".part")).write_bytes(content)
+    (path.parent / (path.name + ".part.json")).write_text(json.dumps({"validator": etag, "size": len(CONTENT)}))
+
+
+def test_download_resumes_partial_file(http_server, tmp_path):
+    """Test a partial file of an earlier download is completed."""
+    _write_partial(tmp_path / "file.bin", CONTENT[:1000], '"v1"')
+
+    download(http_server["url"], tmp_path / "file.bin", Progress)
+
+    assert CONTENT == (tmp_path / "file.bin").read_bytes()
+    assert ["bytes=1000-"] == http_server["requests"]
+    assert not (tmp_path / "file.bin.part.json").exists()
+
+
+@pytest.mark.parametrize("etag", ['"v0"', None])
+def test_download_discards_partial_file_of_other_version(http_server, tmp_path, etag):
+    """Test a partial file is not resumed if the remote file changed or has no validator."""
+    http_server["content"] = CONTENT[::-1]
+    if etag is None:
+        http_server["etag"] = 'W/"weak"'
+    _write_partial(tmp_path / "file.bin", CONTENT[:1000], '"v0"')
+
+    download(http_server["url"], tmp_path / "file.bin", Progress)
+
+    assert CONTENT[::-1] == (tmp_path / "file.bin").read_bytes()
+    assert [None] == http_server["requests"]
+
+
+def test_download_partial_file_larger_than_remote(http_server, tmp_path):
+    """Test a partial file is not taken as complete if the remote file shrank."""
+    (tmp_path / "file.bin.part").write_bytes(CONTENT + b"old")
+    (tmp_path / "file.bin.part.json").write_text(json.dumps({"validator": '"v1"', "size": len(CONTENT) + 3}))
+
+    download(http_server["url"], tmp_path / "file.bin", Progress)
+
+    assert CONTENT == (tmp_path / "file.bin").read_bytes()
+
+
+def test_download_restarts_without_ranges(http_server, tmp_path):
+    """Test a partial file is replaced if the server does not accept ranges."""
+    http_server["ranges"] = False
+    (tmp_path / "file.bin.part").write_bytes(b"garbage")
+
+    download(http_server["url"], tmp_path / "file.bin", Progress)
+
+    assert CONTENT == (tmp_path / "file.bin").read_bytes()
+
+
+def test_download_progress_of_restarted_download(http_server, tmp_path):
+    """Test progress does not exceed the file size when a download starts again."""
+    http_server["ranges"] = False
+    http_server["drop"] = 1
+    progresses = []
+
+    class CollectedProgress(Progress):
+        def __init__(self, description, total_size):
+            super().__init__(description, total_size)
+            progresses.append(self)
+
+    download(http_server["url"], tmp_path / "file.bin", CollectedProgress)
+
+    assert CONTENT == (tmp_path / "file.bin").read_bytes()
+    assert 2 == len(http_server["requests"])
+    assert len(CONTENT) == progresses[0].downloaded
+
+
+def test_download_parallel_ranges(http_server, tmp_path):
+    """Test large files are downloaded in parallel ranges."""
+    http_server["drop"] = 2
+
+    download(http_server["url"], tmp_path / "file.bin", Progress, parts=3, threshold=1)
+
+    assert CONTENT == (tmp_path / "file.bin").read_bytes()
+    assert 5 == len(http_server["requests"])
+    assert not (tmp_path / "file.bin.part.json").exists()
+
+
+def test_download_checksum_mismatch(http_server, tmp_path):
+    """Test a download with a wrong checksum fails."""
+    with pytest.raises(errors.OperationError):
+        download(http_server["url"], tmp_path / "file.bin", Progress, checksum="md5:" + "0" * 32)
+
+    assert not (tmp_path / "file.bin").exists()
+    assert not (tmp_path / "file.bin.part").exists()